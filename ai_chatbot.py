@@ -7,20 +7,128 @@ A terminal-based chatbot that uses OpenAI's GPT models for intelligent responses
 Features comprehensive error handling and natural conversation flow.
 """
 
+import asyncio
+import concurrent.futures
+import logging
 import os
 import sys
-from openai import OpenAI
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from chatbot_core import ChatbotCore
+from conversation_history import ConversationHistory, estimate_tokens
+from input_screening import default_screener
+from llm_client import get_provider
+from metrics import LLM_ERRORS, LLM_HEDGED_REPLIES, LLM_REQUEST_SECONDS
+from rate_limiter import Overloaded, rate_limiter_from_env
+from response_cache import ResponseCache, make_cache_key
+from router import CoreStage, Router
+from singleflight import AsyncSingleFlight, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a friendly, helpful AI assistant. Respond naturally and conversationally, as if talking to a friend. Keep responses concise but engaging. Be helpful and positive."
+
+COMPLETION_OPTIONS = {
+    "model": "gpt-3.5-turbo",  # You can change to "gpt-4" if you have access
+    "max_tokens": 200,  # Limit response length
+    "temperature": 0.7  # Add some creativity
+}  # Timeouts, retries and connection pooling are configured in llm_client
+
+ERROR_MESSAGES = {
+    "authentication": "❌ Authentication failed. Please check your API key.",
+    "rate_limit": "❌ Rate limit exceeded. You may have hit your usage limits.",
+    "timeout": "❌ Request timed out. Please try again.",
+    "network": "❌ Network error. Please check your internet connection.",
+}
+
+_LLM_SUCCESS_SECONDS = LLM_REQUEST_SECONDS.labels(outcome="success")
+_LLM_ERROR_SECONDS = LLM_REQUEST_SECONDS.labels(outcome="error")
+_ANSWERED_IN_TIME = LLM_HEDGED_REPLIES.labels(outcome="llm")
+_HEDGE_WON = LLM_HEDGED_REPLIES.labels(outcome="hedge")
+_DEADLINE_CACHED = LLM_HEDGED_REPLIES.labels(outcome="cache")
+_DEADLINE_MISSED = LLM_HEDGED_REPLIES.labels(outcome="deadline")
+
+
+def error_category(e: Exception) -> str:
+    """
+    Sort an API error into a category.
+    
+    Args:
+        e (Exception): The error raised by the API call
+        
+    Returns:
+        str: "authentication", "rate_limit", "timeout", "network" or "other"
+    """
+    error_msg = str(e).lower()
+    
+    if "authentication" in error_msg or "unauthorized" in error_msg or "invalid" in error_msg:
+        return "authentication"
+    elif "rate limit" in error_msg or "quota" in error_msg:
+        return "rate_limit"
+    elif "timeout" in error_msg:
+        return "timeout"
+    elif "network" in error_msg or "connection" in error_msg:
+        return "network"
+    return "other"
+
+
+@contextmanager
+def _timed_llm_call():
+    """Record how long an LLM call took, labelled by whether it succeeded."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _LLM_ERROR_SECONDS.observe(time.perf_counter() - started)
+        raise
+    _LLM_SUCCESS_SECONDS.observe(time.perf_counter() - started)
 
 class AIChatbot:
     """
     A chatbot class that handles OpenAI API interactions.
     """
     
-    def __init__(self):
-        """Initialize the chatbot with OpenAI client."""
-        self.client = None
-        self.conversation_history = []
+    def __init__(self, client=None, async_client=None, cache=None, cache_history_turns: bool = True,
+                 history_tokens: int = 1000, coalesce: bool = True, rate_limiter=None,
+                 deadline_workers: int = 32, stages=()):
+        """
+        Initialize the chatbot with OpenAI client.
+        
+        Args:
+            client: Optional pre-built OpenAI client
+            async_client: Optional pre-built AsyncOpenAI client
+            cache: Optional response cache (e.g. ResponseCache) checked before the API
+            cache_history_turns (bool): Also cache turns that depend on earlier history
+            history_tokens (int): Token budget for the conversation history sent as context
+            coalesce (bool): Share one API call among identical concurrent requests
+            rate_limiter: Optional RateLimiter every API call must be admitted by; when it
+                sheds a call, ``Overloaded`` is raised to the caller instead of returning None
+            deadline_workers (int): Threads that run calls made with a deadline or hedge
+            stages: Optional router stages (e.g. a CoreStage) that may answer the
+                conversation's messages before the API is called
+        """
+        self.client = client
+        self.async_client = async_client
+        self.cache = cache
+        self.cache_history_turns = cache_history_turns
+        self.conversation_history = ConversationHistory(max_tokens=history_tokens)
+        self._flight = SingleFlight("ai_chatbot") if coalesce else None
+        self._async_flight = AsyncSingleFlight("ai_chatbot") if coalesce else None
+        self.rate_limiter = rate_limiter
+        # Threads are only started once a call is made with a deadline or hedge
+        self._deadline_pool = ThreadPoolExecutor(max_workers=deadline_workers, thread_name_prefix="llm-deadline")
+        self.router = Router(stages, name="ai_chatbot") if stages else None
+        
+    def close(self):
+        """
+        Shut down the threads that run calls made with a deadline or hedge.
+        
+        Calls already running are left to finish and fill the cache; the
+        chatbot must not be given a deadline or hedge afterwards.
+        """
+        self._deadline_pool.shutdown(wait=False, cancel_futures=True)
         
     def setup_api_key(self) -> bool:
         """
@@ -50,8 +158,10 @@ class AIChatbot:
             return False
         
         try:
-            # Initialize OpenAI client
-            self.client = OpenAI(api_key=api_key)
+            # Use the shared, pooled OpenAI clients
+            provider = get_provider(api_key=api_key)
+            self.client = provider.get_client()
+            self.async_client = provider.get_async_client()
             print("✅ OpenAI client initialized successfully!")
             return True
             
@@ -59,64 +169,353 @@ class AIChatbot:
             print(f"❌ Error initializing OpenAI client: {e}")
             return False
     
-    def get_ai_response(self, user_message: str) -> Optional[str]:
+    def _conversation(self, history: Optional[ConversationHistory]) -> ConversationHistory:
+        """Get the history to use for a turn: the given one or this chatbot's own."""
+        return history if history is not None else self.conversation_history
+    
+    def _cache_key(self, user_message: str, context: List[Dict[str, str]]) -> Optional[bytes]:
+        """Get the cache key for this turn, or None if it should bypass the cache."""
+        if self.cache is None or (context and not self.cache_history_turns):
+            return None
+        return make_cache_key(user_message, SYSTEM_PROMPT, context)
+    
+    def _build_messages(self, user_message: str, context: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Create the conversation context sent to the API."""
+        messages = [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            }
+        ]
+        
+        # Add conversation history for context
+        messages.extend(context)
+        
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
+    
+    def _record_turn(self, conversation: ConversationHistory, user_message: str, ai_response: str):
+        """Update conversation history with a completed turn."""
+        conversation.add_turn(user_message, ai_response)
+    
+    def _report_error(self, e: Exception):
+        """Count the given API error by category and log a friendly message for it."""
+        category = error_category(e)
+        LLM_ERRORS.labels(category=category).inc()
+        logger.error("%s (%s)", ERROR_MESSAGES.get(category, "❌ API Error."), e)
+    
+    def _flight_key(self, user_message: str, context: List[Dict[str, str]],
+                    cache_key: Optional[bytes]) -> bytes:
+        """Key under which identical concurrent requests are coalesced."""
+        return cache_key if cache_key is not None else make_cache_key(user_message, SYSTEM_PROMPT, context)
+    
+    def _estimate_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """Tokens a call counts against the rate limit: the prompt plus the longest reply."""
+        return sum(estimate_tokens(message["content"]) for message in messages) + COMPLETION_OPTIONS["max_tokens"]
+    
+    def _request_completion(self, messages: List[Dict[str, str]], cache_key: Optional[bytes]) -> str:
+        """Make one API call and cache its reply."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self._estimate_tokens(messages))
+        with _timed_llm_call():
+            response = self.client.chat.completions.create(
+                messages=messages,
+                **COMPLETION_OPTIONS
+            )
+        
+        # Extract AI response
+        ai_response = response.choices[0].message.content.strip()
+        if cache_key is not None:
+            self.cache.set(cache_key, ai_response)
+        return ai_response
+    
+    async def _request_completion_async(self, messages: List[Dict[str, str]],
+                                        cache_key: Optional[bytes]) -> str:
+        """Make one API call without blocking the event loop and cache its reply."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(self._estimate_tokens(messages))
+        with _timed_llm_call():
+            response = await self.async_client.chat.completions.create(
+                messages=messages,
+                **COMPLETION_OPTIONS
+            )
+        
+        ai_response = response.choices[0].message.content.strip()
+        if cache_key is not None:
+            self.cache.set(cache_key, ai_response)
+        return ai_response
+    
+    def _complete(self, user_message: str, context: List[Dict[str, str]],
+                  messages: List[Dict[str, str]], cache_key: Optional[bytes]) -> str:
+        """Make the API call, or share an identical one already in flight."""
+        if self._flight is None:
+            return self._request_completion(messages, cache_key)
+        return self._flight.do(self._flight_key(user_message, context, cache_key),
+                               lambda: self._request_completion(messages, cache_key))
+    
+    async def _complete_async(self, user_message: str, context: List[Dict[str, str]],
+                              messages: List[Dict[str, str]], cache_key: Optional[bytes]) -> str:
+        """Await the API call, or share an identical one already in flight."""
+        if self._async_flight is None:
+            return await self._request_completion_async(messages, cache_key)
+        # Without a cache nothing would use the reply of a call every caller gave up on
+        return await self._async_flight.do(self._flight_key(user_message, context, cache_key),
+                                           lambda: self._request_completion_async(messages, cache_key),
+                                           cancel_abandoned=self.cache is None)
+    
+    def _deadline_reply(self, user_message: str) -> Optional[str]:
+        """Best reply once the deadline has passed: a cached answer to the bare question, if any."""
+        ai_response = self.cache.get(make_cache_key(user_message, SYSTEM_PROMPT)) if self.cache is not None else None
+        (_DEADLINE_MISSED if ai_response is None else _DEADLINE_CACHED).inc()
+        return ai_response
+    
+    def _hedged(self, call: Callable[[], str], user_message: str, deadline: Optional[float],
+                hedge: Optional[Callable[[], Optional[str]]]) -> Optional[str]:
+        """
+        Run the API call on a worker thread against a deadline and a hedge.
+        
+        A call that loses is abandoned: it cannot be interrupted once started,
+        but its reply still fills the cache when it arrives.
+        """
+        started = time.monotonic()
+        future = self._deadline_pool.submit(call)
+        if hedge is not None:
+            answer = hedge()
+            # The hedge wins unless the call already answered while it ran
+            if answer is not None and not (future.done() and future.exception() is None):
+                future.cancel()
+                _HEDGE_WON.inc()
+                return answer
+        
+        remaining = None if deadline is None else max(0.0, deadline - (time.monotonic() - started))
+        try:
+            ai_response = future.result(remaining)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            return self._deadline_reply(user_message)
+        _ANSWERED_IN_TIME.inc()
+        return ai_response
+    
+    async def _hedged_async(self, call: Callable[[], "asyncio.Future"], user_message: str,
+                            deadline: Optional[float],
+                            hedge: Optional[Callable[[], Optional[str]]]) -> Optional[str]:
+        """
+        Await the API call against a deadline and a hedge run on the default executor.
+        
+        A call that loses is cancelled if there is no cache to fill; otherwise
+        it is abandoned and its reply cached when it arrives.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        task = asyncio.ensure_future(call())
+        if hedge is not None:
+            answer = await loop.run_in_executor(None, hedge)
+            if answer is not None and not (task.done() and not task.cancelled() and task.exception() is None):
+                self._abandon(task)
+                _HEDGE_WON.inc()
+                return answer
+        
+        remaining = None if deadline is None else max(0.0, deadline - (loop.time() - started))
+        try:
+            ai_response = await asyncio.wait_for(asyncio.shield(task), remaining)
+        except asyncio.TimeoutError:
+            self._abandon(task)
+            return self._deadline_reply(user_message)
+        _ANSWERED_IN_TIME.inc()
+        return ai_response
+    
+    def _abandon(self, task: "asyncio.Future"):
+        """
+        Stop waiting for an API call, cancelling it when nothing would use its reply.
+        
+        Without a cache the upstream request is cancelled, unless an identical
+        coalesced request is still waiting for it.
+        """
+        if self.cache is None:
+            task.cancel()
+        # Mark any later exception as retrieved; nobody is waiting for it
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    
+    def cached_response(self, user_message: str,
+                        history: Optional[ConversationHistory] = None) -> Optional[str]:
+        """
+        Get the cached reply to this turn without calling the API or recording the turn.
+        
+        Args:
+            user_message (str): The user's input message
+            history (Optional[ConversationHistory]): Conversation to use instead of this chatbot's own
+            
+        Returns:
+            Optional[str]: The cached reply, or None
+        """
+        cache_key = self._cache_key(user_message, self._conversation(history).messages())
+        return self.cache.get(cache_key) if cache_key is not None else None
+    
+    def get_ai_response(self, user_message: str,
+                        history: Optional[ConversationHistory] = None, deadline: Optional[float] = None,
+                        hedge: Optional[Callable[[], Optional[str]]] = None,
+                        check_cache: bool = True) -> Optional[str]:
         """
         Send user message to OpenAI and get AI response.
         
+        With a ``deadline``, a call that has not answered in time is abandoned
+        and a cached answer to the same question without its history is
+        returned instead, if there is one. A ``hedge`` (e.g. a catalog lookup)
+        runs while the call is in flight; if it returns an answer before the
+        call does, that answer is used.
+        
         Args:
             user_message (str): The user's input message
+            history (Optional[ConversationHistory]): Conversation to use instead of this chatbot's own
+            deadline (Optional[float]): Seconds to wait for the API before giving up
+            hedge (Optional[Callable[[], Optional[str]]]): Alternative answer raced against the API
+            check_cache (bool): Look for a cached reply first; False if the caller already did
             
         Returns:
-            Optional[str]: AI response or None if error occurred
+            Optional[str]: AI (or hedge) response, or None if an error occurred or the deadline passed
+            
+        Raises:
+            Overloaded: If the rate limiter shed the request
         """
         try:
-            # Create conversation context
-            messages = [
-                {
-                    "role": "system",
-                    "content": "You are a friendly, helpful AI assistant. Respond naturally and conversationally, as if talking to a friend. Keep responses concise but engaging. Be helpful and positive."
-                }
-            ]
+            conversation = self._conversation(history)
+            context = conversation.messages()  # Already trimmed to the token budget
+            cache_key = self._cache_key(user_message, context)
+            if cache_key is not None and check_cache:
+                ai_response = self.cache.get(cache_key)
+                if ai_response is not None:
+                    self._record_turn(conversation, user_message, ai_response)
+                    return ai_response
             
-            # Add conversation history for context
-            messages.extend(self.conversation_history[-6:])  # Keep last 6 messages for context
+            # Send request to OpenAI, or share an identical one already in flight
+            messages = self._build_messages(user_message, context)
+            if deadline is None and hedge is None:
+                ai_response = self._complete(user_message, context, messages, cache_key)
+            else:
+                ai_response = self._hedged(lambda: self._complete(user_message, context, messages, cache_key),
+                                           user_message, deadline, hedge)
+                if ai_response is None:
+                    return None
             
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+            self._record_turn(conversation, user_message, ai_response)
+            return ai_response
             
-            # Send request to OpenAI
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",  # You can change to "gpt-4" if you have access
-                messages=messages,
-                max_tokens=200,  # Limit response length
-                temperature=0.7,  # Add some creativity
-                timeout=30  # 30 second timeout
-            )
+        except Overloaded:
+            raise
+        except Exception as e:
+            self._report_error(e)
+            return None
+    
+    def stream_ai_response(self, user_message: str,
+                           history: Optional[ConversationHistory] = None) -> Iterator[str]:
+        """
+        Send user message to OpenAI and yield the response as it arrives.
+        
+        Args:
+            user_message (str): The user's input message
+            history (Optional[ConversationHistory]): Conversation to use instead of this chatbot's own
+            
+        Yields:
+            str: Response tokens in order
+            
+        Raises:
+            Overloaded: If the rate limiter shed the request, before any token is yielded
+            Exception: Whatever the API call or the stream raised, after it is
+                counted and logged; a reply cut off part way is neither cached
+                nor recorded
+        """
+        tokens = []
+        conversation = self._conversation(history)
+        context = conversation.messages()  # Already trimmed to the token budget
+        cache_key = self._cache_key(user_message, context)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._record_turn(conversation, user_message, cached)
+                yield cached
+                return
+        
+        messages = self._build_messages(user_message, context)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self._estimate_tokens(messages))
+        try:
+            with _timed_llm_call():
+                stream = self.client.chat.completions.create(
+                    messages=messages,
+                    stream=True,
+                    **COMPLETION_OPTIONS
+                )
+                
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    token = chunk.choices[0].delta.content
+                    if token:
+                        tokens.append(token)
+                        yield token
+                    
+        except Exception as e:
+            self._report_error(e)
+            raise
+        
+        ai_response = "".join(tokens).strip()
+        if ai_response:
+            if cache_key is not None:
+                self.cache.set(cache_key, ai_response)
+            self._record_turn(conversation, user_message, ai_response)
+    
+    async def get_ai_response_async(self, user_message: str,
+                                    history: Optional[ConversationHistory] = None,
+                                    deadline: Optional[float] = None,
+                                    hedge: Optional[Callable[[], Optional[str]]] = None,
+                                    check_cache: bool = True) -> Optional[str]:
+        """
+        Send user message to OpenAI without blocking the event loop.
+        
+        ``deadline``, ``hedge`` and ``check_cache`` work as in
+        ``get_ai_response``; the hedge runs on the loop's default executor.
+        
+        Args:
+            user_message (str): The user's input message
+            history (Optional[ConversationHistory]): Conversation to use instead of this chatbot's own
+            deadline (Optional[float]): Seconds to wait for the API before giving up
+            hedge (Optional[Callable[[], Optional[str]]]): Alternative answer raced against the API
+            check_cache (bool): Look for a cached reply first; False if the caller already did
             
-            # Extract AI response
-            ai_response = response.choices[0].message.content.strip()
+        Returns:
+            Optional[str]: AI (or hedge) response, or None if an error occurred or the deadline passed
             
-            # Update conversation history
-            self.conversation_history.append({"role": "user", "content": user_message})
-            self.conversation_history.append({"role": "assistant", "content": ai_response})
+        Raises:
+            Overloaded: If the rate limiter shed the request
+        """
+        try:
+            conversation = self._conversation(history)
+            context = conversation.messages()  # Already trimmed to the token budget
+            cache_key = self._cache_key(user_message, context)
+            if cache_key is not None and check_cache:
+                ai_response = self.cache.get(cache_key)
+                if ai_response is not None:
+                    self._record_turn(conversation, user_message, ai_response)
+                    return ai_response
             
+            messages = self._build_messages(user_message, context)
+            if deadline is None and hedge is None:
+                ai_response = await self._complete_async(user_message, context, messages, cache_key)
+            else:
+                ai_response = await self._hedged_async(
+                    lambda: self._complete_async(user_message, context, messages, cache_key),
+                    user_message, deadline, hedge)
+                if ai_response is None:
+                    return None
+            
+            self._record_turn(conversation, user_message, ai_response)
             return ai_response
             
+        except Overloaded:
+            raise
         except Exception as e:
-            # Handle different types of errors
-            error_msg = str(e).lower()
-            
-            if "authentication" in error_msg or "unauthorized" in error_msg or "invalid" in error_msg:
-                print("❌ Authentication failed. Please check your API key.")
-            elif "rate limit" in error_msg or "quota" in error_msg:
-                print("❌ Rate limit exceeded. You may have hit your usage limits.")
-            elif "timeout" in error_msg:
-                print("❌ Request timed out. Please try again.")
-            elif "network" in error_msg or "connection" in error_msg:
-                print("❌ Network error. Please check your internet connection.")
-            else:
-                print(f"❌ API Error: {e}")
-            
+            self._report_error(e)
             return None
     
     def start_conversation(self):
@@ -143,18 +542,40 @@ class AIChatbot:
                     print("🤖 I didn't catch that. What did you say?")
                     continue
                 
+                # Reject harmful input before it is sent to the API
+                screening = default_screener.screen(user_input)
+                if screening is not None:
+                    print(f"🤖 Sorry, I can't process that message ({screening.category}).")
+                    continue
+                
+                # Answer from a cheaper stage if one knows the answer
+                routed = self.router.answer(user_input, history=self.conversation_history) if self.router else None
+                if routed is not None:
+                    print(f"🤖 AI: {routed.text}")
+                    continue
+                
                 # Show that we're processing
                 print("🤖 Thinking...", end="", flush=True)
                 
-                # Get AI response
-                ai_response = self.get_ai_response(user_input)
+                # Stream the AI response, clearing "Thinking..." at the first token
+                received = failed = False
+                try:
+                    for token in self.stream_ai_response(user_input):
+                        if not received:
+                            print("\r" + " " * 20 + "\r🤖 AI: ", end="", flush=True)
+                            token = token.lstrip()
+                            received = True
+                        print(token, end="", flush=True)
+                except Exception:
+                    # Already counted and logged by stream_ai_response
+                    failed = True
                 
-                # Clear the "Thinking..." message
-                print("\r" + " " * 20 + "\r", end="", flush=True)
-                
-                if ai_response:
-                    print(f"🤖 AI: {ai_response}")
+                if received:
+                    print()
                 else:
+                    # Clear the "Thinking..." message
+                    print("\r" + " " * 20 + "\r", end="", flush=True)
+                if failed or not received:
                     print("🤖 Sorry, I'm having trouble connecting right now. Please try again.")
                     
             except KeyboardInterrupt:
@@ -173,6 +594,22 @@ class AIChatbot:
         print("🤖 Take care and have a wonderful day! 👋")
         print("="*50)
 
+def ai_chatbot_from_env() -> Optional[AIChatbot]:
+    """
+    Build the web apps' AI chatbot when ``OPENAI_API_KEY`` or ``OPENAI_BASE_URL`` is set.
+    
+    It uses the shared pooled clients, a response cache, and the rate limiter
+    configured by ``LLM_RATE_LIMIT_RPM`` and related variables, if any.
+    
+    Returns:
+        Optional[AIChatbot]: The chatbot, or None if no API is configured
+    """
+    if not (os.getenv('OPENAI_API_KEY') or os.getenv('OPENAI_BASE_URL')):
+        return None
+    provider = get_provider()
+    return AIChatbot(client=provider.get_client(), async_client=provider.get_async_client(),
+                     cache=ResponseCache(), rate_limiter=rate_limiter_from_env())
+
 def main():
     """
     Main function to run the AI chatbot.
@@ -189,8 +626,8 @@ def main():
         print("Please install it with: pip install openai")
         sys.exit(1)
     
-    # Create and initialize chatbot
-    chatbot = AIChatbot()
+    # Create and initialize chatbot; catalog questions are answered without the API
+    chatbot = AIChatbot(cache=ResponseCache(), stages=[CoreStage(ChatbotCore())])
     
     # Set up API key
     if not chatbot.setup_api_key():
@@ -202,7 +639,10 @@ def main():
         sys.exit(1)
     
     # Start the conversation
-    chatbot.start_conversation()
+    try:
+        chatbot.start_conversation()
+    finally:
+        chatbot.close()
 
 if __name__ == "__main__":
     main()
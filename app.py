@@ -5,14 +5,27 @@ Flask Web Application for Goldman Sachs Contact Center AI
 This module provides the web API for the contact center chatbot.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
-from chatbot_core import chatbot
+from ai_chatbot import ai_chatbot_from_env
+from async_logging import configure_from_env
+from catalog_reload import admin_enabled, admin_token_matches, reloader_from_env
+from chatbot_core import FALLBACK_RESPONSE, chatbot
+from dialog_flow import dialog_engine_from_env
+from metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, registry
+from rate_limiter import Overloaded
+from retrieval import load_retriever_from_env
+from router import build_router
+from session_manager import SessionManager
+import json
 import logging
 import os
+import threading
+import time
 
-# Configure logging
+# Configure logging (LOG_MODE=async moves formatting and I/O off the request thread)
 logging.basicConfig(level=logging.INFO)
+configure_from_env()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
@@ -20,6 +33,69 @@ CORS(app)
 
 # Configuration
 app.config['JSON_SORT_KEYS'] = False
+app.config['MAX_BATCH_SIZE'] = int(os.getenv('MAX_BATCH_SIZE', 1000))
+app.config['BATCH_STREAM_THRESHOLD'] = int(os.getenv('BATCH_STREAM_THRESHOLD', 100))
+# Optional AIChatbot used when no predefined response matches, built when
+# OPENAI_API_KEY or OPENAI_BASE_URL is set and rate limited by LLM_RATE_LIMIT_RPM
+app.config['AI_CHATBOT'] = ai_chatbot_from_env()
+# What to do when the AI chatbot's rate limiter sheds a request:
+# "fallback" answers from ChatbotCore, "reject" returns 429
+app.config['LLM_OVERLOAD_POLICY'] = os.getenv('LLM_OVERLOAD_POLICY', 'fallback')
+# Seconds to wait for the AI chatbot before answering from the catalog (0 waits for it)
+app.config['LLM_DEADLINE'] = float(os.getenv('LLM_DEADLINE', 0))
+# Start the AI chatbot's call alongside the catalog lookup instead of after it misses
+app.config['LLM_RACE_CATALOG'] = os.getenv('LLM_RACE_CATALOG', 'false').lower() == 'true'
+
+# Optional catalog file, reloaded when it changes or on POST /admin/reload
+catalog_reloader = reloader_from_env(chatbot)
+
+# Optional FAQ knowledge base searched before the fallback reply
+if chatbot.retriever is None:
+    chatbot.retriever = load_retriever_from_env()
+
+# Per-customer conversation state, keyed by session ID
+sessions = SessionManager(
+    max_sessions=int(os.getenv('SESSION_MAX', 10000)),
+    idle_timeout=float(os.getenv('SESSION_IDLE_TIMEOUT', 1800))
+)
+# Multi-step flows (e.g. account and loan services), kept in each session
+dialogs = dialog_engine_from_env()
+registry.gauge("chatbot_sessions_active", "Conversations held in memory.").set_function(lambda: len(sessions))
+
+@app.before_request
+def start_request_metrics():
+    """Count the request as in flight and note when it started."""
+    g.metrics_route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    g.metrics_started = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.labels(g.metrics_route).inc()
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Record the request's latency by route, method and status.
+    
+    Streamed responses are timed up to the point their headers are ready.
+    """
+    route = g.pop("metrics_route", None)
+    if route is not None:
+        HTTP_REQUEST_SECONDS.labels(route, request.method, response.status_code).observe(
+            time.perf_counter() - g.metrics_started)
+        HTTP_REQUESTS_IN_FLIGHT.labels(route).dec()
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    """
+    Record a request that ended without ``after_request`` running.
+    
+    Flask skips ``after_request`` when an exception propagates, so the
+    request is timed as a 500 here and leaves the in-flight gauge.
+    """
+    route = g.pop("metrics_route", None)
+    if route is not None:
+        HTTP_REQUEST_SECONDS.labels(route, request.method, 500).observe(
+            time.perf_counter() - g.metrics_started)
+        HTTP_REQUESTS_IN_FLIGHT.labels(route).dec()
 
 @app.route("/health", methods=["GET"])
 def health_check():
@@ -30,28 +106,308 @@ def health_check():
         "version": "1.0.0"
     })
 
+def parse_chat_message():
+    """
+    Extract and screen the message from a chat request.
+    
+    Returns:
+        tuple: (user_input, None) on success, or (None, error response)
+    """
+    # Validate request
+    if not request.is_json:
+        logger.warning("Request is not JSON")
+        return None, (jsonify({
+            "error": "Content-Type must be application/json"
+        }), 400)
+    
+    # Get JSON data
+    data = request.get_json()
+    if not data:
+        logger.warning("Empty JSON payload received")
+        return None, (jsonify({
+            "error": "Empty request body"
+        }), 400)
+    
+    # Extract message
+    user_input = data.get("message", "")
+    if not user_input:
+        logger.warning("No message provided in request")
+        return None, (jsonify({
+            "error": "Message field is required"
+        }), 400)
+    
+    # Screen the message before it reaches the chatbot
+    screening = chatbot.screen_input(user_input)
+    if screening is not None:
+        logger.warning("Message rejected by screening rule: %s", screening.rule)
+        return None, (jsonify({
+            "error": "Message rejected by input screening",
+            "rule": screening.rule,
+            "category": screening.category
+        }), 400)
+    
+    return user_input, None
+
+def get_session():
+    """Get the caller's session from the JSON ``session_id`` or the X-Session-ID header."""
+    session_id = request.get_json().get("session_id") or request.headers.get("X-Session-ID")
+    return sessions.get_or_create(session_id)
+
+# (settings, router) for the settings the router was last built with, replaced
+# as a whole under the lock so a reader never pairs one setting with another's router
+_router_cache = (None, None)
+_router_lock = threading.Lock()
+
+def get_router():
+    """
+    Get the router for the current AI chatbot settings, built once per setting.
+    
+    Without an AI chatbot this is just the ChatbotCore; otherwise the
+    catalog, the response cache and the LLM, or with LLM_RACE_CATALOG the
+    catalog lookups, the cache and then the LLM raced against the knowledge base.
+    """
+    global _router_cache
+    settings = (app.config['AI_CHATBOT'], app.config['LLM_DEADLINE'] or None, app.config['LLM_RACE_CATALOG'])
+    built_for, router = _router_cache
+    if built_for != settings:
+        with _router_lock:
+            built_for, router = _router_cache
+            if built_for != settings:
+                router = build_router(chatbot, *settings, name="app")
+                _router_cache = (settings, router)
+    return router
+
+def reply_to(user_input, session):
+    """
+    Get the reply to a message and record the turn in the session.
+    
+    A dialog flow in progress, or one the message starts, answers first. The
+    AI chatbot is asked only when nothing predefined matches, or, when
+    racing the catalog, at the same time as the lookup; it sees the session's
+    history and records the turn itself. If it misses the deadline or its
+    rate limiter sheds the request, the ChatbotCore reply is used, unless the
+    overload policy is "reject", in which case ``Overloaded`` propagates.
+    """
+    response = dialogs.handle(session, user_input)
+    if response is not None:
+        return response
+    try:
+        return get_router().route(user_input, history=session.history).text
+    except Overloaded as e:
+        if app.config['LLM_OVERLOAD_POLICY'] == 'reject':
+            raise
+        logger.warning("LLM overloaded, answering from the catalog: %s", e)
+    
+    session.record_turn(user_input, FALLBACK_RESPONSE)
+    return FALLBACK_RESPONSE
+
 @app.route("/chat", methods=["POST"])
 def chat():
     """
     Main chat endpoint for processing user messages.
     
+    Expected JSON payload:
+    {
+        "message": "user input string",
+        "session_id": "optional session ID from an earlier reply"
+    }
+    
+    Returns:
+        JSON response with chatbot reply and session ID
+    """
+    try:
+        user_input, error = parse_chat_message()
+        if error is not None:
+            return error
+        
+        # Get chatbot response, asking the AI chatbot when nothing predefined matches
+        session = get_session()
+        response = reply_to(user_input, session)
+        
+        logger.info("Processed message: %.50s...", user_input)
+        
+        return jsonify({
+            "user": user_input,
+            "bot": response,
+            "session_id": session.session_id,
+            "status": "success"
+        })
+        
+    except Overloaded as e:
+        logger.warning("Shedding chat request: %s", e)
+        return jsonify({
+            "error": "Too many requests",
+            "retry_after": e.retry_after_header,
+            "status": "error"
+        }), 429, {"Retry-After": e.retry_after_header}
+        
+    except Exception as e:
+        logger.error(f"Error in chat endpoint: {str(e)}")
+        return jsonify({
+            "error": "Internal server error",
+            "status": "error"
+        }), 500
+
+def sse_event(payload, event=None):
+    """Format one Server-Sent Events message carrying a JSON payload."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+def stream_reply(user_input, session):
+    """
+    Yield the reply to a message as Server-Sent Events.
+    
+    The message goes through the same router as ``/chat``: answers from the
+    stages before the LLM are sent as a single token, while the LLM stage's
+    tokens are forwarded as they arrive. A final ``done`` event carries the
+    full reply and the session ID.
+    
+    Headers are already sent when the rate limiter decides, so under the
+    "reject" overload policy a shed request ends with an ``error`` event
+    instead of a 429. A stream that breaks after its first token also ends
+    with an ``error`` event, so the partial reply is never reported as the
+    answer; one that fails before any token falls back to the fallback reply.
+    """
+    done = {"session_id": session.session_id, "status": "success"}
+    response = dialogs.handle(session, user_input)
+    if response is not None:
+        yield sse_event({"token": response})
+        yield sse_event({"bot": response, **done}, event="done")
+        return
+    
+    router = get_router()
+    result, stream = router.stream(user_input, history=session.history)
+    if result is not None:
+        yield sse_event({"token": result.text})
+        yield sse_event({"bot": result.text, **done}, event="done")
+        return
+    
+    if stream is not None:
+        tokens = []
+        try:
+            for token in stream:
+                tokens.append(token)
+                yield sse_event({"token": token})
+        except Overloaded as e:
+            if app.config['LLM_OVERLOAD_POLICY'] == 'reject':
+                logger.warning("Shedding chat stream request: %s", e)
+                yield sse_event({"error": "Too many requests", "retry_after": e.retry_after_header,
+                                 "status": "error"}, event="error")
+                return
+            logger.warning("LLM overloaded, answering from the catalog: %s", e)
+        except Exception as e:
+            if tokens:
+                logger.error(f"LLM stream broke off after {len(tokens)} tokens: {str(e)}")
+                yield sse_event({"error": "Reply interrupted", "session_id": session.session_id,
+                                 "status": "error"}, event="error")
+                return
+            logger.warning("LLM stream failed, answering from the catalog: %s", e)
+        if tokens:
+            yield sse_event({"bot": "".join(tokens), **done}, event="done")
+            return
+    
+    response = router.fallback
+    session.record_turn(user_input, response)
+    yield sse_event({"token": response})
+    yield sse_event({"bot": response, **done}, event="done")
+
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Streaming chat endpoint that sends the reply as Server-Sent Events.
+    
     Expected JSON payload:
     {
         "message": "user input string"
     }
     
     Returns:
-        JSON response with chatbot reply
+        text/event-stream of ``{"token": ...}`` events followed by a
+        ``done`` event with the full reply
+    """
+    try:
+        user_input, error = parse_chat_message()
+        if error is not None:
+            return error
+        
+        logger.info("Streaming reply for message: %.50s...", user_input)
+        
+        return Response(stream_with_context(stream_reply(user_input, get_session())),
+                        mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        
+    except Exception as e:
+        logger.error(f"Error in chat stream endpoint: {str(e)}")
+        return jsonify({
+            "error": "Internal server error",
+            "status": "error"
+        }), 500
+
+def process_batch_item(index, user_input):
+    """
+    Process one message of a batch, reporting errors per item.
+    
+    Args:
+        index (int): Position of the message in the batch
+        user_input: The message as sent by the client
+        
+    Returns:
+        dict: The result for this item
+    """
+    if not isinstance(user_input, str) or not user_input:
+        return {"index": index, "error": "Message must be a non-empty string", "status": "error"}
+    
+    screening = chatbot.screen_input(user_input)
+    if screening is not None:
+        return {
+            "index": index,
+            "error": "Message rejected by input screening",
+            "rule": screening.rule,
+            "category": screening.category,
+            "status": "error"
+        }
+    
+    try:
+        return {"index": index, "user": user_input, "bot": chatbot.get_response(user_input), "status": "success"}
+    except Exception as e:
+        logger.error(f"Error processing batch item {index}: {str(e)}")
+        return {"index": index, "error": "Internal server error", "status": "error"}
+
+def stream_batch_results(messages):
+    """
+    Stream the batch response body one result at a time.
+    
+    The body has the same shape as the non-streamed response, but large
+    batches never have to be held in memory as a single payload.
+    """
+    yield '{"results":['
+    for index, user_input in enumerate(messages):
+        if index:
+            yield ','
+        yield json.dumps(process_batch_item(index, user_input))
+    yield '],"count":' + str(len(messages)) + ',"status":"success"}'
+
+@app.route("/chat/batch", methods=["POST"])
+def chat_batch():
+    """
+    Batch chat endpoint for processing many messages in one request.
+    
+    Expected JSON payload:
+    {
+        "messages": ["first message", "second message", ...]
+    }
+    
+    Returns:
+        JSON response with one result per message, in order. Batches larger
+        than BATCH_STREAM_THRESHOLD are streamed.
     """
     try:
-        # Validate request
         if not request.is_json:
             logger.warning("Request is not JSON")
             return jsonify({
                 "error": "Content-Type must be application/json"
             }), 400
         
-        # Get JSON data
         data = request.get_json()
         if not data:
             logger.warning("Empty JSON payload received")
@@ -59,27 +415,35 @@ def chat():
                 "error": "Empty request body"
             }), 400
         
-        # Extract message
-        user_input = data.get("message", "")
-        if not user_input:
-            logger.warning("No message provided in request")
+        messages = data.get("messages")
+        if not isinstance(messages, list) or not messages:
+            logger.warning("No messages provided in batch request")
             return jsonify({
-                "error": "Message field is required"
+                "error": "Messages field must be a non-empty list"
             }), 400
         
-        # Get chatbot response
-        response = chatbot.get_response(user_input)
+        max_batch_size = app.config['MAX_BATCH_SIZE']
+        if len(messages) > max_batch_size:
+            logger.warning(f"Batch of {len(messages)} messages exceeds limit of {max_batch_size}")
+            return jsonify({
+                "error": f"Batch size exceeds maximum of {max_batch_size} messages"
+            }), 413
         
-        logger.info(f"Processed message: {user_input[:50]}...")
+        logger.info("Processing batch of %d messages", len(messages))
         
+        if len(messages) > app.config['BATCH_STREAM_THRESHOLD']:
+            return Response(stream_with_context(stream_batch_results(messages)),
+                            mimetype="application/json")
+        
+        results = [process_batch_item(index, user_input) for index, user_input in enumerate(messages)]
         return jsonify({
-            "user": user_input,
-            "bot": response,
+            "results": results,
+            "count": len(results),
             "status": "success"
         })
         
     except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}")
+        logger.error(f"Error in batch chat endpoint: {str(e)}")
         return jsonify({
             "error": "Internal server error",
             "status": "error"
@@ -87,25 +451,71 @@ def chat():
 
 @app.route("/responses", methods=["GET"])
 def get_responses():
-    """Get all available chatbot responses (for debugging/admin purposes)."""
+    """
+    Get all available chatbot responses (for debugging/admin purposes).
+    
+    The body is serialized once per catalog version and carries an ETag;
+    pollers that send a matching If-None-Match get an empty 304. Tags are
+    compared weakly, so ``W/"..."`` tags from proxies and ``*`` also match.
+    """
     try:
-        responses = chatbot.get_available_responses()
-        return jsonify({
-            "responses": responses,
-            "count": len(responses)
-        })
+        snapshot = chatbot.get_catalog_snapshot()
+        headers = {"ETag": f'"{snapshot.etag}"', "Cache-Control": "no-cache"}
+        if_none_match = request.if_none_match
+        if if_none_match.star_tag or if_none_match.contains_weak(snapshot.etag):
+            return Response(status=304, headers=headers)
+        return Response(snapshot.body, mimetype="application/json", headers=headers)
     except Exception as e:
         logger.error(f"Error getting responses: {str(e)}")
         return jsonify({
             "error": "Internal server error"
         }), 500
 
+@app.route("/sessions", methods=["GET"])
+def get_session_stats():
+    """Get session occupancy statistics (for monitoring/admin purposes)."""
+    return jsonify(sessions.stats())
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Serve request, chatbot and LLM metrics in the Prometheus text format."""
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+@app.route("/admin/reload", methods=["POST"])
+def reload_catalog():
+    """
+    Reload the response catalog from its file (for admin purposes).
+    
+    The reload runs in the background and the reply is a 202. With
+    ``{"wait": true}`` in the JSON body the reply waits for the outcome
+    instead. Requires the X-Admin-Token header to match ADMIN_TOKEN; without
+    ADMIN_TOKEN the endpoint is disabled and replies 404.
+    """
+    if not admin_enabled():
+        return jsonify({"error": "Admin endpoints are disabled", "status": "error"}), 404
+    if catalog_reloader is None:
+        return jsonify({"error": "No catalog file configured", "status": "error"}), 404
+    if not admin_token_matches(request.headers.get("X-Admin-Token")):
+        return jsonify({"error": "Invalid admin token", "status": "error"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    if isinstance(data, dict) and data.get("wait"):
+        result = catalog_reloader.reload()
+        return jsonify(reload_payload(result)), 200 if result.ok else 422
+    
+    started = catalog_reloader.request_reload()
+    return jsonify({"status": "reloading" if started else "queued", "version": chatbot.version}), 202
+
+def reload_payload(result):
+    """JSON body describing a finished reload."""
+    return dict(result._asdict(), status="success" if result.ok else "error")
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
     return jsonify({
         "error": "Endpoint not found",
-        "available_endpoints": ["/chat", "/health", "/responses"]
+        "available_endpoints": ["/admin/reload", "/chat", "/chat/batch", "/chat/stream", "/health", "/metrics", "/responses", "/sessions"]
     }), 404
 
 @app.errorhandler(405)
@@ -0,0 +1,403 @@
+"""
+ASGI Web Application for Goldman Sachs Contact Center AI
+========================================================
+
+This module provides an asyncio-native serving mode for the contact center
+chatbot. It exposes the same ``/chat``, ``/health`` and ``/responses``
+contract as the Flask app in ``app.py``, but replies from the AI chatbot are
+awaited instead of holding a worker thread, so one process can keep
+thousands of conversations in flight.
+
+Run it with any ASGI server, for example:
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import List, Optional
+
+from ai_chatbot import ai_chatbot_from_env
+from async_logging import configure_from_env
+from catalog_reload import CatalogReloader, admin_enabled, admin_token_matches, reloader_from_env
+from chatbot_core import FALLBACK_RESPONSE, ChatbotCore, chatbot
+from dialog_flow import DialogEngine, dialog_engine_from_env
+from metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, registry
+from rate_limiter import Overloaded
+from retrieval import load_retriever_from_env
+from router import build_router
+from session_manager import SessionManager
+
+# Configure logging (LOG_MODE=async moves formatting and I/O off the request thread)
+logging.basicConfig(level=logging.INFO)
+configure_from_env()
+logger = logging.getLogger(__name__)
+
+SERVICE_INFO = {
+    "status": "healthy",
+    "service": "Goldman Sachs Contact Center AI",
+    "version": "1.0.0"
+}
+
+CORS_HEADERS = [(b"access-control-allow-origin", b"*")]
+
+
+class ChatASGIApp:
+    """
+    Minimal ASGI application serving the chat API.
+    """
+
+    def __init__(self, core: ChatbotCore = chatbot, ai_chatbot=None,
+                 sessions: Optional[SessionManager] = None, reloader: Optional[CatalogReloader] = None,
+                 overload_policy: Optional[str] = None, deadline: Optional[float] = None,
+                 race_catalog: Optional[bool] = None, dialogs: Optional[DialogEngine] = None):
+        """
+        Initialize the application.
+
+        Args:
+            core (ChatbotCore): Chatbot used for predefined responses
+            ai_chatbot: Optional AIChatbot awaited when nothing predefined matches
+            sessions (Optional[SessionManager]): Per-customer conversation state
+            reloader (Optional[CatalogReloader]): Reloads the catalog on POST /admin/reload
+            overload_policy (Optional[str]): "fallback" answers from ``core`` when the AI
+                chatbot's rate limiter sheds a request, "reject" returns 429; defaults to
+                ``LLM_OVERLOAD_POLICY`` or "fallback"
+            deadline (Optional[float]): Seconds to wait for the AI chatbot before answering
+                from ``core``; defaults to ``LLM_DEADLINE``, with 0 meaning no deadline
+            race_catalog (Optional[bool]): Start the AI chatbot's call alongside the knowledge
+                base lookup once the catalog misses; defaults to ``LLM_RACE_CATALOG``
+            dialogs (Optional[DialogEngine]): Multi-step flows answered before the router;
+                defaults to the flows in ``DIALOG_FLOWS_PATH`` or the banking flows
+        """
+        self.core = core
+        self.ai_chatbot = ai_chatbot
+        self.reloader = reloader
+        self.overload_policy = overload_policy or os.getenv('LLM_OVERLOAD_POLICY', 'fallback')
+        if deadline is None:
+            deadline = float(os.getenv('LLM_DEADLINE', 0))
+        self.deadline = deadline or None
+        if race_catalog is None:
+            race_catalog = os.getenv('LLM_RACE_CATALOG', 'false').lower() == 'true'
+        self.race_catalog = race_catalog
+        self.dialogs = dialogs or dialog_engine_from_env()
+        self.router = build_router(core, ai_chatbot, self.deadline, race_catalog, name="asgi")
+        self.sessions = sessions or SessionManager(
+            max_sessions=int(os.getenv('SESSION_MAX', 10000)),
+            idle_timeout=float(os.getenv('SESSION_IDLE_TIMEOUT', 1800))
+        )
+        self.routes = {
+            "/health": ("GET", self.health_check),
+            "/chat": ("POST", self.chat),
+            "/responses": ("GET", self.get_responses),
+            "/sessions": ("GET", self.get_session_stats),
+            "/metrics": ("GET", self.get_metrics),
+            "/admin/reload": ("POST", self.reload_catalog),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        route = self.routes.get(scope["path"])
+        route_label = scope["path"] if route is not None else "unmatched"
+        started = time.perf_counter()
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(route_label)
+        in_flight.inc()
+        try:
+            status = await self._dispatch(scope, receive, send, method, route)
+        finally:
+            in_flight.dec()
+        HTTP_REQUEST_SECONDS.labels(route_label, method, status).observe(time.perf_counter() - started)
+
+    async def _dispatch(self, scope, receive, send, method: str, route) -> int:
+        """Run the matched handler, send its response and return the status."""
+        headers = []
+        if route is None:
+            status, payload = 404, {
+                "error": "Endpoint not found",
+                "available_endpoints": list(self.routes)
+            }
+        elif method == "OPTIONS":
+            await self._send_preflight(send, route[0])
+            return 200
+        elif method != route[0]:
+            status, payload = 405, {"error": "Method not allowed"}
+        else:
+            try:
+                status, payload, *headers = await route[1](scope, receive)
+            except Exception as e:
+                logger.error(f"Error handling {scope['path']}: {str(e)}")
+                status, payload = 500, {
+                    "error": "Internal server error",
+                    "status": "error"
+                }
+
+        await self._send_json(send, status, payload, *headers)
+        return status
+
+    async def health_check(self, scope, receive):
+        """Health check endpoint for monitoring."""
+        return 200, SERVICE_INFO
+
+    async def chat(self, scope, receive):
+        """
+        Main chat endpoint for processing user messages.
+
+        Expected JSON payload:
+        {
+            "message": "user input string",
+            "session_id": "optional session ID from an earlier reply"
+        }
+        """
+        if not _is_json(scope):
+            logger.warning("Request is not JSON")
+            return 400, {"error": "Content-Type must be application/json"}
+
+        body = await _read_body(receive)
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            return 400, {"error": "Invalid JSON body"}
+        if not data:
+            logger.warning("Empty JSON payload received")
+            return 400, {"error": "Empty request body"}
+
+        user_input = data.get("message", "") if isinstance(data, dict) else ""
+        if not user_input:
+            logger.warning("No message provided in request")
+            return 400, {"error": "Message field is required"}
+
+        screening = self.core.screen_input(user_input)
+        if screening is not None:
+            logger.warning("Message rejected by screening rule: %s", screening.rule)
+            return 400, {
+                "error": "Message rejected by input screening",
+                "rule": screening.rule,
+                "category": screening.category
+            }
+
+        session = self.sessions.get_or_create(data.get("session_id") or _header(scope, b"x-session-id"))
+        response = self.dialogs.handle(session, user_input)
+        if response is None:
+            try:
+                response = (await self.router.route_async(user_input, history=session.history)).text
+            except Overloaded as e:
+                if self.overload_policy == 'reject':
+                    logger.warning("Shedding chat request: %s", e)
+                    return 429, {
+                        "error": "Too many requests",
+                        "retry_after": e.retry_after_header,
+                        "status": "error"
+                    }, [(b"retry-after", e.retry_after_header.encode("ascii"))]
+                logger.warning("LLM overloaded, answering from the catalog: %s", e)
+                response = FALLBACK_RESPONSE
+                session.record_turn(user_input, response)
+
+        return 200, {
+            "user": user_input,
+            "bot": response,
+            "session_id": session.session_id,
+            "status": "success"
+        }
+
+    async def get_responses(self, scope, receive):
+        """
+        Get all available chatbot responses (for debugging/admin purposes).
+
+        Serves the per-version serialized catalog with an ETag, and an empty
+        304 when If-None-Match matches, comparing tags weakly.
+        """
+        snapshot = self.core.get_catalog_snapshot()
+        etag = f'"{snapshot.etag}"'
+        headers = [(b"etag", etag.encode("ascii")), (b"cache-control", b"no-cache")]
+        if_none_match = _header(scope, b"if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or
+                              etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))):
+            return 304, None, headers
+        return 200, snapshot.body, headers
+
+    async def get_session_stats(self, scope, receive):
+        """Get session occupancy statistics (for monitoring/admin purposes)."""
+        return 200, self.sessions.stats()
+
+    async def get_metrics(self, scope, receive):
+        """Serve request, chatbot and LLM metrics in the Prometheus text format."""
+        return 200, registry.render().encode("utf-8"), [(b"content-type", CONTENT_TYPE.encode("ascii"))]
+
+    async def reload_catalog(self, scope, receive):
+        """
+        Reload the response catalog from its file (for admin purposes).
+
+        Replies 202 while the reload runs in the background, or waits for the
+        outcome when the JSON body has ``"wait": true``. The build runs on a
+        worker thread either way, never on the event loop. Requires the
+        X-Admin-Token header to match ADMIN_TOKEN; without ADMIN_TOKEN the
+        endpoint is disabled and replies 404.
+        """
+        if not admin_enabled():
+            return 404, {"error": "Admin endpoints are disabled", "status": "error"}
+        if self.reloader is None:
+            return 404, {"error": "No catalog file configured", "status": "error"}
+        if not admin_token_matches(_header(scope, b"x-admin-token")):
+            return 403, {"error": "Invalid admin token", "status": "error"}
+
+        body = await _read_body(receive)
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "Invalid JSON body"}
+        if isinstance(data, dict) and data.get("wait"):
+            result = await asyncio.get_running_loop().run_in_executor(None, self.reloader.reload)
+            return (200 if result.ok else 422), dict(result._asdict(), status="success" if result.ok else "error")
+
+        started = self.reloader.request_reload()
+        return 202, {"status": "reloading" if started else "queued", "version": self.core.version}
+
+    async def _lifespan(self, receive, send):
+        """Acknowledge ASGI lifespan events, closing the AI chatbot on shutdown."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                logger.info("ASGI chat service starting up")
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.ai_chatbot is not None:
+                    self.ai_chatbot.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _send_json(self, send, status: int, payload, headers: Optional[List[tuple]] = None):
+        """
+        Send a JSON response; the payload may be a dict, pre-encoded bytes or None.
+
+        A content-type in ``headers`` replaces the JSON one for other bodies.
+        """
+        if payload is None:
+            body = b""
+        elif isinstance(payload, bytes):
+            body = payload
+        else:
+            body = json.dumps(payload).encode("utf-8")
+        headers = headers or []
+        content_type = [] if any(name == b"content-type" for name, _ in headers) else [
+            (b"content-type", b"application/json")]
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": content_type + [
+                (b"content-length", str(len(body)).encode("ascii")),
+            ] + CORS_HEADERS + headers,
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _send_preflight(self, send, allowed_method: str):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"access-control-allow-methods", allowed_method.encode("ascii")),
+                (b"access-control-allow-headers", b"content-type"),
+                (b"content-length", b"0"),
+            ] + CORS_HEADERS,
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    """Get a request header value by lowercase name."""
+    for header, value in scope.get("headers", []):
+        if header == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_json(scope) -> bool:
+    """Check whether the request declares a JSON body."""
+    content_type = _header(scope, b"content-type")
+    return content_type is not None and content_type.split(";")[0].strip().lower() == "application/json"
+
+
+async def _read_body(receive) -> bytes:
+    """Read the full request body from the ASGI receive channel."""
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def call_app(app, method: str, path: str, payload: Optional[dict] = None,
+                   headers: Optional[List[tuple]] = None):
+    """
+    Call an ASGI application in-process and collect its response.
+
+    Used by tests and benchmarks in place of a real ASGI server.
+
+    Args:
+        app: The ASGI application
+        method (str): HTTP method
+        path (str): Request path
+        payload (Optional[dict]): JSON body to send
+        headers (Optional[List[tuple]]): Extra raw (name, value) header pairs
+
+    Returns:
+        tuple: (status, headers, body bytes)
+    """
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    request_headers = [(b"content-type", b"application/json")] if payload is not None else []
+    request_headers.extend(headers or [])
+    scope = {"type": "http", "method": method, "path": path, "headers": request_headers}
+    received = False
+    response = {"status": None, "headers": [], "chunks": []}
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["chunks"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], b"".join(response["chunks"])
+
+
+# Optional catalog file, reloaded when it changes or on POST /admin/reload
+catalog_reloader = reloader_from_env(chatbot)
+
+# Optional FAQ knowledge base searched before the fallback reply
+if chatbot.retriever is None:
+    chatbot.retriever = load_retriever_from_env()
+
+# Optional AI chatbot, built when OPENAI_API_KEY or OPENAI_BASE_URL is set
+app = ChatASGIApp(ai_chatbot=ai_chatbot_from_env(), reloader=catalog_reloader)
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ uvicorn package not found!")
+        print("Please install it with: pip install -r requirements_asgi.txt")
+        raise SystemExit(1)
+
+    port = int(os.getenv('PORT', 5000))
+    host = os.getenv('HOST', '0.0.0.0')
+
+    logger.info(f"Starting Goldman Sachs Contact Center AI (ASGI) on {host}:{port}")
+    uvicorn.run(app, host=host, port=port)
@@ -0,0 +1,150 @@
+"""
+Async Logging Module for Goldman Sachs Contact Center AI
+========================================================
+
+This module provides an off-thread logging mode for the request hot path.
+Records are put on a bounded in-memory queue without being formatted, and a
+background thread formats them as structured JSON lines and writes them
+out. High-volume INFO records can be sampled, and if the queue is ever full
+records are dropped (and counted) rather than blocking the request thread.
+
+Enable it in the web apps with ``LOG_MODE=async`` (and optionally
+``LOG_SAMPLE_RATE=N`` to keep one in N INFO records).
+"""
+
+import atexit
+import functools
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    The standard ``QueueHandler.prepare`` formats the message on the calling
+    thread; this one enqueues the record untouched and never blocks.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in ``rate`` records below WARNING; WARNING and above always pass.
+    """
+
+    def __init__(self, rate: int = 1):
+        super().__init__()
+        self.rate = max(1, rate)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate == 1:
+            return True
+        return next(self._counter) % self.rate == 0
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_async_logging(level: int = logging.INFO, sample_rate: int = 1,
+                            queue_size: int = 10000, stream: Optional[TextIO] = None,
+                            handler: Optional[logging.Handler] = None) -> QueueListener:
+    """
+    Route all logging through a background writer thread.
+
+    Replaces the root logger's handlers with a non-blocking queue handler and
+    starts a listener that formats and writes records off the request thread.
+
+    Args:
+        level (int): Root logging level
+        sample_rate (int): Keep one in this many records below WARNING
+        queue_size (int): Maximum records waiting to be written
+        stream (Optional[TextIO]): Output stream for the default handler (stderr)
+        handler (Optional[logging.Handler]): Output handler to use instead of a stream
+
+    Returns:
+        QueueListener: The started listener; call ``stop()`` to flush and stop it
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+
+    if handler is None:
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(StructuredFormatter())
+
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    os.register_at_fork(after_in_child=functools.partial(_restart_listener, listener))
+    return listener
+
+
+def _stop_listener(listener: QueueListener):
+    """Flush and stop a listener unless it was already stopped."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def _restart_listener(listener: QueueListener):
+    """Start a forked worker's own writer thread if the parent's was running."""
+    if listener._thread is not None:
+        listener._thread = None
+        listener.start()
+
+
+def configure_from_env() -> Optional[QueueListener]:
+    """
+    Enable async logging when ``LOG_MODE=async`` is set.
+
+    Returns:
+        Optional[QueueListener]: The listener, or None if async logging is off
+    """
+    if os.getenv('LOG_MODE', '').lower() != 'async':
+        return None
+    return configure_async_logging(sample_rate=int(os.getenv('LOG_SAMPLE_RATE', 1)))
@@ -0,0 +1,8 @@
+"""
+Benchmarks for Goldman Sachs Contact Center AI
+==============================================
+
+Run individual benchmarks from the repository root, for example:
+
+    python -m benchmarks.bench_serving
+"""
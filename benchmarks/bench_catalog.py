@@ -0,0 +1,84 @@
+"""
+Catalog Loading Benchmark
+=========================
+
+Compares starting up from a JSON catalog (parse, then build the catalog and
+its keyword matcher) with opening a precompiled, memory-mapped catalog file,
+and measures exact and keyword lookups against each.
+
+    python -m benchmarks.bench_catalog --sizes 10000,200000
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.common import format_summary, summarize
+from catalog_store import MappedResponses, write_catalog
+from response_catalog import ResponseCatalog
+
+
+def timed(func):
+    """Call ``func`` once and return its result and the seconds it took."""
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def measure_lookups(catalog: ResponseCatalog, message: str, count: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(count):
+        call_started = time.perf_counter()
+        catalog.lookup(message, fuzzy=False)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,200000", help="Comma-separated catalog sizes")
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups per measurement")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(part) for part in args.sizes.split(",") if part):
+            responses = {"service code {}".format(i): "Details for service code {}.".format(i)
+                         for i in range(size)}
+            json_path = os.path.join(directory, "catalog.json")
+            catalog_path = os.path.join(directory, "catalog.gscat")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(responses, f)
+            _, build_seconds = timed(lambda: write_catalog(responses, catalog_path))
+
+            def load_json():
+                with open(json_path, encoding="utf-8") as f:
+                    return ResponseCatalog(json.load(f))
+
+            from_json, json_seconds = timed(load_json)
+            mapped, open_seconds = timed(lambda: ResponseCatalog(MappedResponses(catalog_path), lazy=True))
+            keyword = "i need service code {} please".format(size // 2)
+            _, matcher_seconds = timed(lambda: mapped.lookup(keyword, fuzzy=False))
+
+            print("{} entries ({:.1f} MB file, compiled in {:.2f} s)".format(
+                size, os.path.getsize(catalog_path) / 1e6, build_seconds))
+            print("  startup: JSON + build {:.1f} ms, mapped open {:.3f} ms, "
+                  "first keyword lookup (matcher build) {:.1f} ms".format(
+                      json_seconds * 1e3, open_seconds * 1e3, matcher_seconds * 1e3))
+
+            exact = "service code {}".format(size // 3)
+            for name, catalog in (("json", from_json), ("mapped", mapped)):
+                print(format_summary("  {} exact lookup".format(name),
+                                     measure_lookups(catalog, exact, args.lookups)))
+                print(format_summary("  {} keyword lookup".format(name),
+                                     measure_lookups(catalog, keyword, args.lookups)))
+            mapped.responses.close()
+
+
+if __name__ == "__main__":
+    main()
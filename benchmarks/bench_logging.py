@@ -0,0 +1,104 @@
+"""
+Logging Overhead Benchmark
+==========================
+
+Measures the per-request cost of logging on the Flask /chat route with
+logging off, with synchronous writes on the request thread, and with the
+off-thread async logging mode (with and without INFO sampling).
+``--sink-delay-ms`` simulates a slow log sink (a full pipe or a remote log
+shipper) by blocking in every write.
+
+    python -m benchmarks.bench_logging --requests 5000 --sink-delay-ms 0.2
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from app import app
+from async_logging import StructuredFormatter, configure_async_logging
+from benchmarks.common import format_summary, summarize
+
+MESSAGES = [{"message": "hello"}, {"message": "I need a loan"}, {"message": "what are your hours"}]
+
+
+class SlowFileHandler(logging.FileHandler):
+    """File handler that blocks for a fixed time on every write."""
+
+    def __init__(self, filename: str, delay: float):
+        super().__init__(filename)
+        self.delay = delay
+
+    def emit(self, record: logging.LogRecord):
+        if self.delay:
+            time.sleep(self.delay)
+        super().emit(record)
+
+
+def run_requests(client, requests: int) -> dict:
+    """Send /chat requests and summarize their latencies."""
+    latencies = []
+    started = time.perf_counter()
+    for i in range(requests):
+        request_started = time.perf_counter()
+        client.post("/chat", json=MESSAGES[i % len(MESSAGES)])
+        latencies.append(time.perf_counter() - request_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def reset_root_logging():
+    """Remove every root handler and re-enable logging."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.INFO)
+    logging.disable(logging.NOTSET)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per logging mode")
+    parser.add_argument("--sample-rate", type=int, default=10, help="INFO sampling rate for the sampled mode")
+    parser.add_argument("--sink-delay-ms", type=float, default=0.0, help="Simulated blocking time per log write")
+    args = parser.parse_args()
+    delay = args.sink_delay_ms / 1000
+
+    client = app.test_client()
+    log_dir = tempfile.mkdtemp(prefix="bench_logging_")
+    results = {}
+
+    # Warm up routing, JSON and the catalog before measuring
+    logging.disable(logging.CRITICAL)
+    run_requests(client, 200)
+
+    results["off"] = run_requests(client, args.requests)
+
+    reset_root_logging()
+    sync_handler = SlowFileHandler(os.path.join(log_dir, "sync.log"), delay)
+    sync_handler.setFormatter(StructuredFormatter())
+    logging.getLogger().addHandler(sync_handler)
+    results["sync"] = run_requests(client, args.requests)
+
+    for name, sample_rate in [("async", 1), ("async sampled 1/{}".format(args.sample_rate), args.sample_rate)]:
+        reset_root_logging()
+        filename = name.replace(" ", "_").replace("/", "-") + ".log"
+        handler = SlowFileHandler(os.path.join(log_dir, filename), delay)
+        handler.setFormatter(StructuredFormatter())
+        listener = configure_async_logging(sample_rate=sample_rate, handler=handler)
+        results[name] = run_requests(client, args.requests)
+        listener.stop()
+
+    reset_root_logging()
+    baseline_us = 1e6 / results["off"]["ops_per_sec"]
+    for name, summary in results.items():
+        per_request_us = 1e6 / summary["ops_per_sec"]
+        print(format_summary("logging " + name, summary) +
+              "   overhead {:>7.1f} us/request".format(per_request_us - baseline_us))
+    print("Log files written to {}".format(log_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Micro-Benchmark Suite
+=====================
+
+Measures ``ChatbotCore.get_response``, ``ChatbotCore.validate_input`` and the
+Flask ``/chat`` route at several catalog sizes and message lengths, plus the
+OpenAI-backed bots against a local stub LLM with a fixed latency.
+
+Each case runs for a fixed time and reports ops/sec and p50/p99. Results are
+compared with the committed ``benchmarks/baseline.json`` unless another
+baseline or ``--no-baseline`` is given; regressions are listed and, with
+``--fail-on-regression``, make the run exit non-zero. The committed baseline
+was recorded on one machine, so re-record it before comparing on another.
+
+    python -m benchmarks.bench_micro --output results.json
+    python -m benchmarks.bench_micro --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import openai_chatbot
+from ai_chatbot import AIChatbot
+from app import app as flask_app
+from benchmarks.common import find_regressions, format_summary, load_results, save_results, summarize
+from chatbot_core import ChatbotCore, chatbot
+from llm_stub import StubOpenAI
+
+# Text that matches no trigger, used to pad messages to the requested length
+FILLER = "please tell me a little more about the options that might suit me "
+
+# Baseline compared with by default
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+Case = Tuple[str, Callable[[], object]]
+
+
+def build_catalog(size: int) -> Dict[str, str]:
+    """Build a catalog of ``size`` entries: the defaults plus synthetic ones."""
+    responses = ChatbotCore().get_available_responses()
+    for i in range(max(0, size - len(responses))):
+        responses["service code {}".format(i)] = "Details for service code {}.".format(i)
+    return responses
+
+
+def build_message(length: int, trigger: str = "") -> str:
+    """Pad a message to ``length`` characters, ending with ``trigger`` if given."""
+    suffix = " " + trigger if trigger else ""
+    padding = (FILLER * (length // len(FILLER) + 1))[:max(0, length - len(suffix))]
+    return (padding.rstrip() + suffix).strip()
+
+
+def run_case(func: Callable[[], object], duration: float, min_ops: int = 20) -> Dict[str, float]:
+    """Call ``func`` repeatedly for ``duration`` seconds and summarize the latencies."""
+    for _ in range(min(50, min_ops)):
+        func()
+
+    latencies = []
+    clock = time.perf_counter
+    started = clock()
+    deadline = started + duration
+    while True:
+        call_started = clock()
+        func()
+        finished = clock()
+        latencies.append(finished - call_started)
+        if finished >= deadline and len(latencies) >= min_ops:
+            break
+    return summarize(latencies, clock() - started)
+
+
+def core_cases(sizes: List[int], lengths: List[int]) -> List[Case]:
+    """Cases that call ChatbotCore directly."""
+    cases = []
+    for length in lengths:
+        message = build_message(length, "loan")
+        cases.append(("validate_input len={}".format(length),
+                      lambda core=chatbot, message=message: core.validate_input(message)))
+
+    for size in sizes:
+        core = ChatbotCore()
+        core.replace_responses(build_catalog(size))
+        cases.append(("get_response exact catalog={}".format(size),
+                      lambda core=core: core.get_response("hello")))
+        for length in lengths:
+            hit = build_message(length, "service code {}".format(size - 6) if size > 5 else "loan")
+            miss = build_message(length)
+            cases.append(("get_response hit catalog={} len={}".format(size, length),
+                          lambda core=core, message=hit: core.get_response(message)))
+            cases.append(("get_response miss catalog={} len={}".format(size, length),
+                          lambda core=core, message=miss: core.get_response(message)))
+            typo = build_message(length, "acount")
+            cases.append(("get_response typo catalog={} len={}".format(size, length),
+                          lambda core=core, message=typo: core.get_response(message)))
+    return cases
+
+
+def flask_cases(sizes: List[int], lengths: List[int],
+                llm_latency: float) -> List[Tuple[str, dict, Optional[AIChatbot], Callable]]:
+    """
+    Cases that go through the Flask test client, each with the catalog and AI chatbot to serve.
+
+    The AI chatbot is configured once per case, since changing it rebuilds the app's router.
+    """
+    client = flask_app.test_client()
+
+    def poster(payload):
+        def post():
+            response = client.post("/chat", json=payload)
+            assert response.status_code == 200, response.status_code
+        return post
+
+    cases = []
+    for size in sizes:
+        catalog = build_catalog(size)
+        for length in lengths:
+            cases.append(("flask /chat hit catalog={} len={}".format(size, length), catalog, None,
+                          poster({"message": build_message(length, "loan")})))
+            cases.append(("flask /chat miss catalog={} len={}".format(size, length), catalog, None,
+                          poster({"message": build_message(length)})))
+
+    stub_ai = AIChatbot(client=StubOpenAI(latency=llm_latency))
+    cases.append(("flask /chat llm fallback", build_catalog(0), stub_ai, poster({"message": build_message(64)})))
+    return cases
+
+
+def llm_cases(llm_latency: float) -> List[Case]:
+    """Cases for the OpenAI-backed bots against the stub LLM."""
+    message = build_message(64)
+    ai_bot = AIChatbot(client=StubOpenAI(latency=llm_latency))
+    openai_client = StubOpenAI(latency=llm_latency)
+
+    def openai_chatbot_response():
+        openai_chatbot.client = openai_client
+        return openai_chatbot.get_openai_response(message)
+
+    return [
+        ("ai_chatbot get_ai_response", lambda: ai_bot.get_ai_response(message)),
+        ("openai_chatbot get_openai_response", openai_chatbot_response),
+    ]
+
+
+def run_suite(args) -> Dict[str, Dict[str, float]]:
+    """Run every selected case and print a line per result."""
+    results = {}
+
+    def record(name, func, duration):
+        if args.filter and args.filter not in name:
+            return
+        summary = run_case(func, duration)
+        results[name] = summary
+        print(format_summary(name, summary))
+
+    for name, func in core_cases(args.catalog_sizes, args.message_lengths):
+        record(name, func, args.duration)
+
+    llm_duration = max(args.duration, 20 * args.llm_latency)
+    original = chatbot.get_available_responses()
+    serving = None
+    try:
+        for name, catalog, ai_chatbot, func in flask_cases(args.catalog_sizes, args.message_lengths,
+                                                           args.llm_latency):
+            if catalog is not serving:
+                chatbot.replace_responses(catalog)
+                serving = catalog
+            flask_app.config['AI_CHATBOT'] = ai_chatbot
+            record(name, func, llm_duration if "llm" in name else args.duration)
+    finally:
+        chatbot.replace_responses(original)
+        flask_app.config['AI_CHATBOT'] = None
+
+    for name, func in llm_cases(args.llm_latency):
+        record(name, func, llm_duration)
+    return results
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog-sizes", type=parse_sizes, default=[5, 1000, 10000],
+                        help="Comma-separated catalog sizes")
+    parser.add_argument("--message-lengths", type=parse_sizes, default=[16, 200, 1000],
+                        help="Comma-separated message lengths in characters")
+    parser.add_argument("--duration", type=float, default=0.3, help="Seconds to run each case")
+    parser.add_argument("--llm-latency", type=float, default=0.005, help="Stub LLM latency in seconds")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Compare with the results in this JSON file (default: benchmarks/baseline.json)")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the baseline comparison")
+    parser.add_argument("--save-baseline", help="Write the results as the baseline to this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed fractional drop in ops/sec before flagging a regression")
+    parser.add_argument("--p99-threshold", type=float, default=0.5,
+                        help="Allowed fractional rise in p99 before flagging a regression")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 if any regression is found")
+    args = parser.parse_args()
+
+    # Keep request logging out of the measurements
+    logging.disable(logging.INFO)
+
+    results = run_suite(args)
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.save_baseline, results)
+        print("Baseline written to {}".format(args.save_baseline))
+
+    if args.no_baseline or args.save_baseline:
+        return
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline at {}; record one with --save-baseline".format(args.baseline))
+        return
+    regressions = find_regressions(results, load_results(args.baseline),
+                                   args.threshold, args.p99_threshold)
+    if regressions:
+        print("\n{} regression(s) against {}:".format(len(regressions), args.baseline))
+        for line in regressions:
+            print("  REGRESSION " + line)
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("\nNo regressions against {}".format(args.baseline))
+
+
+if __name__ == "__main__":
+    main()
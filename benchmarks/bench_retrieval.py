@@ -0,0 +1,97 @@
+"""
+Knowledge Base Retrieval Benchmark
+==================================
+
+Measures TF-IDF index build time and query latency on synthetic FAQ corpora
+(10k and 100k articles by default), for single queries and for batches.
+Needs the optional retrieval dependencies (requirements_retrieval.txt).
+
+    python -m benchmarks.bench_retrieval --sizes 10000,100000 --queries 1000 --batch-size 64
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks.common import format_summary, summarize
+from retrieval import TfidfRetriever
+
+# Seed words for the synthetic vocabulary; the rest are generated
+BANKING_WORDS = ("account balance card credit debit loan mortgage rate fee wire transfer dispute "
+                 "statement password login branch hours deposit check savings interest payment").split()
+
+
+def build_vocabulary(size: int, rng: random.Random) -> list:
+    """Banking words plus generated words, most common first."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = list(BANKING_WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def build_corpus(documents: int, vocabulary: list, rng: random.Random) -> list:
+    """Generate (question, answer) articles with Zipf-distributed words."""
+    # Cumulative weights keep rng.choices from re-summing the weights per call
+    cum_weights = list(itertools.accumulate(1.0 / rank for rank in range(1, len(vocabulary) + 1)))
+
+    def text(length):
+        return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=length))
+
+    return [(text(rng.randint(6, 12)) + "?", text(rng.randint(25, 60))) for _ in range(documents)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--vocabulary", type=int, default=30000, help="Distinct words in the corpus")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries per measurement")
+    parser.add_argument("--batch-size", type=int, default=64, help="Queries per batch")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = build_vocabulary(args.vocabulary, rng)
+
+    for size in (int(part) for part in args.sizes.split(",") if part):
+        corpus = build_corpus(size, vocabulary, rng)
+        # Queries are partial questions from the corpus, with a little noise
+        queries = []
+        for _ in range(args.queries):
+            words = rng.choice(corpus)[0].rstrip("?").split()
+            queries.append(" ".join(words[:rng.randint(3, len(words))] + [rng.choice(vocabulary)]))
+
+        started = time.perf_counter()
+        retriever = TfidfRetriever(corpus)
+        build_seconds = time.perf_counter() - started
+        print("{} articles: index built in {:.2f} s ({} terms, {} non-zeros)".format(
+            size, build_seconds, len(retriever.vocabulary), retriever._matrix_t.nnz))
+
+        latencies = []
+        started = time.perf_counter()
+        for query in queries:
+            query_started = time.perf_counter()
+            retriever.search(query, args.k)
+            latencies.append(time.perf_counter() - query_started)
+        print(format_summary("  single query (top {})".format(args.k),
+                             summarize(latencies, time.perf_counter() - started)))
+
+        latencies = []
+        started = time.perf_counter()
+        for offset in range(0, len(queries), args.batch_size):
+            batch = queries[offset:offset + args.batch_size]
+            batch_started = time.perf_counter()
+            retriever.search_batch(batch, args.k)
+            # Every query in the batch waits for the whole batch
+            latencies.extend([time.perf_counter() - batch_started] * len(batch))
+        print(format_summary("  batched x{} (top {})".format(args.batch_size, args.k),
+                             summarize(latencies, time.perf_counter() - started)))
+
+
+if __name__ == "__main__":
+    main()
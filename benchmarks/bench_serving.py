@@ -0,0 +1,98 @@
+"""
+Serving Mode Benchmark
+======================
+
+Compares the threaded Flask app with the asyncio-native ASGI app when every
+reply waits on an LLM call. Both paths use a local fake LLM with a
+configurable latency, so no network access or API key is needed.
+
+Every request sends the same message. By default each one still makes its
+own LLM call; ``--coalesce`` lets identical concurrent requests share one,
+as during a burst of customers asking about the same outage.
+
+    python -m benchmarks.bench_serving --requests 2000 --concurrency 500 --latency 0.05
+    python -m benchmarks.bench_serving --coalesce
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_chatbot import AIChatbot
+from app import app as flask_app
+from asgi_app import ChatASGIApp, call_app
+from benchmarks.common import format_summary, summarize
+from llm_stub import AsyncStubOpenAI, StubOpenAI
+
+# A message with no predefined response, so every request reaches the LLM
+MESSAGE = {"message": "what are your branch opening hours on public holidays"}
+
+
+def bench_flask(requests: int, workers: int, latency: float, coalesce: bool) -> dict:
+    """Drive the Flask /chat route from a pool of worker threads."""
+    stub = StubOpenAI(latency=latency)
+    flask_app.config['AI_CHATBOT'] = AIChatbot(client=stub, coalesce=coalesce)
+    client = flask_app.test_client()
+    latencies = []
+
+    def one_request(_):
+        started = time.perf_counter()
+        response = client.post("/chat", json=MESSAGE)
+        assert response.status_code == 200
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one_request, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    flask_app.config['AI_CHATBOT'] = None
+    return dict(summarize(latencies, elapsed), llm_calls=stub.calls)
+
+
+async def bench_asgi(requests: int, concurrency: int, latency: float, coalesce: bool) -> dict:
+    """Drive the ASGI /chat route with many concurrent coroutines."""
+    stub = AsyncStubOpenAI(latency=latency)
+    asgi_app = ChatASGIApp(ai_chatbot=AIChatbot(async_client=stub, coalesce=coalesce))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            status, _, _ = await call_app(asgi_app, "POST", "/chat", MESSAGE)
+            assert status == 200
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return dict(summarize(latencies, elapsed), llm_calls=stub.calls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per serving mode")
+    parser.add_argument("--concurrency", type=int, default=500, help="Concurrent ASGI requests")
+    parser.add_argument("--flask-workers", type=int, default=32, help="Worker threads for the Flask path")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency in seconds")
+    parser.add_argument("--coalesce", action="store_true",
+                        help="Share one LLM call among identical concurrent requests")
+    args = parser.parse_args()
+
+    # Keep request logging out of the measurements
+    logging.disable(logging.INFO)
+
+    print("Fake LLM latency: {:.0f} ms, {} requests".format(args.latency * 1000, args.requests))
+    flask_summary = bench_flask(args.requests, args.flask_workers, args.latency, args.coalesce)
+    print(format_summary("flask ({} threads)".format(args.flask_workers), flask_summary),
+          "  LLM calls {}".format(flask_summary["llm_calls"]))
+    asgi_summary = asyncio.run(bench_asgi(args.requests, args.concurrency, args.latency, args.coalesce))
+    print(format_summary("asgi ({} concurrent)".format(args.concurrency), asgi_summary),
+          "  LLM calls {}".format(asgi_summary["llm_calls"]))
+
+
+if __name__ == "__main__":
+    main()
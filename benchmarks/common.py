@@ -0,0 +1,122 @@
+"""
+Shared Benchmark Helpers
+========================
+
+Timing summaries, result files and baseline comparison used by the benchmarks.
+"""
+
+import json
+import platform
+import sys
+import time
+from typing import Dict, List, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Return the q-th percentile of already sorted values (nearest rank).
+    
+    Args:
+        sorted_values (Sequence[float]): Values in ascending order
+        q (float): Percentile between 0 and 100
+        
+    Returns:
+        float: The percentile value, or 0.0 for no values
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """
+    Summarize per-operation latencies (in seconds) measured over a run.
+    
+    Args:
+        latencies (List[float]): Latency of each operation in seconds
+        elapsed (float): Wall-clock duration of the whole run in seconds
+        
+    Returns:
+        Dict[str, float]: Operation count, ops/sec and p50/p99 in milliseconds
+    """
+    ordered = sorted(latencies)
+    return {
+        "ops": len(ordered),
+        "ops_per_sec": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000.0,
+        "p99_ms": percentile(ordered, 99) * 1000.0,
+    }
+
+
+def format_summary(name: str, summary: Dict[str, float]) -> str:
+    """Format a summary as one aligned report line."""
+    return "{:<40} {:>12.1f} ops/s   p50 {:>9.3f} ms   p99 {:>9.3f} ms".format(
+        name, summary["ops_per_sec"], summary["p50_ms"], summary["p99_ms"])
+
+
+def save_results(path: str, results: Dict[str, Dict[str, float]]):
+    """
+    Write benchmark summaries to a JSON file, with details of the machine.
+    
+    Args:
+        path (str): Output file path
+        results (Dict[str, Dict[str, float]]): Summary per benchmark case
+    """
+    document = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Read the benchmark summaries from a file written by ``save_results``.
+    
+    Args:
+        path (str): Results file path
+        
+    Returns:
+        Dict[str, Dict[str, float]]: Summary per benchmark case
+    """
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                     throughput_threshold: float = 0.2,
+                     p99_threshold: float = 0.5) -> List[str]:
+    """
+    Compare results with a baseline and describe every regression.
+    
+    A case regresses when its ops/sec falls by more than
+    ``throughput_threshold`` or its p99 rises by more than ``p99_threshold``
+    (both as fractions of the baseline). Cases missing from either side are
+    ignored.
+    
+    Args:
+        results (Dict[str, Dict[str, float]]): Current summaries
+        baseline (Dict[str, Dict[str, float]]): Baseline summaries
+        throughput_threshold (float): Allowed fractional drop in ops/sec
+        p99_threshold (float): Allowed fractional rise in p99 latency
+        
+    Returns:
+        List[str]: One message per regression; empty if there are none
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["ops_per_sec"] < previous["ops_per_sec"] * (1 - throughput_threshold):
+            regressions.append("{}: ops/sec {:.1f} -> {:.1f} ({:+.0%})".format(
+                name, previous["ops_per_sec"], current["ops_per_sec"],
+                current["ops_per_sec"] / previous["ops_per_sec"] - 1))
+        if previous["p99_ms"] > 0 and current["p99_ms"] > previous["p99_ms"] * (1 + p99_threshold):
+            regressions.append("{}: p99 {:.3f} ms -> {:.3f} ms ({:+.0%})".format(
+                name, previous["p99_ms"], current["p99_ms"], current["p99_ms"] / previous["p99_ms"] - 1))
+    return regressions
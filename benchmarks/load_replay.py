@@ -0,0 +1,369 @@
+"""
+Load Replay Harness
+===================
+
+Replays a JSONL capture of chat traffic against the ``/chat`` API for
+capacity planning. Each line of the capture is one request body, for example
+``{"message": "hello", "session_id": "abc"}``; only the message field is
+required, and ``--field`` names a different one for other JSONL files.
+
+Traffic is driven either at a fixed arrival rate (``--rate``, open loop:
+latency is measured from each request's scheduled send time, so a slow server
+cannot hide its queueing delay) or by a fixed number of concurrent clients
+(``--concurrency`` without ``--rate``, closed loop). Requests go to the Flask
+app in-process, or to a running server with ``--url``.
+
+Every ``--interval`` seconds a line with throughput, error rate and p50/p99 is
+printed; the run ends with a latency histogram and a breakdown of errors.
+
+    python -m benchmarks.load_replay benchmarks/sample_capture.jsonl --rate 200 --duration 30 --loop
+    python -m benchmarks.load_replay capture.jsonl --concurrency 64 --url http://127.0.0.1:5000
+
+In-process runs can answer unmatched messages through the real OpenAI client
+pointed at a local stub server (``python -m llm_stub``) with ``--llm-url``,
+so the HTTP client, retries and streaming are exercised without network
+access:
+
+    python -m llm_stub --latency 0.4 --latency-dist lognormal --rate-limit-rate 0.02 --seed 1 &
+    python -m benchmarks.load_replay benchmarks/sample_capture.jsonl --rate 100 --llm-url http://127.0.0.1:8089/v1
+"""
+
+import argparse
+import bisect
+import http.client
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from benchmarks.common import percentile
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def read_capture(path: str, loop: bool = False, field: str = "message") -> Iterator[dict]:
+    """
+    Stream request bodies from a JSONL capture.
+
+    Blank lines, malformed JSON and lines without the message field are skipped.
+
+    Args:
+        path (str): Capture file path
+        loop (bool): Start over at the end of the file instead of stopping
+        field (str): Name of the field holding the message text
+
+    Yields:
+        dict: One request body per captured request
+    """
+    while True:
+        found = False
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict) or field not in entry:
+                    continue
+                found = True
+                body = {"message": entry[field]}
+                if entry.get("session_id"):
+                    body["session_id"] = entry["session_id"]
+                yield body
+        if not loop or not found:
+            return
+
+
+class InProcessTarget:
+    """Sends requests to the Flask app through one test client per thread."""
+
+    def __init__(self):
+        from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, body: dict) -> int:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client.post("/chat", json=body).status_code
+
+
+class HTTPTarget:
+    """Sends requests to a running server over one keep-alive connection per thread."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.path = (parts.path.rstrip("/") or "") + "/chat"
+        self.connection_class = (http.client.HTTPSConnection if parts.scheme == "https"
+                                 else http.client.HTTPConnection)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def send(self, body: dict) -> int:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self.connection_class(
+                self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request("POST", self.path, body=json.dumps(body),
+                               headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except Exception:
+            connection.close()
+            self._local.connection = None
+            raise
+
+
+class ReplayStats:
+    """
+    Thread-safe collector of request outcomes, bucketed into time windows.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._windows: Dict[int, dict] = {}
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def record(self, latency: float, error: Optional[str] = None):
+        """
+        Record one completed request.
+
+        Args:
+            latency (float): Latency in seconds
+            error (Optional[str]): Error description (status code or exception), or None on success
+        """
+        index = int((time.perf_counter() - self.started) // self.interval)
+        bucket = bisect.bisect_left(HISTOGRAM_BOUNDS_MS, latency * 1000.0)
+        with self._lock:
+            window = self._windows.get(index)
+            if window is None:
+                window = self._windows[index] = {"latencies": [], "errors": 0}
+            window["latencies"].append(latency)
+            self.latencies.append(latency)
+            self.histogram[bucket] += 1
+            if error is not None:
+                window["errors"] += 1
+                self.errors[error] += 1
+
+    def window_summary(self, index: int) -> Optional[dict]:
+        """Summarize one time window, or return None if nothing finished in it."""
+        with self._lock:
+            window = self._windows.get(index)
+            if window is None:
+                return None
+            latencies = sorted(window["latencies"])
+            errors = window["errors"]
+        return {
+            "t": round(index * self.interval, 3),
+            "requests": len(latencies),
+            "throughput": len(latencies) / self.interval,
+            "error_rate": errors / len(latencies),
+            "p50_ms": percentile(latencies, 50) * 1000.0,
+            "p99_ms": percentile(latencies, 99) * 1000.0,
+        }
+
+    def timeline(self) -> List[dict]:
+        """Summaries of every window that saw requests, in time order."""
+        with self._lock:
+            indexes = sorted(self._windows)
+        return [self.window_summary(index) for index in indexes]
+
+    def summary(self, elapsed: float) -> dict:
+        """Overall throughput, error rate, latency percentiles, histogram and errors."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            histogram = list(self.histogram)
+            errors = dict(self.errors)
+        total = len(latencies)
+        return {
+            "requests": total,
+            "elapsed": elapsed,
+            "throughput": total / elapsed if elapsed > 0 else 0.0,
+            "error_rate": sum(errors.values()) / total if total else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000.0,
+            "p90_ms": percentile(latencies, 90) * 1000.0,
+            "p99_ms": percentile(latencies, 99) * 1000.0,
+            "max_ms": latencies[-1] * 1000.0 if latencies else 0.0,
+            "histogram": {label: count for label, count in zip(histogram_labels(), histogram)},
+            "errors": errors,
+        }
+
+
+def histogram_labels() -> List[str]:
+    """Labels of the latency histogram buckets."""
+    labels = ["<= {} ms".format(bound) for bound in HISTOGRAM_BOUNDS_MS]
+    labels.append("> {} ms".format(HISTOGRAM_BOUNDS_MS[-1]))
+    return labels
+
+
+def send_one(target, body: dict, stats: ReplayStats, started: float):
+    """Send one request and record its outcome, timed from ``started``."""
+    error = None
+    try:
+        status = target.send(body)
+        if status >= 400:
+            error = "HTTP {}".format(status)
+    except Exception as e:
+        error = type(e).__name__
+    stats.record(time.perf_counter() - started, error)
+
+
+def run_open_loop(messages: Iterator[dict], target, stats: ReplayStats, rate: float,
+                  workers: int, deadline: float):
+    """Issue requests at a fixed arrival rate, whatever the response times."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        for i, body in enumerate(messages):
+            scheduled = start + i / rate
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send_one, target, body, stats, scheduled)
+
+
+def run_closed_loop(messages: Iterator[dict], target, stats: ReplayStats, concurrency: int,
+                    deadline: float):
+    """Keep ``concurrency`` clients busy, each sending its next request as soon as one returns."""
+    lock = threading.Lock()
+
+    def client():
+        while time.perf_counter() < deadline:
+            with lock:
+                body = next(messages, None)
+            if body is None:
+                return
+            send_one(target, body, stats, time.perf_counter())
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def report_progress(stats: ReplayStats, done: threading.Event):
+    """Print each time window once it has closed, then any left when the run ends."""
+    index = 0
+    while not done.wait(stats.interval / 4):
+        current = int((time.perf_counter() - stats.started) // stats.interval)
+        while index < current:
+            print_window(stats.window_summary(index), index * stats.interval)
+            index += 1
+
+    timeline = stats.timeline()
+    last = int(timeline[-1]["t"] / stats.interval + 0.5) if timeline else -1
+    while index <= last:
+        print_window(stats.window_summary(index), index * stats.interval)
+        index += 1
+
+
+def print_window(window: Optional[dict], t: float):
+    if window is None:
+        print("t={:>7.1f}s  {:>8.1f} req/s".format(t, 0.0))
+        return
+    print("t={:>7.1f}s  {:>8.1f} req/s   errors {:>6.2%}   p50 {:>9.3f} ms   p99 {:>9.3f} ms".format(
+        window["t"], window["throughput"], window["error_rate"], window["p50_ms"], window["p99_ms"]))
+
+
+def print_summary(summary: dict):
+    print("\n{requests} requests in {elapsed:.1f}s: {throughput:.1f} req/s, errors {error_rate:.2%}".format(**summary))
+    print("latency p50 {p50_ms:.3f} ms   p90 {p90_ms:.3f} ms   p99 {p99_ms:.3f} ms   max {max_ms:.3f} ms".format(
+        **summary))
+
+    print("\nLatency histogram:")
+    peak = max(summary["histogram"].values()) or 1
+    for label, count in summary["histogram"].items():
+        print("  {:>12}  {:>8}  {}".format(label, count, "#" * int(40 * count / peak)))
+
+    if summary["errors"]:
+        print("\nErrors:")
+        for error, count in sorted(summary["errors"].items(), key=lambda item: -item[1]):
+            print("  {:<24} {:>8}".format(error, count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="JSONL capture file with one request body per line")
+    parser.add_argument("--field", default="message", help="Field of each line holding the message")
+    parser.add_argument("--rate", type=float, help="Target arrival rate in requests/sec (open loop)")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Concurrent clients (closed loop), or the worker pool size with --rate")
+    parser.add_argument("--duration", type=float, default=60.0, help="Maximum run time in seconds")
+    parser.add_argument("--max-requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--loop", action="store_true", help="Replay the capture again when it runs out")
+    parser.add_argument("--url", help="Base URL of a running server; in-process Flask app if omitted")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout for --url")
+    parser.add_argument("--llm-latency", type=float,
+                        help="In-process only: answer unmatched messages with a stub LLM of this latency")
+    parser.add_argument("--llm-url",
+                        help="In-process only: answer unmatched messages through the OpenAI client at this "
+                             "base URL, e.g. a python -m llm_stub server")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds per reported time window")
+    parser.add_argument("--output", help="Write the timeline and summary to this JSON file")
+    args = parser.parse_args()
+
+    if args.url:
+        target = HTTPTarget(args.url, timeout=args.timeout)
+    else:
+        # Keep request logging (including rejected-input warnings) out of the measurements
+        logging.disable(logging.WARNING)
+        target = InProcessTarget()
+        if args.llm_latency is not None:
+            from ai_chatbot import AIChatbot
+            from llm_stub import StubOpenAI
+            target.app.config['AI_CHATBOT'] = AIChatbot(client=StubOpenAI(latency=args.llm_latency))
+        elif args.llm_url:
+            from ai_chatbot import AIChatbot
+            from llm_client import LLMClientProvider
+            provider = LLMClientProvider(api_key="sk-stub", base_url=args.llm_url)
+            target.app.config['AI_CHATBOT'] = AIChatbot(client=provider.get_client())
+
+    messages = read_capture(args.capture, loop=args.loop, field=args.field)
+    if args.max_requests is not None:
+        messages = itertools.islice(messages, args.max_requests)
+
+    stats = ReplayStats(interval=args.interval)
+    deadline = stats.started + args.duration
+    done = threading.Event()
+    reporter = threading.Thread(target=report_progress, args=(stats, done), daemon=True)
+    reporter.start()
+
+    if args.rate:
+        run_open_loop(messages, target, stats, args.rate, args.concurrency, deadline)
+    else:
+        run_closed_loop(messages, target, stats, args.concurrency, deadline)
+
+    elapsed = time.perf_counter() - stats.started
+    done.set()
+    reporter.join()
+
+    summary = stats.summary(elapsed)
+    print_summary(summary)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"timeline": stats.timeline(), "summary": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,33 @@ A simple chatbot that mimics natural human conversation.
 Responds to greetings, asks how you are, and keeps the chat flowing.
 """
 
+from router import Router, RulesStage
+
+# Conversation rules, checked in order: the first rule with a phrase found
+# in the message wins.
+RULES = [
+    # Greetings
+    (["hi", "hello", "hey", "hiya", "howdy"],
+     "Hey there! Nice to chat with you! 😊"),
+    # "How are you" variations
+    (["how are you", "how are you doing", "how's it going", "how do you do"],
+     "I'm doing great, thanks for asking! How about you?"),
+    # Positive responses about being good/fine
+    (["i am good", "i'm good", "i am fine", "i'm fine", "doing well", "i'm well", "i am well"],
+     "That's awesome! 😊"),
+    # Other positive responses
+    (["good", "great", "awesome", "wonderful", "excellent", "fantastic"],
+     "Glad to hear that! 😊"),
+    # Negative responses
+    (["bad", "terrible", "awful", "not good", "not well", "sad", "tired"],
+     "Oh no, sorry to hear that. Hope things get better soon! 💙"),
+]
+
+# Compiled once so each message is scanned in a single pass. Phrases match
+# anywhere in the message, and the rule index doubles as the priority.
+ROUTER = Router([RulesStage(RULES, whole_words=False)],
+                fallback="Hmm, interesting! Tell me more...", name="casual")
+
 def main():
     """
     Main function that runs the casual conversation loop.
@@ -50,33 +77,8 @@ def get_response(user_input):
     if not user_input:
         return "I didn't catch that. What did you say?"
     
-    # Check for greetings
-    greetings = ["hi", "hello", "hey", "hiya", "howdy"]
-    if any(greeting in user_input for greeting in greetings):
-        return "Hey there! Nice to chat with you! 😊"
-    
-    # Check for "how are you" variations
-    how_are_you_phrases = ["how are you", "how are you doing", "how's it going", "how do you do"]
-    if any(phrase in user_input for phrase in how_are_you_phrases):
-        return "I'm doing great, thanks for asking! How about you?"
-    
-    # Check for positive responses about being good/fine
-    good_responses = ["i am good", "i'm good", "i am fine", "i'm fine", "doing well", "i'm well", "i am well"]
-    if any(response in user_input for response in good_responses):
-        return "That's awesome! 😊"
-    
-    # Check for other positive responses
-    other_good = ["good", "great", "awesome", "wonderful", "excellent", "fantastic"]
-    if any(word in user_input for word in other_good):
-        return "Glad to hear that! 😊"
-    
-    # Check for negative responses
-    negative_responses = ["bad", "terrible", "awful", "not good", "not well", "sad", "tired"]
-    if any(word in user_input for word in negative_responses):
-        return "Oh no, sorry to hear that. Hope things get better soon! 💙"
-    
-    # Default response for anything else
-    return "Hmm, interesting! Tell me more..."
+    # The highest-priority rule whose phrase appears in the message, or the default
+    return ROUTER.route(user_input).text
 
 def say_goodbye():
     """
@@ -0,0 +1,236 @@
+"""
+Catalog Reload Module for Goldman Sachs Contact Center AI
+=========================================================
+
+This module reloads the response catalog from its file while the service
+keeps running. A reload reads and validates the file and builds the new
+catalog version with all of its indexes on a background thread, then swaps
+it in with one assignment. Requests being served keep the version they
+already hold and never wait on a reload; a file that fails to load leaves
+the current catalog in place.
+
+Reloads are triggered by watching the file for changes, by calling
+``request_reload`` (the ``POST /admin/reload`` endpoint), or both.
+"""
+
+import functools
+import hmac
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import NamedTuple, Optional, Tuple
+
+from chatbot_core import ChatbotCore
+from metrics import CATALOG_RELOADS
+
+logger = logging.getLogger(__name__)
+
+_SUCCEEDED = CATALOG_RELOADS.labels(result="success")
+_FAILED = CATALOG_RELOADS.labels(result="failure")
+
+
+class ReloadResult(NamedTuple):
+    """Outcome of one reload."""
+
+    ok: bool
+    version: int
+    entries: int
+    seconds: float
+    error: Optional[str] = None
+
+
+class CatalogReloader:
+    """
+    Reloads a ChatbotCore's catalog from a file on demand or when it changes.
+    """
+
+    def __init__(self, core: ChatbotCore, path: str, interval: float = 5.0):
+        """
+        Initialize the reloader; the file is assumed to be loaded already.
+
+        Args:
+            core (ChatbotCore): Chatbot whose catalog is replaced
+            path (str): Catalog file, or ``.json``/``.csv`` source
+            interval (float): Seconds between checks of the file when watching
+        """
+        self.core = core
+        self.path = path
+        self.interval = interval
+        self.last_result: Optional[ReloadResult] = None
+        self._signature = self._stat()
+        # Serializes reloads; never taken on the request path
+        self._reload_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._running = False
+        self._pending = False
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        os.register_at_fork(after_in_child=functools.partial(_after_fork_in_child, weakref.ref(self)))
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        """Modification time, size and inode of the file, or None if it is missing."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def reload(self) -> ReloadResult:
+        """
+        Load the file and swap the new catalog in, on the calling thread.
+
+        Returns:
+            ReloadResult: The new version, or the error that kept the old one
+        """
+        with self._reload_lock:
+            signature = self._stat()
+            started = time.perf_counter()
+            try:
+                entries = self.core.load_catalog(self.path, lazy=False)
+            except Exception as e:
+                result = ReloadResult(False, self.core.version, len(self.core.responses),
+                                      time.perf_counter() - started, str(e))
+                logger.error(f"Catalog reload from {self.path} failed, keeping version "
+                             f"{result.version}: {str(e)}")
+                _FAILED.inc()
+            else:
+                result = ReloadResult(True, self.core.version, entries, time.perf_counter() - started)
+                logger.info(f"Catalog reloaded from {self.path} in {result.seconds:.3f}s")
+                _SUCCEEDED.inc()
+            # A broken file is not retried until it changes again
+            self._signature = signature
+            self.last_result = result
+            return result
+
+    def request_reload(self) -> bool:
+        """
+        Start a reload on a background thread.
+
+        If a reload is already running, another one follows it, so the
+        latest contents of the file are always picked up.
+
+        Returns:
+            bool: True if a reload was started, False if one was already running
+        """
+        with self._state_lock:
+            if self._running:
+                self._pending = True
+                return False
+            self._running = True
+        threading.Thread(target=self._run_reloads, name="catalog-reload", daemon=True).start()
+        return True
+
+    def _run_reloads(self):
+        while True:
+            self.reload()
+            with self._state_lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                self._pending = False
+
+    def check(self) -> bool:
+        """
+        Reload if the file changed since it was last loaded.
+
+        Returns:
+            bool: True if a reload was attempted
+        """
+        if self._stat() == self._signature:
+            return False
+        self.reload()
+        return True
+
+    def start(self):
+        """Watch the file on a daemon thread, checking every ``interval`` seconds."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {self.path} for catalog changes every {self.interval}s")
+
+    def _after_fork(self):
+        """Give a forked worker its own locks and, if the parent was watching, watcher."""
+        self._reload_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._running = self._pending = False
+        if self._watcher is not None:
+            self._watcher = None
+            self.start()
+
+    def stop(self):
+        """Stop watching the file."""
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            self._stop.set()
+            watcher.join()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error checking {self.path} for catalog changes: {str(e)}")
+
+
+def _after_fork_in_child(ref: "weakref.ReferenceType[CatalogReloader]"):
+    # Threads do not survive fork, so workers forked from a preloaded app restart them
+    reloader = ref()
+    if reloader is not None:
+        reloader._after_fork()
+
+
+def reloader_from_env(core: ChatbotCore) -> Optional[CatalogReloader]:
+    """
+    Load the catalog named by ``CATALOG_PATH`` and set up its reloader.
+
+    The keyword and fuzzy indexes are built here, at startup, rather than on
+    the first request; a server that loads the app before forking workers
+    builds them once and the workers share them.
+
+    The file is watched every ``CATALOG_RELOAD_INTERVAL`` seconds (default 5;
+    0 turns watching off, leaving only explicit reloads).
+
+    Args:
+        core (ChatbotCore): Chatbot whose catalog is loaded and reloaded
+
+    Returns:
+        Optional[CatalogReloader]: The reloader, or None if no catalog file is configured
+    """
+    path = os.getenv('CATALOG_PATH')
+    if not path:
+        return None
+    core.load_catalog(path, lazy=False)
+    reloader = CatalogReloader(core, path, interval=float(os.getenv('CATALOG_RELOAD_INTERVAL', 5)))
+    if reloader.interval > 0:
+        reloader.start()
+    return reloader
+
+
+def admin_enabled() -> bool:
+    """
+    Check whether admin endpoints are enabled, which they are only with an ``ADMIN_TOKEN``.
+
+    Returns:
+        bool: True if ``ADMIN_TOKEN`` is set
+    """
+    return bool(os.getenv('ADMIN_TOKEN'))
+
+
+def admin_token_matches(token: Optional[str]) -> bool:
+    """
+    Check a request's admin token against ``ADMIN_TOKEN``.
+
+    Args:
+        token (Optional[str]): Value of the request's X-Admin-Token header
+
+    Returns:
+        bool: True if ``ADMIN_TOKEN`` is set and equals ``token``
+    """
+    expected = os.getenv('ADMIN_TOKEN')
+    if not expected:
+        return False
+    return token is not None and hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
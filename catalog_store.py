@@ -0,0 +1,263 @@
+"""
+Catalog Store Module for Goldman Sachs Contact Center AI
+========================================================
+
+This module provides a compact, precompiled on-disk format for the response
+catalog. A catalog file holds every trigger phrase and response together
+with an open-addressing hash index over the phrases. It is memory-mapped
+read-only and nothing is parsed up front, so opening even a very large
+catalog is near-instant, and workers forked from the same parent (or
+started separately on the same host) share the file's pages through the OS
+page cache.
+
+Build a catalog file from a JSON or CSV source with:
+
+    python -m catalog_store responses.json responses.gscat
+"""
+
+import argparse
+import csv
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+
+from response_catalog import normalize_updates
+
+logger = logging.getLogger(__name__)
+
+# File layout, all little-endian:
+#   header   magic, format version, entry count, slot count, entries offset, strings offset
+#   slots    slot count x (crc32 of the key, entry number + 1; 0 marks an empty slot)
+#   entries  entry count x (string offset, key length, response length)
+#   strings  UTF-8 key immediately followed by its response, per entry
+MAGIC = b"GSCATLG\x00"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIIxxxxQQ")
+_SLOT = struct.Struct("<II")
+_ENTRY = struct.Struct("<QII")
+
+# Share of hash slots left empty, which keeps probe sequences short
+_LOAD_FACTOR = 0.5
+
+
+def _key_hash(key: bytes) -> int:
+    return zlib.crc32(key)
+
+
+def _slot_count(entries: int) -> int:
+    count = 2
+    while count * _LOAD_FACTOR < entries:
+        count *= 2
+    return count
+
+
+def write_catalog(responses: Mapping, path: str) -> int:
+    """
+    Compile responses into a catalog file.
+
+    The file is written next to ``path`` and renamed into place, so a
+    process opening ``path`` never sees a partly written catalog.
+
+    Args:
+        responses (Mapping): Normalized trigger phrase to response
+        path (str): Output file path
+
+    Returns:
+        int: Number of entries written
+    """
+    encoded = [(key.encode("utf-8"), response.encode("utf-8")) for key, response in responses.items()]
+    slot_count = _slot_count(len(encoded))
+    mask = slot_count - 1
+    entries_offset = _HEADER.size + slot_count * _SLOT.size
+    strings_offset = entries_offset + len(encoded) * _ENTRY.size
+
+    slots = bytearray(slot_count * _SLOT.size)
+    entries = bytearray(len(encoded) * _ENTRY.size)
+    offset = strings_offset
+    for number, (key, response) in enumerate(encoded):
+        _ENTRY.pack_into(entries, number * _ENTRY.size, offset, len(key), len(response))
+        offset += len(key) + len(response)
+
+        key_hash = _key_hash(key)
+        slot = key_hash & mask
+        while _SLOT.unpack_from(slots, slot * _SLOT.size)[1]:
+            slot = (slot + 1) & mask
+        _SLOT.pack_into(slots, slot * _SLOT.size, key_hash, number + 1)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded), slot_count, entries_offset, strings_offset))
+        f.write(slots)
+        f.write(entries)
+        for key, response in encoded:
+            f.write(key)
+            f.write(response)
+    os.replace(temp_path, path)
+    return len(encoded)
+
+
+class MappedResponses(Mapping):
+    """
+    Read-only mapping of trigger phrase to response backed by a catalog file.
+
+    Keys and responses are decoded from the mapped file only when they are
+    looked up or iterated over.
+    """
+
+    def __init__(self, path: str):
+        """
+        Memory-map a catalog file.
+
+        Args:
+            path (str): Catalog file written by ``write_catalog``
+
+        Raises:
+            ValueError: If the file is not a valid catalog file
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{path} is not a catalog file")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, slot_count, entries_offset, strings_offset = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has catalog format {version}, expected {FORMAT_VERSION}")
+        if (slot_count & (slot_count - 1) or entries_offset != _HEADER.size + slot_count * _SLOT.size
+                or strings_offset != entries_offset + count * _ENTRY.size or strings_offset > size):
+            raise ValueError(f"{path} is truncated or corrupt")
+
+        self._count = count
+        self._mask = slot_count - 1
+        self._entries_offset = entries_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, number: int) -> Tuple[int, int, int]:
+        return _ENTRY.unpack_from(self._map, self._entries_offset + number * _ENTRY.size)
+
+    def _find(self, key: bytes) -> Optional[Tuple[int, int, int]]:
+        """Probe the hash index for a key and return its entry."""
+        data = self._map
+        key_hash = _key_hash(key)
+        slot = key_hash & self._mask
+        while True:
+            slot_hash, number = _SLOT.unpack_from(data, _HEADER.size + slot * _SLOT.size)
+            if not number:
+                return None
+            if slot_hash == key_hash:
+                entry = self._entry(number - 1)
+                offset, key_length = entry[0], entry[1]
+                if key_length == len(key) and data[offset:offset + key_length] == key:
+                    return entry
+            slot = (slot + 1) & self._mask
+
+    def __getitem__(self, key: str) -> str:
+        if isinstance(key, str):
+            entry = self._find(key.encode("utf-8"))
+            if entry is not None:
+                offset, key_length, response_length = entry
+                start = offset + key_length
+                return self._map[start:start + response_length].decode("utf-8")
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._find(key.encode("utf-8")) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        data = self._map
+        for number in range(self._count):
+            offset, key_length, _ = self._entry(number)
+            yield data[offset:offset + key_length].decode("utf-8")
+
+    def items(self):
+        data = self._map
+        for number in range(self._count):
+            offset, key_length, response_length = self._entry(number)
+            end = offset + key_length
+            yield data[offset:end].decode("utf-8"), data[end:end + response_length].decode("utf-8")
+
+    def copy(self) -> Dict[str, str]:
+        return dict(self.items())
+
+    def close(self):
+        """Unmap the file; the mapping must not be used afterwards."""
+        self._map.close()
+
+
+def load_source(path: str) -> Tuple[Dict[str, str], int]:
+    """
+    Read catalog entries from a JSON or CSV source file.
+
+    JSON files hold either an object of trigger phrase to response or a list
+    of ``{"key": ..., "response": ...}`` objects. CSV files need ``key`` and
+    ``response`` columns.
+
+    Args:
+        path (str): File path ending in ``.json`` or ``.csv``
+
+    Returns:
+        Tuple[Dict[str, str], int]: Normalized entries and the number of invalid ones skipped
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return normalize_updates([(row.get("key"), row.get("response")) for row in csv.DictReader(f)])
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return normalize_updates(data)
+    return normalize_updates([(item.get("key"), item.get("response")) for item in data])
+
+
+def read_catalog(path: str) -> Mapping:
+    """
+    Read catalog entries from a catalog file or a JSON/CSV source.
+
+    Catalog files are memory-mapped; ``.json`` and ``.csv`` sources are
+    parsed into a dict.
+
+    Args:
+        path (str): Catalog file or source file path
+
+    Returns:
+        Mapping: Normalized trigger phrase to response
+
+    Raises:
+        ValueError: If the file cannot be parsed or holds no valid entries
+    """
+    if path.lower().endswith((".json", ".csv")):
+        responses, skipped = load_source(path)
+        if skipped:
+            logger.warning(f"Skipped {skipped} invalid catalog entries in {path}")
+    else:
+        responses = MappedResponses(path)
+    if not len(responses):
+        raise ValueError(f"{path} holds no valid catalog entries")
+    return responses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="JSON or CSV file of trigger phrases and responses")
+    parser.add_argument("output", help="Catalog file to write")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    entries, skipped = load_source(args.source)
+    count = write_catalog(entries, args.output)
+    print("Wrote {} entries to {} ({} bytes, {} invalid skipped) in {:.2f} s".format(
+        count, args.output, os.path.getsize(args.output), skipped, time.perf_counter() - started))
+
+
+if __name__ == "__main__":
+    main()
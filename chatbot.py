@@ -7,6 +7,7 @@ Uses the chatbot_core module for consistent behavior.
 """
 
 from chatbot_core import chatbot
+from input_screening import default_screener
 import logging
 
 # Configure logging
@@ -29,6 +30,13 @@ def main():
                 print("Bot:", response)
                 break
             
+            # Reject harmful input before it reaches the chatbot
+            screening = default_screener.screen(user_input)
+            if screening is not None:
+                logger.warning(f"Message rejected by screening rule: {screening.rule}")
+                print("Bot: Sorry, I can't process that message.")
+                continue
+            
             # Get and display response
             response = chatbot.get_response(user_input)
             print("Bot:", response)
@@ -5,13 +5,34 @@ Chatbot Core Module for Goldman Sachs Contact Center AI
 This module contains the core chatbot logic and response handling.
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Mapping, Optional, Tuple
 import logging
+import threading
+
+from catalog_store import read_catalog
+from input_screening import InputScreener, ScreeningResult, default_screener
+from intent_matcher import IntentMatcher, Match
+from metrics import CORE_RESPONSES
+from response_catalog import CatalogSnapshot, ResponseCatalog, ResponseUpdates, normalize_updates
+from router import Router, catalog_stages
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Reply given when no predefined response matches the input
+FALLBACK_RESPONSE = "I'm sorry, I didn't understand that. Could you rephrase?"
+# Replies given for input that fails validation and for unexpected errors
+INVALID_INPUT_RESPONSE = "I'm sorry, I didn't understand that. Could you please rephrase your question?"
+ERROR_RESPONSE = "I'm sorry, I'm experiencing technical difficulties. Please try again later."
+
+# Reply counters, looked up once so recording a result is a single increment
+_HITS = CORE_RESPONSES.labels(result="hit")
+_RETRIEVED = CORE_RESPONSES.labels(result="retrieval")
+_FALLBACKS = CORE_RESPONSES.labels(result="fallback")
+_INVALID = CORE_RESPONSES.labels(result="invalid")
+_ERRORS = CORE_RESPONSES.labels(result="error")
+
 
 class ChatbotCore:
     """
@@ -21,17 +42,53 @@ class ChatbotCore:
     input validation, and conversation management.
     """
     
-    def __init__(self):
-        """Initialize the chatbot with predefined responses."""
-        self.responses = {
+    def __init__(self, screener: InputScreener = default_screener, fuzzy_matching: bool = True,
+                 retriever=None):
+        """
+        Initialize the chatbot with predefined responses.
+        
+        Args:
+            screener (InputScreener): Screening engine used to reject harmful input
+            fuzzy_matching (bool): Correct typos when nothing matches as typed
+            retriever: Optional knowledge base retriever (e.g. TfidfRetriever) asked
+                before falling back to the "didn't understand" reply
+        """
+        self.screener = screener
+        self.fuzzy_matching = fuzzy_matching
+        self.retriever = retriever
+        self._catalog = ResponseCatalog({
             "hello": "Hi there! Welcome to Goldman Sachs support. How can I help you?",
             "account": "I can help you with account-related queries. Could you specify if it's balance or login issues?",
             "loan": "We offer personal, home, and business loans. Would you like interest rate details?",
             "credit card": "Sure! We have multiple credit card options. Do you want to hear about rewards or fees?",
             "bye": "Goodbye! Thanks for connecting with Goldman Sachs."
-        }
+        })
+        # Serializes writers only; readers never take it
+        self._write_lock = threading.Lock()
+        # Exact, keyword, fuzzy and retrieval stages over the current catalog
+        self.router = Router(catalog_stages(self), fallback=FALLBACK_RESPONSE, name="core")
         logger.info("ChatbotCore initialized with {} predefined responses".format(len(self.responses)))
     
+    @property
+    def catalog(self) -> ResponseCatalog:
+        """The current immutable catalog version."""
+        return self._catalog
+    
+    @property
+    def responses(self) -> Mapping[str, str]:
+        """Read-only responses of the current catalog version."""
+        return self._catalog.responses
+    
+    @property
+    def matcher(self) -> IntentMatcher:
+        """Keyword matcher of the current catalog version."""
+        return self._catalog.matcher
+    
+    @property
+    def version(self) -> int:
+        """Version number of the current catalog."""
+        return self._catalog.version
+    
     def validate_input(self, user_input: str) -> bool:
         """
         Validate user input for basic sanity checks.
@@ -46,19 +103,31 @@ class ChatbotCore:
             return False
         
         # Check for reasonable length (not too short or too long)
-        if len(user_input.strip()) < 1 or len(user_input) > 1000:
+        if len(user_input) > 1000 or user_input.isspace():
             return False
         
-        # Check for potentially harmful content (basic check)
-        dangerous_patterns = ['<script', 'javascript:', 'data:', 'vbscript:']
-        user_input_lower = user_input.lower()
-        for pattern in dangerous_patterns:
-            if pattern in user_input_lower:
-                logger.warning(f"Potentially dangerous input detected: {pattern}")
-                return False
+        # Check for potentially harmful content
+        result = self.screener.screen(user_input)
+        if result is not None:
+            logger.warning("Potentially dangerous input detected: %s (%s)", result.rule, result.category)
+            return False
         
         return True
     
+    def screen_input(self, user_input: str) -> Optional[ScreeningResult]:
+        """
+        Screen user input and report which rule fired, if any.
+        
+        Args:
+            user_input (str): The user's input message
+            
+        Returns:
+            Optional[ScreeningResult]: The rule that fired, or None if clean
+        """
+        if not isinstance(user_input, str):
+            return None
+        return self.screener.screen(user_input)
+    
     def get_response(self, user_input: str) -> str:
         """
         Generate a response for the given user input.
@@ -69,28 +138,83 @@ class ChatbotCore:
         Returns:
             str: The chatbot's response
         """
+        return self._respond(user_input)[0]
+    
+    def confident_response(self, user_input: str) -> Optional[str]:
+        """
+        Get a predefined or knowledge base answer, but never a non-answer.
+        
+        Suitable as the hedge raced against an LLM call.
+        
+        Args:
+            user_input (str): The user's input message
+            
+        Returns:
+            Optional[str]: The answer, or None if ``get_response`` would fall back,
+            reject the input or report an error
+        """
+        response, answered = self._respond(user_input)
+        return response if answered else None
+    
+    def _respond(self, user_input: str) -> Tuple[str, bool]:
+        """The reply to a message, and whether it answers the message."""
         try:
             # Validate input
             if not self.validate_input(user_input):
-                logger.warning(f"Invalid input received: {user_input[:50]}...")
-                return "I'm sorry, I didn't understand that. Could you please rephrase your question?"
-            
-            # Clean and normalize input
-            cleaned_input = user_input.lower().strip()
+                logger.warning("Invalid input received: %s...", user_input[:50])
+                _INVALID.inc()
+                return INVALID_INPUT_RESPONSE, False
             
-            # Get response from predefined responses
-            response = self.responses.get(cleaned_input, None)
+            # Predefined responses first, then the knowledge base, then the fallback
+            response, stage = self.router.route(user_input)
             
-            if response:
-                logger.info(f"Found predefined response for: {cleaned_input}")
-                return response
+            if stage == "fallback":
+                logger.info("No predefined response found for: %s", user_input)
+                _FALLBACKS.inc()
+                return response, False
+            if stage == "retrieval":
+                logger.info("Found knowledge base answer for: %s", user_input)
+                _RETRIEVED.inc()
             else:
-                logger.info(f"No predefined response found for: {cleaned_input}")
-                return "I'm sorry, I didn't understand that. Could you rephrase?"
+                logger.info("Found predefined response for: %s", user_input)
+                _HITS.inc()
+            return response, True
                 
         except Exception as e:
             logger.error(f"Error processing user input: {str(e)}")
-            return "I'm sorry, I'm experiencing technical difficulties. Please try again later."
+            _ERRORS.inc()
+            return ERROR_RESPONSE, False
+    
+    def lookup(self, cleaned_input: str) -> Optional[str]:
+        """
+        Look up a predefined response for already normalized input.
+        
+        An exact match on the whole message wins; otherwise the compiled
+        intent matcher picks the best trigger phrase found in the message.
+        Only if both miss are misspelled words corrected (e.g. "acount" to
+        "account") and the lookup retried.
+        
+        Args:
+            cleaned_input (str): Lowercased, stripped user input
+            
+        Returns:
+            Optional[str]: The matching response, or None if nothing matched
+        """
+        return self._catalog.lookup(cleaned_input, fuzzy=self.fuzzy_matching)
+    
+    def match_intents(self, user_input: str) -> List[Match]:
+        """
+        Find every trigger phrase in the input along with its position.
+        
+        Args:
+            user_input (str): The user's input message
+            
+        Returns:
+            List[Match]: All trigger phrases found, ordered by end position
+        """
+        if not isinstance(user_input, str):
+            return []
+        return self.matcher.find_all(user_input)
     
     def add_response(self, key: str, response: str) -> bool:
         """
@@ -107,13 +231,111 @@ class ChatbotCore:
             if not key or not response:
                 return False
             
-            self.responses[key.lower()] = response
+            self.add_responses({key: response})
             logger.info(f"Added new response for key: {key}")
             return True
         except Exception as e:
             logger.error(f"Error adding response: {str(e)}")
             return False
     
+    def add_responses(self, updates: ResponseUpdates) -> int:
+        """
+        Add or replace many responses with a single catalog rebuild.
+        
+        The new catalog version, including its indexes, is built off to the
+        side and swapped in atomically; concurrent readers keep using the
+        version they already hold.
+        
+        Args:
+            updates (ResponseUpdates): Mapping or (key, response) pairs
+            
+        Returns:
+            int: Number of entries applied (invalid entries are skipped)
+        """
+        entries, skipped = normalize_updates(updates)
+        if skipped:
+            logger.warning(f"Skipped {skipped} invalid catalog entries")
+        if not entries:
+            return 0
+        
+        with self._write_lock:
+            self._catalog = self._catalog.with_updates(entries)
+        logger.info(f"Catalog updated to version {self.version} with {len(entries)} entries")
+        return len(entries)
+    
+    def remove_response(self, key: str) -> bool:
+        """
+        Remove a response from the chatbot's knowledge base.
+        
+        Args:
+            key (str): The trigger phrase
+            
+        Returns:
+            bool: True if the response existed and was removed
+        """
+        if not isinstance(key, str):
+            return False
+        
+        normalized = key.lower()
+        with self._write_lock:
+            if normalized not in self._catalog.responses:
+                return False
+            self._catalog = self._catalog.with_updates({}, removals=[normalized])
+        logger.info(f"Removed response for key: {key}")
+        return True
+    
+    def replace_responses(self, responses: ResponseUpdates) -> int:
+        """
+        Replace the whole catalog with a single rebuild.
+        
+        Args:
+            responses (ResponseUpdates): Mapping or (key, response) pairs
+            
+        Returns:
+            int: Number of entries in the new catalog
+        """
+        entries, skipped = normalize_updates(responses)
+        if skipped:
+            logger.warning(f"Skipped {skipped} invalid catalog entries")
+        
+        with self._write_lock:
+            self._catalog = ResponseCatalog(entries, self._catalog.version + 1)
+        logger.info(f"Catalog replaced with version {self.version} ({len(entries)} entries)")
+        return len(entries)
+    
+    def load_catalog(self, path: str, lazy: bool = True) -> int:
+        """
+        Replace the whole catalog with the contents of a file.
+        
+        A precompiled catalog file (see ``python -m catalog_store``) is
+        memory-mapped rather than parsed, so this returns almost immediately
+        whatever the catalog size, and processes serving the same file share
+        its pages. JSON and CSV sources are parsed.
+        
+        The new version is built off to the side and swapped in atomically;
+        a file that cannot be read leaves the current catalog in place.
+        
+        Args:
+            path (str): Catalog file, or ``.json``/``.csv`` source
+            lazy (bool): Build the keyword and fuzzy matchers on the first lookup
+                that needs them instead of before the swap
+            
+        Returns:
+            int: Number of entries in the new catalog
+            
+        Raises:
+            ValueError: If the file is not a valid catalog or holds no entries
+        """
+        catalog = ResponseCatalog(read_catalog(path), self.version + 1, lazy=lazy)
+        if not lazy:
+            catalog.warm()
+        with self._write_lock:
+            # Not yet published, so the version can still follow a concurrent update
+            catalog.version = self._catalog.version + 1
+            self._catalog = catalog
+        logger.info(f"Catalog loaded from {path} as version {self.version} ({len(catalog)} entries)")
+        return len(catalog)
+    
     def get_available_responses(self) -> Dict[str, str]:
         """
         Get all available responses.
@@ -121,7 +343,20 @@ class ChatbotCore:
         Returns:
             Dict[str, str]: Dictionary of all responses
         """
-        return self.responses.copy()
+        return self._catalog.responses.copy()
+    
+    def get_catalog_snapshot(self) -> CatalogSnapshot:
+        """
+        Get the serialized response catalog for the current version.
+        
+        The catalog is serialized once per version, so repeated calls on an
+        unchanged catalog return the same bytes without copying or encoding.
+        The ETag is a content hash, so it is stable across worker processes.
+        
+        Returns:
+            CatalogSnapshot: Version, ETag and JSON body of the catalog
+        """
+        return self._catalog.snapshot()
 
 
 # Create a global instance for easy import
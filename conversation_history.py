@@ -0,0 +1,119 @@
+"""
+Conversation History Module for Goldman Sachs Contact Center AI
+===============================================================
+
+This module provides a bounded conversation history that trims itself to a
+token budget. Each message's token count is computed once when it is added
+and a running total is kept, so deciding what to send with the next turn
+never rescans the whole conversation.
+"""
+
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Approximate per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a message.
+
+    Uses the common approximation of four characters per token, which is
+    close enough for budgeting without a tokenizer dependency.
+
+    Args:
+        text (str): Message content
+
+    Returns:
+        int: Estimated tokens, including per-message overhead
+    """
+    return MESSAGE_OVERHEAD_TOKENS + (len(text) + 3) // 4
+
+
+class ConversationHistory:
+    """
+    Ring buffer of chat messages trimmed to a token budget.
+
+    The oldest messages are dropped first. After trimming, the history never
+    starts with an assistant reply whose question was dropped.
+    """
+
+    def __init__(self, max_tokens: int = 1000, max_messages: Optional[int] = None,
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        """
+        Initialize an empty history.
+
+        Args:
+            max_tokens (int): Token budget for the retained messages
+            max_messages (Optional[int]): Optional hard cap on retained messages
+            token_counter (Callable[[str], int]): Counts the tokens of one message
+        """
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+        self.token_counter = token_counter
+        self.total_tokens = 0
+        self._messages = deque()
+        self._tokens = deque()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._messages)
+
+    def __getitem__(self, index: int) -> Dict[str, str]:
+        return self._messages[index]
+
+    def append(self, role: str, content: str):
+        """
+        Add a message and trim the oldest ones to stay within budget.
+
+        Args:
+            role (str): Message role ("user" or "assistant")
+            content (str): Message content
+        """
+        tokens = self.token_counter(content)
+        self._messages.append({"role": role, "content": content})
+        self._tokens.append(tokens)
+        self.total_tokens += tokens
+        self._trim()
+
+    def add_turn(self, user_message: str, assistant_message: str):
+        """
+        Add a completed user/assistant exchange.
+
+        Args:
+            user_message (str): The user's message
+            assistant_message (str): The assistant's reply
+        """
+        self.append("user", user_message)
+        self.append("assistant", assistant_message)
+
+    def messages(self) -> List[Dict[str, str]]:
+        """
+        Get the retained messages, oldest first, ready to send as context.
+
+        Returns:
+            List[Dict[str, str]]: Messages within the token budget
+        """
+        return list(self._messages)
+
+    def clear(self):
+        """Remove every message."""
+        self._messages.clear()
+        self._tokens.clear()
+        self.total_tokens = 0
+
+    def _trim(self):
+        """Drop the oldest messages until the history fits its limits."""
+        messages, tokens = self._messages, self._tokens
+        while messages and (self.total_tokens > self.max_tokens or
+                            (self.max_messages is not None and len(messages) > self.max_messages)):
+            messages.popleft()
+            self.total_tokens -= tokens.popleft()
+
+        # Never open the context with a reply whose question was dropped
+        while messages and messages[0]["role"] == "assistant" and len(messages) > 1:
+            messages.popleft()
+            self.total_tokens -= tokens.popleft()
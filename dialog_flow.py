@@ -0,0 +1,343 @@
+"""
+Dialog Flow Module for Goldman Sachs Contact Center AI
+======================================================
+
+This module runs multi-step conversations, such as asking for a name and then
+offering account or loan services, over the stateless web API. Flows are
+declared as plain data, steps that say something and then capture a slot,
+offer choices or move on, and compiled once into a state machine numbered
+across all flows.
+
+A flow starts only when the whole message is one of its trigger phrases, or
+the explicit command ``/<flow>``, so questions that merely mention a trigger
+go to the router as usual. A reply a choice step cannot use is answered
+once with a retry prompt; a second one in a row ends the dialog and is
+passed on too.
+
+A conversation in progress is a ``DialogState``: the current state number,
+a tuple of slot values and the retry count, so a session holds a few small
+objects rather than a call stack. Each message is a dictionary lookup or
+one scan for choice phrases plus table lookups, however many flows and
+steps there are.
+"""
+
+import json
+import os
+from string import Formatter
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from intent_matcher import IntentMatcher
+from metrics import DIALOG_EVENTS
+
+# Flows are a mapping of flow name to its trigger phrases and steps. The first
+# step is where the flow starts. A step says "say", formatted with the slots,
+# then either stores the reply in "slot" and goes to "next", matches the
+# reply against "choices" ((phrases, target) pairs) and goes to the target or
+# to "otherwise", goes straight on to "next", or, with none of these, ends
+# the dialog. Targets name a step of the same flow, another flow, or
+# "flow.step".
+Flows = Mapping[str, Mapping[str, Any]]
+
+RETRY_PROMPT = "Sorry, I didn't catch that."
+CANCEL_REPLY = "Okay, I've stopped that. How else can I help?"
+CANCEL_PHRASES = ("cancel", "stop", "quit", "exit")
+# Added when a flow starts and when it asks again, with the first cancel phrase
+CANCEL_HINT = "(Type '{phrase}' at any time to stop.)"
+
+BANKING_FLOWS: Flows = {
+    "services": {
+        "triggers": ["services", "banking services", "main menu"],
+        "steps": {
+            "ask_name": {
+                "say": "Hello! I'm here to help you with banking services. What's your name?",
+                "slot": "name",
+                "default": "there",
+                "next": "greet",
+            },
+            "greet": {"say": "Nice to meet you, {name}!", "next": "ask_choice"},
+            "ask_choice": {
+                "say": "How can I assist you today? Please type either 'account' or 'loan' to continue.",
+                "choices": [(["account"], "account"), (["loan", "loans"], "loan")],
+                "otherwise": "invalid",
+            },
+            "invalid": {
+                "say": "Sorry {name}, I can only help with 'account' or 'loan' services.",
+                "next": "ask_choice",
+            },
+        },
+    },
+    "account": {
+        "triggers": ["account services", "account help"],
+        "steps": {
+            "menu": {
+                "say": "📊 Account Services\n"
+                       "I can help you with:\n"
+                       "• Checking your account balance\n"
+                       "• Viewing recent transactions\n"
+                       "• Updating your personal information\n"
+                       "• Resolving login issues\n"
+                       "Would you like to contact our account specialist for detailed assistance?",
+                "choices": [(["yes", "sure", "please"], "specialist"), (["no", "not now"], "done")],
+            },
+            "specialist": {
+                "say": "An account specialist will contact you shortly. "
+                       "Thank you for using our service, {name}!",
+            },
+            "done": {"say": "Thank you for using our service, {name}! Have a great day! 👋"},
+        },
+    },
+    "loan": {
+        "triggers": ["loan services", "loan options", "apply for a loan"],
+        "steps": {
+            "menu": {
+                "say": "💰 Loan Services\n"
+                       "We offer various loan options:\n"
+                       "• Personal loans (starting from 5.99% APR)\n"
+                       "• Home loans (competitive rates available)\n"
+                       "• Business loans (tailored solutions)\n"
+                       "Which one interests you: personal, home or business?",
+                "choices": [(["personal"], "personal"), (["home", "mortgage"], "home"),
+                            (["business"], "business")],
+            },
+            "personal": {"say": "Personal loans start from 5.99% APR.", "next": "specialist"},
+            "home": {"say": "Our home loans come at competitive rates.", "next": "specialist"},
+            "business": {"say": "Our business loans are tailored to your company.", "next": "specialist"},
+            "specialist": {
+                "say": "Our loan specialists can help you find the best option for your needs. "
+                       "Thank you for using our service, {name}!",
+            },
+        },
+    },
+}
+
+
+class DialogState(NamedTuple):
+    """A conversation in progress: the state it waits in and the slot values."""
+
+    state: int
+    slots: Tuple[str, ...]
+    retries: int = 0
+
+
+class DialogEngine:
+    """
+    Flows compiled into one state machine.
+
+    The engine is immutable once built and keeps no per-conversation data,
+    so one engine serves every session and thread.
+    """
+
+    def __init__(self, flows: Flows, cancel_phrases=CANCEL_PHRASES):
+        """
+        Compile the flows.
+
+        Args:
+            flows (Flows): Flow name to ``{"triggers": [...], "steps": {...}}``
+            cancel_phrases: Whole messages that end a dialog in progress; the
+                first is the one prompts mention
+
+        Raises:
+            ValueError: If a target, slot or template is unknown, or steps
+                move on to each other in a loop without waiting for a reply
+        """
+        names = [f"{flow}.{step}" for flow, spec in flows.items() for step in spec["steps"]]
+        if not names:
+            raise ValueError("at least one flow step is required")
+        self.state_names: Tuple[str, ...] = tuple(names)
+        self._ids = {name: index for index, name in enumerate(names)}
+        self._starts = {flow: self._ids[f"{flow}.{next(iter(spec['steps']))}"] for flow, spec in flows.items()}
+        steps = [step for spec in flows.values() for step in spec["steps"].values()]
+        flow_of = [name.split(".", 1)[0] for name in names]
+
+        slot_names: List[str] = []
+        defaults: List[str] = []
+        for step in steps:
+            if "slot" in step and step["slot"] not in slot_names:
+                slot_names.append(step["slot"])
+                defaults.append(step.get("default", ""))
+        self.slot_names: Tuple[str, ...] = tuple(slot_names)
+        self._slot_index = {name: index for index, name in enumerate(slot_names)}
+        self._defaults = tuple(defaults)
+
+        def resolve(flow: str, target: str) -> int:
+            for name in (f"{flow}.{target}", target):
+                if name in self._ids:
+                    return self._ids[name]
+            if target in self._starts:
+                return self._starts[target]
+            raise ValueError(f"unknown dialog target {target!r} in flow {flow!r}")
+
+        for name, step in zip(names, steps):
+            for _, field, _, _ in Formatter().parse(step.get("say", "")):
+                if field is not None and field not in self._slot_index:
+                    raise ValueError(f"unknown slot {field!r} in step {name!r}")
+
+        # What is said on entering each state, after following "next" through
+        # steps that do not wait, and the state the dialog then waits in (-1: ended)
+        self._say: List[Tuple[str, ...]] = []
+        self._rest: List[int] = []
+        for index, step in enumerate(steps):
+            said, seen, current = [], set(), index
+            while True:
+                if current in seen:
+                    raise ValueError(f"dialog steps loop without waiting for a reply at {names[index]!r}")
+                seen.add(current)
+                if steps[current].get("say"):
+                    said.append(steps[current]["say"])
+                if "slot" in steps[current] or "choices" in steps[current]:
+                    break
+                if "next" not in steps[current]:
+                    current = -1
+                    break
+                current = resolve(flow_of[current], steps[current]["next"])
+            self._say.append(tuple(said))
+            self._rest.append(current)
+
+        self._slot = [self._slot_index[step["slot"]] if "slot" in step else -1 for step in steps]
+        self._next = [resolve(flow, step["next"]) if "slot" in step else -1 for flow, step in zip(flow_of, steps)]
+        # The longest phrase found in a reply picks the choice
+        self._choices: List[Optional[IntentMatcher]] = []
+        self._targets: List[Dict[str, int]] = []
+        self._otherwise: List[int] = []
+        for index, (flow, step) in enumerate(zip(flow_of, steps)):
+            targets = {phrase: resolve(flow, target) for phrases, target in step.get("choices", ()) for phrase in phrases}
+            self._choices.append(IntentMatcher(targets) if targets else None)
+            self._targets.append(targets)
+            self._otherwise.append(resolve(flow, step["otherwise"]) if "otherwise" in step else index)
+
+        self._triggers = {_normalize(phrase): self._starts[flow] for flow, spec in flows.items()
+                          for phrase in spec.get("triggers", ())}
+        self._triggers.update((f"/{flow.lower()}", start) for flow, start in self._starts.items())
+        self._cancel = frozenset(phrase.lower() for phrase in cancel_phrases)
+        self._hint = CANCEL_HINT.format(phrase=cancel_phrases[0])
+        self._flow_of = tuple(flow_of)
+        self._events = {(flow, event): DIALOG_EVENTS.labels(flow, event)
+                        for flow in flows for event in ("started", "finished", "cancelled", "abandoned")}
+
+    def _enter(self, state: int, slots: Tuple[str, ...], prefix: Tuple[str, ...] = (),
+               retries: int = 0, hint: bool = False) -> Tuple[str, Optional[DialogState]]:
+        values = dict(zip(self.slot_names, slots))
+        said = [*prefix, *(template.format_map(values) for template in self._say[state])]
+        rest = self._rest[state]
+        if rest < 0:
+            self._events[(self._flow_of[state], "finished")].inc()
+            return " ".join(said), None
+        if hint:
+            said.append(self._hint)
+        return " ".join(said), DialogState(rest, slots, retries)
+
+    def start(self, flow: str) -> Tuple[str, Optional[DialogState]]:
+        """
+        Start a flow regardless of the message.
+
+        Args:
+            flow (str): Name of the flow
+
+        Returns:
+            Tuple[str, Optional[DialogState]]: The first reply and the state to
+            pass to ``respond`` with the next message, or None if the flow ended
+
+        Raises:
+            KeyError: If there is no such flow
+        """
+        state = self._starts[flow]
+        self._events[(flow, "started")].inc()
+        return self._enter(state, self._defaults, hint=True)
+
+    def respond(self, dialog: Optional[DialogState],
+                user_input: str) -> Optional[Tuple[str, Optional[DialogState]]]:
+        """
+        Advance a dialog by one message, or start one the message triggers.
+
+        Args:
+            dialog (Optional[DialogState]): The dialog in progress, or None
+            user_input (str): The user's message
+
+        Returns:
+            Optional[Tuple[str, Optional[DialogState]]]: The reply and the new
+            state (None once the dialog ends), or None if the message is not
+            for a dialog: none is in progress and the message is not a
+            trigger, or it is the second reply in a row the dialog could not
+            use, which ends the dialog
+        """
+        cleaned = user_input.lower().strip()
+        if dialog is None:
+            state = self._triggers.get(_normalize(cleaned))
+            if state is None:
+                return None
+            self._events[(self._flow_of[state], "started")].inc()
+            return self._enter(state, self._defaults, hint=True)
+
+        state, slots, retries = dialog
+        if cleaned in self._cancel:
+            self._events[(self._flow_of[state], "cancelled")].inc()
+            return CANCEL_REPLY, None
+
+        slot = self._slot[state]
+        if slot >= 0:
+            value = user_input.strip() or self._defaults[slot]
+            return self._enter(self._next[state], slots[:slot] + (value,) + slots[slot + 1:])
+
+        matcher = self._choices[state]
+        match = matcher.best_match(cleaned) if matcher is not None else None
+        if match is not None:
+            return self._enter(self._targets[state][match.key], slots)
+        if retries:
+            self._events[(self._flow_of[state], "abandoned")].inc()
+            return None
+        otherwise = self._otherwise[state]
+        return self._enter(otherwise, slots, (RETRY_PROMPT,) if otherwise == state else (), retries=1, hint=True)
+
+    def state_name(self, dialog: DialogState) -> str:
+        """The "flow.step" name of the state a dialog waits in."""
+        return self.state_names[dialog.state]
+
+    def handle(self, session, user_input: str) -> Optional[str]:
+        """
+        Answer a message from a session's dialog, keeping its state in the session.
+
+        Args:
+            session: SessionState whose ``dialog`` holds the dialog in progress
+            user_input (str): The user's message
+
+        Returns:
+            Optional[str]: The reply, already recorded in the session, or None
+            if the message is not for a dialog and should be routed
+        """
+        result = self.respond(session.dialog, user_input)
+        if result is None:
+            session.dialog = None
+            return None
+        reply, session.dialog = result
+        session.record_turn(user_input, reply)
+        return reply
+
+
+def _normalize(text: str) -> str:
+    """Lowercase a message and drop closing punctuation and extra spaces."""
+    return " ".join(text.lower().rstrip(" .!?").split())
+
+
+def load_flows(path: str) -> Dict[str, Any]:
+    """
+    Load flows from a JSON file shaped like ``BANKING_FLOWS``.
+
+    Args:
+        path (str): Path of the JSON file
+
+    Returns:
+        Dict[str, Any]: The flows
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dialog_engine_from_env() -> DialogEngine:
+    """
+    Build the engine from the flows in ``DIALOG_FLOWS_PATH``, or the banking flows.
+
+    Returns:
+        DialogEngine: The compiled flows
+    """
+    path = os.getenv('DIALOG_FLOWS_PATH')
+    return DialogEngine(load_flows(path) if path else BANKING_FLOWS)
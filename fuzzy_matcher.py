@@ -0,0 +1,242 @@
+"""
+Fuzzy Matcher Module for Goldman Sachs Contact Center AI
+========================================================
+
+This module provides typo-tolerant matching against the words of the
+response trigger phrases. A character n-gram inverted index narrows each
+misspelled word down to a few candidate words, and only those are compared
+with a bounded edit distance, so lookups stay fast with tens of thousands of
+trigger phrases.
+
+Short words are never corrected, the allowed distance grows with word
+length, and a correction is only made when one candidate is clearly best.
+"""
+
+import re
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Words of at least this many letters can be corrected
+MIN_WORD_LENGTH = 4
+
+# Words of at least this many letters may be two edits away instead of one
+LONG_WORD_LENGTH = 8
+
+# Candidates sharing the most n-grams that are checked with the edit distance
+MAX_CANDIDATES = 8
+
+
+class Correction(NamedTuple):
+    """One misspelled word and the trigger word it was corrected to."""
+
+    word: str
+    term: str
+    distance: int
+    confidence: float
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance between two strings, with early exit.
+
+    Counts insertions, deletions, substitutions and swaps of adjacent
+    characters. Only the band of cells within ``max_distance`` of the
+    diagonal is computed.
+
+    Args:
+        a (str): First string
+        b (str): Second string
+        max_distance (int): Largest distance of interest
+
+    Returns:
+        int: The distance, or ``max_distance + 1`` if it is larger than that
+    """
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_distance:
+        return max_distance + 1
+    over = max_distance + 1
+    previous2 = None
+    previous = [j if j <= max_distance else over for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        current = [over] * (len_b + 1)
+        if i <= max_distance:
+            current[0] = i
+        low, high = max(1, i - max_distance), min(len_b, i + max_distance)
+        row_min = current[0]
+        char_a = a[i - 1]
+        for j in range(low, high + 1):
+            if char_a == b[j - 1]:
+                value = previous[j - 1]
+            else:
+                value = min(previous[j], current[j - 1], previous[j - 1]) + 1
+                if (previous2 is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1]
+                        and previous2[j - 2] + 1 < value):
+                    value = previous2[j - 2] + 1
+            if value > over:
+                value = over
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous2, previous = previous, current
+    return min(previous[len_b], over)
+
+
+def allowed_distance(length: int) -> int:
+    """
+    Largest edit distance accepted for a trigger word of the given length.
+
+    Args:
+        length (int): Length of the trigger word
+
+    Returns:
+        int: 0 for short words, 1 for medium words and 2 for long words
+    """
+    if length < MIN_WORD_LENGTH:
+        return 0
+    return 2 if length >= LONG_WORD_LENGTH else 1
+
+
+class FuzzyMatcher:
+    """
+    Corrects misspelled words to the closest word used in a trigger phrase.
+    """
+
+    def __init__(self, phrases: Iterable[str], n: int = 3, min_confidence: float = 0.8,
+                 cache_size: int = 4096):
+        """
+        Build the n-gram index over the words of the trigger phrases.
+
+        Args:
+            phrases (Iterable[str]): Lowercased trigger phrases
+            n (int): Length of the character n-grams
+            min_confidence (float): Minimum ``1 - distance / len(word)`` to accept a correction
+            cache_size (int): Corrections remembered per matcher
+        """
+        self.n = n
+        self.min_confidence = min_confidence
+        self.cache_size = cache_size
+        self._word_pattern = re.compile(r"\b[a-z]{%d,}\b" % MIN_WORD_LENGTH)
+        self._cache: Dict[str, Optional[Correction]] = {}
+
+        self.terms: Set[str] = set()
+        for phrase in phrases:
+            self.terms.update(self._word_pattern.findall(phrase))
+
+        # Postings are keyed by n-gram and word length, so a query only
+        # counts words whose length is within reach of its own
+        self._postings: Dict[Tuple[str, int], List[str]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        for term in self.terms:
+            grams = self._grams(term)
+            self._gram_counts[term] = len(grams)
+            for gram in grams:
+                self._postings.setdefault((gram, len(term)), []).append(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _grams(self, word: str) -> Set[str]:
+        padded = "$" + word + "$"
+        return {padded[i:i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def correct_word(self, word: str) -> Optional[Correction]:
+        """
+        Find the trigger word a misspelled word most likely stands for.
+
+        Args:
+            word (str): Lowercased word
+
+        Returns:
+            Optional[Correction]: The correction, or None if the word is already
+            a trigger word, too short, or has no single confident match
+        """
+        if word in self.terms or len(word) < MIN_WORD_LENGTH:
+            return None
+        try:
+            return self._cache[word]
+        except KeyError:
+            pass
+
+        correction = self._search(word)
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[word] = correction
+        return correction
+
+    def _limit(self, length: int) -> int:
+        """Largest distance that can still meet the confidence threshold for a word length."""
+        return min(allowed_distance(length), int(length * (1.0 - self.min_confidence) + 1e-9))
+
+    def _search(self, word: str) -> Optional[Correction]:
+        length = len(word)
+        lengths = [term_length for term_length in range(max(MIN_WORD_LENGTH, length - 2), length + 3)
+                   if self._limit(term_length) >= abs(term_length - length)]
+        if not lengths:
+            return None
+
+        grams = self._grams(word)
+        shared = Counter()
+        postings = self._postings
+        for gram in grams:
+            for term_length in lengths:
+                terms = postings.get((gram, term_length))
+                if terms:
+                    shared.update(terms)
+
+        gram_counts = self._gram_counts
+        candidates = []
+        for term, count in sorted(shared.items(), key=itemgetter(1), reverse=True):
+            # Each edit changes at most n + 1 of the padded n-grams
+            if count >= max(len(grams), gram_counts[term]) - (self.n + 1) * self._limit(len(term)):
+                candidates.append(term)
+                if len(candidates) == MAX_CANDIDATES:
+                    break
+
+        best: List[str] = []
+        best_distance = None
+        for term in candidates:
+            limit = self._limit(len(term))
+            if best_distance is not None:
+                limit = min(limit, best_distance)
+            distance = edit_distance(word, term, limit)
+            if distance > limit:
+                continue
+            if best_distance is None or distance < best_distance:
+                best_distance, best = distance, []
+            best.append(term)
+
+        # Two equally close words make the correction ambiguous
+        if len(best) != 1:
+            return None
+        term, distance = best[0], best_distance
+        confidence = 1.0 - distance / len(term)
+        if confidence < self.min_confidence:
+            return None
+        return Correction(word, term, distance, confidence)
+
+    def correct(self, text: str) -> Tuple[str, List[Correction]]:
+        """
+        Correct every misspelled word in a message.
+
+        Words containing digits or other characters are left alone.
+
+        Args:
+            text (str): Lowercased message
+
+        Returns:
+            Tuple[str, List[Correction]]: The corrected text and the corrections made
+        """
+        corrections = []
+
+        def replace(match):
+            correction = self.correct_word(match.group(0))
+            if correction is None:
+                return match.group(0)
+            corrections.append(correction)
+            return correction.term
+
+        corrected = self._word_pattern.sub(replace, text)
+        return corrected, corrections
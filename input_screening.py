@@ -0,0 +1,83 @@
+"""
+Input Screening Module for Goldman Sachs Contact Center AI
+==========================================================
+
+This module provides a precompiled screening engine that checks a message
+against every screening rule (injection, PII, profanity, ...) in a single
+case-insensitive pass, without making a lowercased copy of the message.
+"""
+
+from typing import Iterable, NamedTuple, Optional
+
+from intent_matcher import IntentMatcher
+
+
+class ScreeningRule(NamedTuple):
+    """A pattern that causes a message to be rejected."""
+
+    name: str
+    pattern: str
+    category: str
+
+
+class ScreeningResult(NamedTuple):
+    """Details of the rule that fired on a message."""
+
+    rule: str
+    category: str
+    pattern: str
+    start: int
+    end: int
+
+
+DEFAULT_RULES = (
+    ScreeningRule("script_tag", "<script", "injection"),
+    ScreeningRule("javascript_uri", "javascript:", "injection"),
+    ScreeningRule("data_uri", "data:", "injection"),
+    ScreeningRule("vbscript_uri", "vbscript:", "injection"),
+)
+
+
+class InputScreener:
+    """
+    Screens messages against a fixed set of rules compiled into one automaton.
+
+    Patterns match anywhere in the message, ignoring case. When a message
+    matches several rules, the first one to complete while scanning fires.
+    """
+
+    def __init__(self, rules: Iterable[ScreeningRule] = DEFAULT_RULES):
+        """
+        Compile the screening automaton.
+
+        Args:
+            rules (Iterable[ScreeningRule]): Rules to screen for
+        """
+        self.rules = {}
+        for rule in rules:
+            self.rules.setdefault(rule.pattern.lower(), rule)
+        self._matcher = IntentMatcher(self.rules, whole_words=False)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def screen(self, text: str) -> Optional[ScreeningResult]:
+        """
+        Check the text against every rule in a single pass.
+
+        Args:
+            text (str): The message to screen
+
+        Returns:
+            Optional[ScreeningResult]: The rule that fired, or None if clean
+        """
+        match = self._matcher.first_match(text)
+        if match is None:
+            return None
+
+        rule = self.rules[match.key]
+        return ScreeningResult(rule.name, rule.category, rule.pattern, match.start, match.end)
+
+
+# Shared screener for the default rules, compiled once at import
+default_screener = InputScreener()
@@ -0,0 +1,222 @@
+"""
+Intent Matcher Module for Goldman Sachs Contact Center AI
+=========================================================
+
+This module provides a compiled multi-keyword matcher built on an
+Aho-Corasick automaton. The automaton is built once from a set of trigger
+phrases and then finds every phrase in a message in a single pass, so the
+cost of a lookup depends on the message length rather than on the number of
+triggers in the catalog.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Match(NamedTuple):
+    """A trigger phrase found in a message."""
+
+    key: str
+    start: int
+    end: int
+    priority: int
+
+
+class IntentMatcher:
+    """
+    Aho-Corasick matcher over a fixed set of trigger phrases.
+
+    Matching is case-insensitive without copying the input: every transition
+    is compiled for both the lower- and upper-case form of its character.
+
+    When several triggers match, ``best_match`` picks the winner by:
+
+    1. lowest priority value (defaults to 0 for every key),
+    2. longest trigger phrase,
+    3. earliest position in the message.
+    """
+
+    def __init__(self, keys: Iterable[str], priorities: Optional[Dict[str, int]] = None,
+                 whole_words: bool = True):
+        """
+        Compile the automaton for the given trigger phrases.
+
+        Args:
+            keys (Iterable[str]): Trigger phrases to match
+            priorities (Optional[Dict[str, int]]): Priority per key, lower wins
+            whole_words (bool): Only report matches on word boundaries
+        """
+        self.whole_words = whole_words
+        self._keys: List[str] = []
+        self._priorities: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._fail: List[int] = [0]
+
+        priorities = priorities or {}
+        seen = set()
+        for key in keys:
+            if not key:
+                continue
+            normalized = key.lower()
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            self._insert(normalized, priorities.get(key, priorities.get(normalized, 0)))
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _insert(self, key: str, priority: int) -> None:
+        """Add a single (lowercased) key to the trie."""
+        node = 0
+        for ch in key:
+            child = self._goto[node].get(ch)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._out.append(())
+                self._fail.append(0)
+                for variant in _case_variants(ch):
+                    self._goto[node][variant] = child
+            node = child
+
+        self._out[node] = (len(self._keys),)
+        self._keys.append(key)
+        self._priorities.append(priority)
+
+    def _build_failure_links(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque()
+        visited = {0}
+
+        for child in goto[0].values():
+            if child not in visited:
+                visited.add(child)
+                queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                if child in visited:
+                    continue
+                visited.add(child)
+
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(ch, 0)
+                fail[child] = target if target != child else 0
+
+                if out[fail[child]]:
+                    out[child] = out[child] + out[fail[child]]
+                queue.append(child)
+
+    def find_all(self, text: str) -> List[Match]:
+        """
+        Find every trigger phrase in the text in a single pass.
+
+        Args:
+            text (str): The message to scan
+
+        Returns:
+            List[Match]: All matches, ordered by end position
+        """
+        matches: List[Match] = []
+        if not text:
+            return matches
+
+        goto, fail, out = self._goto, self._fail, self._out
+        keys, priorities = self._keys, self._priorities
+        whole_words = self.whole_words
+        text_len = len(text)
+        node = 0
+
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            if out[node]:
+                end = i + 1
+                for pattern_id in out[node]:
+                    key = keys[pattern_id]
+                    start = end - len(key)
+                    if whole_words and not _on_word_boundary(text, start, end, text_len):
+                        continue
+                    matches.append(Match(key, start, end, priorities[pattern_id]))
+
+        return matches
+
+    def first_match(self, text: str) -> Optional[Match]:
+        """
+        Return the first trigger phrase to complete while scanning the text.
+
+        The scan stops as soon as a match is found, which makes this the
+        cheapest way to ask whether any trigger occurs at all.
+
+        Args:
+            text (str): The message to scan
+
+        Returns:
+            Optional[Match]: The first match by end position, or None
+        """
+        if not text:
+            return None
+
+        goto, fail, out = self._goto, self._fail, self._out
+        keys, priorities = self._keys, self._priorities
+        whole_words = self.whole_words
+        text_len = len(text)
+        node = 0
+
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            if out[node]:
+                end = i + 1
+                for pattern_id in out[node]:
+                    key = keys[pattern_id]
+                    start = end - len(key)
+                    if whole_words and not _on_word_boundary(text, start, end, text_len):
+                        continue
+                    return Match(key, start, end, priorities[pattern_id])
+
+        return None
+
+    def best_match(self, text: str) -> Optional[Match]:
+        """
+        Return the highest-priority trigger phrase found in the text.
+
+        Args:
+            text (str): The message to scan
+
+        Returns:
+            Optional[Match]: The winning match, or None if nothing matched
+        """
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: (m.priority, m.start - m.end, m.start))
+
+
+def _case_variants(ch: str) -> Tuple[str, ...]:
+    """Return the characters that should share a transition with ``ch``."""
+    upper = ch.upper()
+    if upper != ch and len(upper) == 1 and upper.lower() == ch:
+        return (ch, upper)
+    return (ch,)
+
+
+def _on_word_boundary(text: str, start: int, end: int, text_len: int) -> bool:
+    """Check that the match is not glued to surrounding word characters."""
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < text_len and text[end].isalnum():
+        return False
+    return True
@@ -0,0 +1,357 @@
+"""
+LLM Client Module for Goldman Sachs Contact Center AI
+=====================================================
+
+This module provides one shared provider of OpenAI clients for every
+front-end. The provider builds each client once, backed by a pooled
+keep-alive HTTP connection pool, applies timeouts and retries centrally, and
+caps the number of completion requests in flight.
+
+Settings come from environment variables:
+
+- ``OPENAI_API_KEY``: API key (may also be passed in)
+- ``OPENAI_BASE_URL``: Alternative API endpoint, e.g. a local stub
+- ``OPENAI_TIMEOUT``: Request timeout in seconds (default: ``30``)
+- ``OPENAI_CONNECT_TIMEOUT``: Connect timeout in seconds (default: ``5``)
+- ``OPENAI_MAX_RETRIES``: Retries on transient errors (default: ``2``)
+- ``OPENAI_MAX_CONNECTIONS``: Connection pool size (default: ``100``)
+- ``OPENAI_MAX_KEEPALIVE``: Idle keep-alive connections kept (default: ``20``)
+- ``OPENAI_MAX_IN_FLIGHT``: Concurrent completion requests (default: ``64``)
+"""
+
+import asyncio
+import inspect
+import os
+import threading
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+
+class LLMCapacityError(TimeoutError):
+    """Raised when no in-flight slot frees up before the request timeout."""
+
+
+class BoundedClient:
+    """
+    Wraps an OpenAI client so at most ``max_in_flight`` completions run at once.
+
+    Callers block (up to ``acquire_timeout`` seconds) for a free slot. Streamed
+    completions hold their slot until the stream is exhausted or closed.
+    """
+
+    def __init__(self, client, max_in_flight: int, acquire_timeout: Optional[float] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            client: The OpenAI client to wrap
+            max_in_flight (int): Maximum concurrent completion requests
+            acquire_timeout (Optional[float]): Seconds to wait for a free slot
+        """
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.acquire_timeout = acquire_timeout
+        self.in_flight = 0
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._count_lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise LLMCapacityError("Request timeout waiting for a free LLM connection slot")
+        with self._count_lock:
+            self.in_flight += 1
+
+    def _release(self):
+        with self._count_lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _create(self, **kwargs):
+        self._acquire()
+        try:
+            result = self.client.chat.completions.create(**kwargs)
+        except BaseException:
+            self._release()
+            raise
+
+        if kwargs.get("stream"):
+            return self._release_when_done(result)
+        self._release()
+        return result
+
+    def _release_when_done(self, stream):
+        try:
+            for chunk in stream:
+                yield chunk
+        finally:
+            self._release()
+
+
+class AsyncBoundedClient:
+    """
+    Wraps an AsyncOpenAI client so at most ``max_in_flight`` completions run at once.
+
+    The semaphore binds to the event loop that first uses it, so each
+    serving process should use the client from a single loop.
+    """
+
+    def __init__(self, client, max_in_flight: int, acquire_timeout: Optional[float] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            client: The AsyncOpenAI client to wrap
+            max_in_flight (int): Maximum concurrent completion requests
+            acquire_timeout (Optional[float]): Seconds to wait for a free slot
+        """
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.acquire_timeout = acquire_timeout
+        self.in_flight = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def _acquire(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise LLMCapacityError("Request timeout waiting for a free LLM connection slot")
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+    async def _create(self, **kwargs):
+        await self._acquire()
+        try:
+            result = await self.client.chat.completions.create(**kwargs)
+        except BaseException:
+            self._release()
+            raise
+
+        if kwargs.get("stream"):
+            return self._release_when_done(result)
+        self._release()
+        return result
+
+    async def _release_when_done(self, stream):
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            self._release()
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+# Sent when only OPENAI_BASE_URL is set: local OpenAI-compatible servers need no key,
+# but the client refuses to start without one
+_NO_API_KEY = "sk-none"
+
+
+def _build_openai_client(settings: dict):
+    """Build a pooled OpenAI client."""
+    import httpx2
+    from openai import DefaultHttpxClient, OpenAI
+
+    http_client = DefaultHttpxClient(
+        limits=httpx2.Limits(max_connections=settings["max_connections"],
+                             max_keepalive_connections=settings["max_keepalive"]),
+        timeout=httpx2.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+    )
+    return OpenAI(api_key=settings["api_key"] or _NO_API_KEY, base_url=settings["base_url"],
+                  timeout=settings["timeout"], max_retries=settings["max_retries"],
+                  http_client=http_client)
+
+
+def _build_async_openai_client(settings: dict):
+    """Build a pooled AsyncOpenAI client."""
+    import httpx2
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx2.Limits(max_connections=settings["max_connections"],
+                             max_keepalive_connections=settings["max_keepalive"]),
+        timeout=httpx2.Timeout(settings["timeout"], connect=settings["connect_timeout"]),
+    )
+    return AsyncOpenAI(api_key=settings["api_key"] or _NO_API_KEY, base_url=settings["base_url"],
+                       timeout=settings["timeout"], max_retries=settings["max_retries"],
+                       http_client=http_client)
+
+
+class LLMClientProvider:
+    """
+    Builds and hands out the shared sync and async OpenAI clients.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 timeout: Optional[float] = None, connect_timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, max_connections: Optional[int] = None,
+                 max_keepalive: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 client_factory: Callable = _build_openai_client,
+                 async_client_factory: Callable = _build_async_openai_client):
+        """
+        Initialize the provider. Unset values fall back to the environment.
+
+        Args:
+            api_key (Optional[str]): OpenAI API key
+            base_url (Optional[str]): Alternative API endpoint
+            timeout (Optional[float]): Request timeout in seconds
+            connect_timeout (Optional[float]): Connect timeout in seconds
+            max_retries (Optional[int]): Retries on transient errors
+            max_connections (Optional[int]): Connection pool size
+            max_keepalive (Optional[int]): Idle keep-alive connections kept
+            max_in_flight (Optional[int]): Concurrent completion requests
+            client_factory (Callable): Builds the sync client from the settings
+            async_client_factory (Callable): Builds the async client from the settings
+        """
+        self.settings = {
+            "api_key": api_key or os.getenv('OPENAI_API_KEY'),
+            "base_url": base_url or os.getenv('OPENAI_BASE_URL'),
+            "timeout": timeout if timeout is not None else _env_float('OPENAI_TIMEOUT', 30.0),
+            "connect_timeout": connect_timeout if connect_timeout is not None
+            else _env_float('OPENAI_CONNECT_TIMEOUT', 5.0),
+            "max_retries": max_retries if max_retries is not None else _env_int('OPENAI_MAX_RETRIES', 2),
+            "max_connections": max_connections or _env_int('OPENAI_MAX_CONNECTIONS', 100),
+            "max_keepalive": max_keepalive or _env_int('OPENAI_MAX_KEEPALIVE', 20),
+            "max_in_flight": max_in_flight or _env_int('OPENAI_MAX_IN_FLIGHT', 64),
+        }
+        self._client_factory = client_factory
+        self._async_client_factory = async_client_factory
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self.settings["api_key"]
+
+    def get_client(self) -> BoundedClient:
+        """
+        Get the shared sync client, building it on first use.
+
+        Returns:
+            BoundedClient: The pooled, concurrency-capped client
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = BoundedClient(self._client_factory(self.settings),
+                                                 self.settings["max_in_flight"],
+                                                 acquire_timeout=self.settings["timeout"])
+        return self._client
+
+    def get_async_client(self) -> AsyncBoundedClient:
+        """
+        Get the shared async client, building it on first use.
+
+        Returns:
+            AsyncBoundedClient: The pooled, concurrency-capped async client
+        """
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = AsyncBoundedClient(self._async_client_factory(self.settings),
+                                                            self.settings["max_in_flight"],
+                                                            acquire_timeout=self.settings["timeout"])
+        return self._async_client
+
+    def _detach(self):
+        """Take both clients, so later calls build new ones."""
+        with self._lock:
+            clients = self._client, self._async_client
+            self._client = self._async_client = None
+        return clients
+
+    def close(self):
+        """
+        Close both clients' connection pools.
+
+        The async client is closed on a new event loop; from a running event
+        loop, await ``aclose`` instead.
+
+        Raises:
+            RuntimeError: If called from a running event loop
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("close() called from a running event loop; await aclose() instead")
+        client, async_client = self._detach()
+        _close_client(client)
+        if async_client is not None:
+            asyncio.run(_aclose_client(async_client))
+
+    async def aclose(self):
+        """Close both clients' connection pools from a running event loop."""
+        client, async_client = self._detach()
+        _close_client(client)
+        await _aclose_client(async_client)
+
+
+def _close_client(client: Optional[BoundedClient]):
+    if client is not None and hasattr(client.client, "close"):
+        client.client.close()
+
+
+async def _aclose_client(client: Optional[AsyncBoundedClient]):
+    # AsyncOpenAI.close() is a coroutine that closes its HTTP client's pool
+    close = getattr(client.client, "close", None) if client is not None else None
+    if close is not None:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+
+
+_provider: Optional[LLMClientProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider(api_key: Optional[str] = None) -> LLMClientProvider:
+    """
+    Get the process-wide client provider.
+
+    The provider is created on first use. Passing a different API key than
+    the current provider's replaces it. The old provider is not closed, since
+    callers may still hold its clients; its connections drain as those calls
+    finish and are released when it is garbage collected.
+
+    Args:
+        api_key (Optional[str]): API key to use instead of ``OPENAI_API_KEY``
+
+    Returns:
+        LLMClientProvider: The shared provider
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None or (api_key and api_key != _provider.api_key):
+            _provider = LLMClientProvider(api_key=api_key)
+        return _provider
+
+
+def set_provider(provider: Optional[LLMClientProvider]):
+    """
+    Replace the process-wide client provider (e.g. with one backed by a stub).
+
+    Args:
+        provider (Optional[LLMClientProvider]): The new provider, or None to reset
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,444 @@
+"""
+Local LLM Stub for Goldman Sachs Contact Center AI
+==================================================
+
+This module provides fake OpenAI clients with configurable latency. They
+expose the same ``client.chat.completions.create(...)`` surface as the
+OpenAI SDK, including ``stream=True``, so the chatbots, benchmarks and tests
+can run without network access or an API key.
+
+It also provides ``StubServer``, a local HTTP server that speaks the
+chat-completions protocol, including Server-Sent Events streaming, so the
+real OpenAI client can be exercised end to end. Its latency distribution,
+error and 429 rates and token throughput are configurable and seeded, so
+runs are repeatable:
+
+    python -m llm_stub --port 8089 --latency 0.4 --latency-dist lognormal --rate-limit-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=sk-stub python app.py
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_REPLY = "Thanks for reaching out! A specialist will follow up with the details you need."
+
+
+def _build_completion(model: str, content: str) -> SimpleNamespace:
+    """Build an object shaped like an OpenAI chat completion."""
+    message = SimpleNamespace(role="assistant", content=content)
+    choice = SimpleNamespace(index=0, message=message, finish_reason="stop")
+    return SimpleNamespace(id="chatcmpl-stub", object="chat.completion", model=model, choices=[choice])
+
+
+def split_tokens(content: str) -> List[str]:
+    """Split content into word-sized chunks that concatenate back to it."""
+    return re.findall(r"\s*\S+", content) or [content]
+
+
+def _build_chunk(model: str, content: Optional[str], finish_reason: Optional[str] = None) -> SimpleNamespace:
+    """Build an object shaped like an OpenAI streaming chunk."""
+    delta = SimpleNamespace(role="assistant", content=content)
+    choice = SimpleNamespace(index=0, delta=delta, finish_reason=finish_reason)
+    return SimpleNamespace(id="chatcmpl-stub", object="chat.completion.chunk", model=model, choices=[choice])
+
+
+class _StubCompletions:
+    """Synchronous ``chat.completions`` namespace."""
+
+    def __init__(self, owner: "StubOpenAI"):
+        self._owner = owner
+
+    def create(self, model: str = "stub", messages: List[Dict[str, str]] = (), stream: bool = False, **kwargs):
+        owner = self._owner
+        owner.calls += 1
+        if stream:
+            return self._stream(model)
+        if owner.latency:
+            time.sleep(owner.latency)
+        return _build_completion(model, owner.reply)
+
+    def _stream(self, model: str) -> Iterator[SimpleNamespace]:
+        owner = self._owner
+        if owner.latency:
+            time.sleep(owner.latency)
+        for index, token in enumerate(split_tokens(owner.reply)):
+            if index and owner.chunk_delay:
+                time.sleep(owner.chunk_delay)
+            yield _build_chunk(model, token)
+        yield _build_chunk(model, None, finish_reason="stop")
+
+
+class _StubAsyncCompletions:
+    """Asynchronous ``chat.completions`` namespace."""
+
+    def __init__(self, owner: "AsyncStubOpenAI"):
+        self._owner = owner
+
+    async def create(self, model: str = "stub", messages: List[Dict[str, str]] = (), stream: bool = False, **kwargs):
+        owner = self._owner
+        owner.calls += 1
+        if stream:
+            return self._stream(model)
+        if owner.latency:
+            await asyncio.sleep(owner.latency)
+        return _build_completion(model, owner.reply)
+
+    async def _stream(self, model: str) -> AsyncIterator[SimpleNamespace]:
+        owner = self._owner
+        if owner.latency:
+            await asyncio.sleep(owner.latency)
+        for index, token in enumerate(split_tokens(owner.reply)):
+            if index and owner.chunk_delay:
+                await asyncio.sleep(owner.chunk_delay)
+            yield _build_chunk(model, token)
+        yield _build_chunk(model, None, finish_reason="stop")
+
+
+class StubOpenAI:
+    """
+    Drop-in stand-in for ``openai.OpenAI`` that sleeps and returns a canned reply.
+    """
+
+    def __init__(self, latency: float = 0.0, reply: str = DEFAULT_REPLY, chunk_delay: float = 0.0):
+        """
+        Initialize the stub client.
+
+        Args:
+            latency (float): Seconds to wait before each completion (or first chunk)
+            reply (str): Content returned by every completion
+            chunk_delay (float): Seconds between streamed chunks
+        """
+        self.latency = latency
+        self.reply = reply
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_StubCompletions(self))
+
+
+class AsyncStubOpenAI:
+    """
+    Drop-in stand-in for ``openai.AsyncOpenAI`` that awaits and returns a canned reply.
+    """
+
+    def __init__(self, latency: float = 0.0, reply: str = DEFAULT_REPLY, chunk_delay: float = 0.0):
+        """
+        Initialize the stub client.
+
+        Args:
+            latency (float): Seconds to wait before each completion (or first chunk)
+            reply (str): Content returned by every completion
+            chunk_delay (float): Seconds between streamed chunks
+        """
+        self.latency = latency
+        self.reply = reply
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_StubAsyncCompletions(self))
+
+
+LATENCY_DISTRIBUTIONS = ("fixed", "exponential", "lognormal")
+
+
+class StubProfile:
+    """
+    How a ``StubServer`` behaves: latency, failures and token throughput.
+    """
+
+    def __init__(self, latency: float = 0.0, latency_dist: str = "fixed", latency_sigma: float = 0.5,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, tokens_per_second: float = 0.0,
+                 reply: str = DEFAULT_REPLY, seed: Optional[int] = None):
+        """
+        Initialize the profile.
+
+        Args:
+            latency (float): Seconds before the first token: the fixed value, the mean
+                ("exponential") or the median ("lognormal")
+            latency_dist (str): One of ``LATENCY_DISTRIBUTIONS``
+            latency_sigma (float): Shape of the "lognormal" distribution; larger means a longer tail
+            error_rate (float): Fraction of requests answered with a 500
+            rate_limit_rate (float): Fraction of requests answered with a 429
+            tokens_per_second (float): Rate completion tokens are generated at, or 0 for instant
+            reply (str): Content returned by every completion
+            seed (Optional[int]): Seed for repeatable latencies and failures
+        """
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.tokens_per_second = tokens_per_second
+        self.reply = reply
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> Tuple[Optional[int], float]:
+        """
+        Draw the outcome of one request.
+
+        Returns:
+            Tuple[Optional[int], float]: Error status to answer with (429 or 500), or None
+            for success, and the seconds to wait before the first token
+        """
+        with self._lock:
+            roll = self._random.random()
+            if self.latency <= 0 or self.latency_dist == "fixed":
+                latency = self.latency
+            elif self.latency_dist == "exponential":
+                latency = self._random.expovariate(1.0 / self.latency)
+            else:
+                latency = self._random.lognormvariate(math.log(self.latency), self.latency_sigma)
+        if roll < self.rate_limit_rate:
+            return 429, latency
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500, latency
+        return None, latency
+
+
+def _estimate_tokens(messages) -> int:
+    """Rough prompt token count, about four characters per token."""
+    return sum(4 + len(str(message.get("content") or "")) // 4 for message in messages
+               if isinstance(message, dict))
+
+
+def _error_body(message: str, error_type: str, code: Optional[str] = None) -> dict:
+    """Build an error body shaped like the OpenAI API's."""
+    return {"error": {"message": message, "type": error_type, "param": None, "code": code}}
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """Serves the chat-completions endpoint for a ``StubServer``."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "llm-stub"
+
+    def log_message(self, format, *args):
+        # Keep per-request access logs out of benchmark output
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Tuple[Tuple[str, str], ...] = ()):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/v1/models", "/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json(404, _error_body(f"Unknown path {self.path}", "invalid_request_error"))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_json(404, _error_body(f"Unknown path {self.path}", "invalid_request_error"))
+            return
+        try:
+            request = json.loads(body)
+            messages = request["messages"]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, _error_body("Request body must be JSON with a messages list",
+                                             "invalid_request_error"))
+            return
+
+        server = self.server.stub
+        profile = server.profile
+        status, latency = profile.sample()
+        server.record(status)
+        if latency:
+            time.sleep(latency)
+        if status == 429:
+            self._send_json(429, _error_body("Rate limit reached for requests (stub)", "requests",
+                                             "rate_limit_exceeded"),
+                            (("Retry-After", "1"), ("retry-after-ms", "1000")))
+            return
+        if status == 500:
+            self._send_json(500, _error_body("The server had an error while processing your request (stub)",
+                                             "server_error"))
+            return
+
+        model = request.get("model") or "stub"
+        tokens = split_tokens(profile.reply)
+        max_tokens = request.get("max_tokens") or request.get("max_completion_tokens")
+        finish_reason = "stop"
+        if max_tokens and len(tokens) > max_tokens:
+            tokens, finish_reason = tokens[:max_tokens], "length"
+        usage = {"prompt_tokens": _estimate_tokens(messages), "completion_tokens": len(tokens)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        token_delay = 1.0 / profile.tokens_per_second if profile.tokens_per_second > 0 else 0.0
+
+        if request.get("stream"):
+            self._stream(model, tokens, finish_reason, token_delay)
+            return
+        if token_delay:
+            time.sleep(token_delay * len(tokens))
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": finish_reason
+            }],
+            "usage": usage
+        })
+
+    def _stream(self, model: str, tokens: List[str], finish_reason: str, token_delay: float):
+        """Send the completion as Server-Sent Events in a chunked response."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        created = int(time.time())
+
+        def event(delta: dict, reason: Optional[str] = None) -> bytes:
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": reason}]
+            }
+            return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+        try:
+            self._send_chunk(event({"role": "assistant", "content": ""}))
+            for index, token in enumerate(tokens):
+                if index and token_delay:
+                    time.sleep(token_delay)
+                self._send_chunk(event({"content": token}))
+            self._send_chunk(event({}, finish_reason))
+            self._send_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. after its deadline passed
+            self.close_connection = True
+
+
+class StubServer:
+    """
+    Local OpenAI-compatible HTTP server, one thread per connection.
+    """
+
+    def __init__(self, profile: Optional[StubProfile] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server; it listens once ``start`` is called.
+
+        Args:
+            profile (Optional[StubProfile]): Behaviour of the server; instant replies by default
+            host (str): Interface to listen on
+            port (int): Port to listen on, or 0 for any free port
+        """
+        self.profile = profile or StubProfile()
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.failures = {429: 0, 500: 0}
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Value for ``OPENAI_BASE_URL`` pointing at this server."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def record(self, status: Optional[int]):
+        """Count one request and the failure it was answered with, if any."""
+        with self._lock:
+            self.requests += 1
+            if status is not None:
+                self.failures[status] += 1
+
+    def _bind(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self.port = self._httpd.server_address[1]
+
+    def start(self) -> "StubServer":
+        """Serve on a daemon thread and return self."""
+        if self._httpd is None:
+            self._bind()
+            # A short poll interval keeps stop() quick
+            self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,),
+                                            name="llm-stub", daemon=True)
+            self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted."""
+        self._bind()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        httpd, self._httpd = self._httpd, None
+        if httpd is not None:
+            httpd.shutdown()
+            httpd.server_close()
+            self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    """Run a stub server from the command line."""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat-completions stub server.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8089, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds before the first token (mean for exponential, median for lognormal)")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed",
+                        help="Latency distribution")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal shape; larger means a longer tail")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Completion token throughput; 0 sends the reply at once")
+    parser.add_argument("--reply", default=DEFAULT_REPLY, help="Content of every completion")
+    parser.add_argument("--seed", type=int, help="Seed for repeatable latencies and failures")
+    args = parser.parse_args()
+
+    profile = StubProfile(latency=args.latency, latency_dist=args.latency_dist, latency_sigma=args.latency_sigma,
+                          error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                          tokens_per_second=args.tokens_per_second, reply=args.reply, seed=args.seed)
+    server = StubServer(profile, host=args.host, port=args.port)
+    print(f"LLM stub listening; export OPENAI_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
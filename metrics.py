@@ -0,0 +1,343 @@
+"""
+Metrics Module for Goldman Sachs Contact Center AI
+==================================================
+
+This module provides counters, gauges and histograms that are cheap to update
+on the request hot path, and renders them in the Prometheus text exposition
+format for the ``/metrics`` endpoint.
+
+Every labelled series is split into a fixed number of shards, each with its
+own lock, and a thread always updates the shard picked by its thread ID.
+Concurrent updates from different threads rarely contend for a lock, and the
+shard count does not grow with the number of threads a server starts. Shards
+are summed when metrics are collected, which is rare compared to updates.
+"""
+
+import abc
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# Prime, so thread IDs (aligned addresses on most platforms) spread evenly
+SHARD_COUNT = 31
+
+
+class _Shards:
+    """A fixed set of locked value lists for one series."""
+
+    __slots__ = ("_shards", "_size")
+
+    def __init__(self, size: int):
+        self._size = size
+        self._shards: List[Tuple[threading.Lock, list]] = [
+            (threading.Lock(), [0.0] * size) for _ in range(SHARD_COUNT)]
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+    def get(self) -> Tuple[threading.Lock, list]:
+        """The calling thread's shard and the lock to hold while updating it."""
+        return self._shards[threading.get_ident() % SHARD_COUNT]
+
+    def totals(self) -> List[float]:
+        totals = [0.0] * self._size
+        for lock, values in self._shards:
+            with lock:
+                snapshot = list(values)
+            for index, value in enumerate(snapshot):
+                totals[index] += value
+        return totals
+
+
+class _CounterSeries:
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0):
+        lock, values = self._shards.get()
+        with lock:
+            values[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class _GaugeSeries:
+    __slots__ = ("_shards", "_function")
+
+    def __init__(self):
+        self._shards = _Shards(1)
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0):
+        lock, values = self._shards.get()
+        with lock:
+            values[0] += amount
+
+    def dec(self, amount: float = 1.0):
+        lock, values = self._shards.get()
+        with lock:
+            values[0] -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Report the value returned by ``function`` at collection time instead."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._shards.totals()[0]
+
+
+class _HistogramSeries:
+    __slots__ = ("_shards", "_bounds")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # One count per bucket, one for +Inf, then the sum of observations
+        self._shards = _Shards(len(bounds) + 2)
+
+    def observe(self, value: float):
+        bucket = bisect.bisect_left(self._bounds, value)
+        lock, values = self._shards.get()
+        with lock:
+            values[bucket] += 1
+            values[-1] += value
+
+    def totals(self) -> Tuple[List[float], float]:
+        """Per-bucket (non-cumulative) counts, including +Inf, and the sum."""
+        totals = self._shards.totals()
+        return totals[:-1], totals[-1]
+
+
+class _Metric(abc.ABC):
+    """A metric family: one series per combination of label values."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    @abc.abstractmethod
+    def _new_series(self):
+        """Create the series for one combination of label values."""
+
+    def labels(self, *values, **kwvalues):
+        """
+        Get the series for the given label values, creating it on first use.
+
+        Hot paths should look a series up once and keep the reference.
+        """
+        if kwvalues:
+            values = tuple(str(kwvalues[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                series = self._series.get(values)
+                if series is None:
+                    series = self._series[values] = self._new_series()
+        return series
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._series.items())
+
+    def render(self) -> List[str]:
+        """Render the family in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}",
+                 f"# TYPE {self.name} {self.type_name}"]
+        for values, series in self._items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}",
+                 f"# TYPE {self.name} histogram"]
+        bucket_labels = self.labelnames + ("le",)
+        for values, series in self._items():
+            counts, total = series.totals()
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(bucket_labels, values + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metric families rendered together.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition, ending with a newline
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Process-wide registry served by the web apps
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "chatbot_http_request_duration_seconds", "Time to handle an HTTP request.",
+    ("route", "method", "status"))
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "chatbot_http_requests_in_flight", "HTTP requests currently being handled.", ("route",))
+CORE_RESPONSES = registry.counter(
+    "chatbot_core_responses_total",
+    "ChatbotCore replies by result: predefined hit, fallback, invalid input or error.", ("result",))
+LLM_REQUEST_SECONDS = registry.histogram(
+    "chatbot_llm_request_duration_seconds", "Time spent waiting for LLM completions.", ("outcome",))
+LLM_ERRORS = registry.counter(
+    "chatbot_llm_errors_total", "Failed LLM calls by error category.", ("category",))
+CATALOG_RELOADS = registry.counter(
+    "chatbot_catalog_reloads_total", "Response catalog reloads by result.", ("result",))
+SINGLEFLIGHT_REQUESTS = registry.counter(
+    "chatbot_singleflight_requests_total",
+    "Requests through single-flight groups: the leader made the call, shared ones reused it.",
+    ("group", "role"))
+LLM_ADMISSIONS = registry.counter(
+    "chatbot_llm_admissions_total",
+    "LLM calls by rate limiter decision: admitted at once, delayed in the queue, or shed.", ("result",))
+LLM_ADMISSION_WAITING = registry.gauge(
+    "chatbot_llm_admission_waiting", "LLM calls waiting in the rate limiter queue.")
+LLM_HEDGED_REPLIES = registry.counter(
+    "chatbot_llm_hedged_replies_total",
+    "Replies to LLM calls made with a deadline or hedge, by what answered: the LLM in time, "
+    "the hedge, a cached reply after the deadline, or nothing.", ("outcome",))
+ROUTER_STAGE_SECONDS = registry.histogram(
+    "chatbot_router_stage_duration_seconds", "Time spent in each routing stage that ran.", ("router", "stage"))
+ROUTER_ANSWERS = registry.counter(
+    "chatbot_router_answers_total", "Messages answered, by router and the stage that answered.",
+    ("router", "stage"))
+DIALOG_EVENTS = registry.counter(
+    "chatbot_dialog_events_total", "Dialog flows started, finished, cancelled or abandoned after a second unusable reply, by flow.", ("flow", "event"))
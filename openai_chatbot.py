@@ -8,12 +8,20 @@ Requires an OpenAI API key to function.
 """
 
 import os
-from openai import OpenAI
-from typing import Optional
+from typing import Iterator, Optional
+from llm_client import get_provider
+from input_screening import default_screener
+from response_cache import make_cache_key
+from singleflight import SingleFlight
 
-# Global OpenAI client
+# OpenAI client, shared with the other front-ends through llm_client
 client = None
 
+# Coalesces concurrent requests for the same message
+_flight = SingleFlight("openai_chatbot")
+
+SYSTEM_PROMPT = "You are a friendly, helpful chatbot. Respond naturally and conversationally, as if talking to a friend. Keep responses concise but engaging."
+
 def setup_openai():
     """
     Set up OpenAI API client with API key.
@@ -36,7 +44,7 @@ def setup_openai():
     
     # Initialize OpenAI client
     try:
-        client = OpenAI(api_key=api_key)
+        client = get_provider(api_key=api_key).get_client()
         print("✅ OpenAI API key configured successfully!")
         return True
     except Exception as e:
@@ -53,41 +61,79 @@ def get_openai_response(user_message: str) -> Optional[str]:
     Returns:
         Optional[str]: AI response or None if error occurred
     """
+    try:
+        # Concurrent identical messages share one API call
+        return _flight.do(make_cache_key(user_message, SYSTEM_PROMPT),
+                          lambda: request_completion(user_message))
+    except Exception as e:
+        report_error(e)
+        return None
+
+def request_completion(user_message: str) -> str:
+    """Make one chat completion request and return the reply text."""
+    # Create the chat completion request using the new API
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",  # You can change this to "gpt-4" if you have access
+        messages=build_messages(user_message),
+        max_tokens=150,  # Limit response length for terminal chat
+        temperature=0.7  # Add some creativity to responses
+    )
+    
+    # Extract the AI's response
+    return response.choices[0].message.content.strip()
+
+def stream_openai_response(user_message: str) -> Iterator[str]:
+    """
+    Send user message to OpenAI and yield the response as it arrives.
+    
+    Args:
+        user_message (str): The user's input message
+    
+    Yields:
+        str: Response tokens in order; nothing if an error occurred first
+    """
     global client
     
     try:
-        # Create the chat completion request using the new API
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # You can change this to "gpt-4" if you have access
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are a friendly, helpful chatbot. Respond naturally and conversationally, as if talking to a friend. Keep responses concise but engaging."
-                },
-                {
-                    "role": "user", 
-                    "content": user_message
-                }
-            ],
-            max_tokens=150,  # Limit response length for terminal chat
-            temperature=0.7  # Add some creativity to responses
+        stream = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=build_messages(user_message),
+            max_tokens=150,
+            temperature=0.7,
+            stream=True
         )
         
-        # Extract the AI's response
-        ai_response = response.choices[0].message.content.strip()
-        return ai_response
-        
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+                
     except Exception as e:
-        error_msg = str(e)
-        if "authentication" in error_msg.lower() or "unauthorized" in error_msg.lower():
-            print("❌ Authentication failed. Please check your API key.")
-        elif "rate limit" in error_msg.lower():
-            print("❌ Rate limit exceeded. Please wait a moment and try again.")
-        elif "api" in error_msg.lower():
-            print(f"❌ OpenAI API error: {e}")
-        else:
-            print(f"❌ Unexpected error: {e}")
-        return None
+        report_error(e)
+
+def build_messages(user_message: str) -> list:
+    """Build the chat messages sent to OpenAI for one user message."""
+    return [
+        {
+            "role": "system", 
+            "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user", 
+            "content": user_message
+        }
+    ]
+
+def report_error(e: Exception):
+    """Print a friendly message for the given API error."""
+    error_msg = str(e)
+    if "authentication" in error_msg.lower() or "unauthorized" in error_msg.lower():
+        print("❌ Authentication failed. Please check your API key.")
+    elif "rate limit" in error_msg.lower():
+        print("❌ Rate limit exceeded. Please wait a moment and try again.")
+    elif "api" in error_msg.lower():
+        print(f"❌ OpenAI API error: {e}")
+    else:
+        print(f"❌ Unexpected error: {e}")
 
 def chat_loop():
     """
@@ -110,14 +156,26 @@ def chat_loop():
             print("🤖 I didn't catch that. What did you say?")
             continue
         
+        # Reject harmful input before it is sent to the API
+        screening = default_screener.screen(user_input)
+        if screening is not None:
+            print(f"🤖 Sorry, I can't process that message ({screening.category}).")
+            continue
+        
         # Show that we're thinking
         print("🤖 Thinking...")
         
-        # Get AI response
-        ai_response = get_openai_response(user_input)
+        # Stream the AI response as it arrives
+        received = False
+        for token in stream_openai_response(user_input):
+            if not received:
+                print("🤖 ", end="", flush=True)
+                token = token.lstrip()
+                received = True
+            print(token, end="", flush=True)
         
-        if ai_response:
-            print(f"🤖 {ai_response}")
+        if received:
+            print()
         else:
             print("🤖 Sorry, I'm having trouble connecting right now. Please try again.")
 
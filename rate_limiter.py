@@ -0,0 +1,221 @@
+"""
+Rate Limiter Module for Goldman Sachs Contact Center AI
+=======================================================
+
+This module provides client-side admission control for LLM calls. Two token
+buckets, one counting requests and one counting tokens, keep the call rate
+under the provider's limits, so requests wait here briefly instead of
+failing upstream with a rate limit error.
+
+Admission is decided up front. A request that can go now goes. One that
+would have to wait reserves its place, which keeps the queue first come,
+first served, and sleeps until that time. A request is shed at once with
+``Overloaded`` if the wait queue is full or its wait would exceed
+``max_wait``. Under overload latency is therefore capped at ``max_wait``
+rather than piling up into upstream timeouts.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from metrics import LLM_ADMISSIONS, LLM_ADMISSION_WAITING
+
+_ADMITTED = LLM_ADMISSIONS.labels(result="admitted")
+_DELAYED = LLM_ADMISSIONS.labels(result="delayed")
+_SHED = LLM_ADMISSIONS.labels(result="shed")
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of being queued."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """``retry_after`` rounded up to whole seconds, for a Retry-After header."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """
+    Token bucket whose balance may go negative to reserve future capacity.
+
+    Not thread-safe; ``RateLimiter`` serializes access.
+    """
+
+    __slots__ = ("rate", "capacity", "_balance", "_updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): Units added per second
+            capacity (float): Largest balance, i.e. the burst size
+            now (float): Current clock reading
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._balance = capacity
+        self._updated = now
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._balance = min(self.capacity, self._balance + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available, given earlier reservations."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self._balance
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float, now: float):
+        """Take ``amount`` units, reserving future ones if the bucket is short."""
+        self._refill(now)
+        self._balance -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Request and token buckets with a bounded wait queue in front of them.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float] = None,
+                 max_queue: int = 64, max_wait: float = 5.0, burst_seconds: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute (float): Sustained request rate allowed
+            tokens_per_minute (Optional[float]): Sustained token rate allowed, or None for no token limit
+            max_queue (int): Requests allowed to wait at once; more are shed
+            max_wait (float): Longest wait in seconds a request is admitted with
+            burst_seconds (float): Seconds of sustained rate that may be sent at once
+            clock (Callable[[], float]): Time source, injectable for tests
+        """
+        now = clock()
+        self._requests = TokenBucket(requests_per_minute / 60.0,
+                                     max(1.0, requests_per_minute / 60.0 * burst_seconds), now)
+        self._tokens = None
+        if tokens_per_minute:
+            self._tokens = TokenBucket(tokens_per_minute / 60.0,
+                                       max(1.0, tokens_per_minute / 60.0 * burst_seconds), now)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        """Number of admitted requests currently waiting for their turn."""
+        return self._waiting
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Admit a request and reserve its place.
+
+        Args:
+            tokens (int): Estimated tokens the request will use
+
+        Returns:
+            float: Seconds to wait before sending the request; the caller must
+            call ``release`` after waiting if this is more than zero
+
+        Raises:
+            Overloaded: If the queue is full or the wait would exceed ``max_wait``
+        """
+        with self._lock:
+            now = self._clock()
+            wait = self._requests.wait_time(1, now)
+            if self._tokens is not None and tokens:
+                wait = max(wait, self._tokens.wait_time(tokens, now))
+
+            if wait > 0 and self._waiting >= self.max_queue:
+                _SHED.inc()
+                raise Overloaded(f"LLM wait queue is full ({self.max_queue} waiting)", retry_after=wait)
+            if wait > self.max_wait:
+                _SHED.inc()
+                raise Overloaded(f"LLM rate limit would delay the request {wait:.1f}s", retry_after=wait)
+
+            self._requests.take(1, now)
+            if self._tokens is not None and tokens:
+                self._tokens.take(tokens, now)
+            if wait > 0:
+                self._waiting += 1
+                LLM_ADMISSION_WAITING.inc()
+                _DELAYED.inc()
+            else:
+                _ADMITTED.inc()
+        return wait
+
+    def release(self):
+        """Leave the wait queue after sleeping off a reservation."""
+        with self._lock:
+            self._waiting -= 1
+        LLM_ADMISSION_WAITING.dec()
+
+    def acquire(self, tokens: int = 0):
+        """
+        Wait for a request's turn on the calling thread.
+
+        Args:
+            tokens (int): Estimated tokens the request will use
+
+        Raises:
+            Overloaded: If the request is shed
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self.release()
+
+    async def acquire_async(self, tokens: int = 0):
+        """
+        Wait for a request's turn without blocking the event loop.
+
+        Args:
+            tokens (int): Estimated tokens the request will use
+
+        Raises:
+            Overloaded: If the request is shed
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self.release()
+
+
+def rate_limiter_from_env() -> Optional[RateLimiter]:
+    """
+    Build a limiter from ``LLM_RATE_LIMIT_RPM`` and related variables.
+
+    ``LLM_RATE_LIMIT_TPM`` sets the token limit, ``LLM_QUEUE_SIZE`` the wait
+    queue length and ``LLM_QUEUE_TIMEOUT`` the longest wait in seconds.
+
+    Returns:
+        Optional[RateLimiter]: The limiter, or None if no request rate is configured
+    """
+    requests_per_minute = float(os.getenv('LLM_RATE_LIMIT_RPM', 0))
+    if requests_per_minute <= 0:
+        return None
+    return RateLimiter(
+        requests_per_minute,
+        tokens_per_minute=float(os.getenv('LLM_RATE_LIMIT_TPM', 0)) or None,
+        max_queue=int(os.getenv('LLM_QUEUE_SIZE', 64)),
+        max_wait=float(os.getenv('LLM_QUEUE_TIMEOUT', 5)),
+    )
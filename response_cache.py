@@ -0,0 +1,139 @@
+"""
+Response Cache Module for Goldman Sachs Contact Center AI
+=========================================================
+
+This module provides a bounded LRU cache with per-entry expiry (TTL) that
+sits in front of the OpenAI call path, so repeated FAQ-style questions are
+answered from memory instead of a fresh completion.
+
+Any object with the same ``get``/``set`` methods can be plugged into
+``AIChatbot`` in place of ``ResponseCache``.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase the message and collapse runs of whitespace."""
+    return " ".join(message.lower().split())
+
+
+def make_cache_key(message: str, system_prompt: str, history: Iterable[Dict[str, str]] = ()) -> bytes:
+    """
+    Build a compact cache key for a completion request.
+
+    Args:
+        message (str): The user's message (normalized before hashing)
+        system_prompt (str): System prompt sent with the request
+        history (Iterable[Dict[str, str]]): Conversation history sent with the request
+
+    Returns:
+        bytes: A 16-byte digest identifying the request
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(system_prompt.encode("utf-8"))
+    for entry in history:
+        digest.update(b"\x00" + entry["role"].encode("utf-8") + b"\x01" + entry["content"].encode("utf-8"))
+    digest.update(b"\x02" + normalize_message(message).encode("utf-8"))
+    return digest.digest()
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a time-to-live on every entry.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept in memory
+            ttl (float): Seconds an entry stays valid after it is stored
+            clock (Callable[[], float]): Time source, injectable for tests
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[str]:
+        """
+        Look up a cached response, refreshing its LRU position.
+
+        Args:
+            key (bytes): Key from ``make_cache_key``
+
+        Returns:
+            Optional[str]: The cached response, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: bytes, value: str):
+        """
+        Store a response, evicting the least recently used entry if full.
+
+        Args:
+            key (bytes): Key from ``make_cache_key``
+            value (str): The response to cache
+        """
+        with self._lock:
+            self._entries[key] = (value, self._clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict[str, float]: Size, hits, misses, evictions, expirations and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
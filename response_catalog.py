@@ -0,0 +1,202 @@
+"""
+Response Catalog Module for Goldman Sachs Contact Center AI
+===========================================================
+
+This module provides the immutable, versioned response catalog used by
+``ChatbotCore``. Each catalog version bundles the responses with every index
+derived from them (the keyword matcher, the typo-tolerant fuzzy matcher and
+the serialized snapshot).
+
+Updates never modify a published catalog. A writer builds a complete new
+version and swaps the reference in one assignment (read-copy-update), so
+readers can use whichever version they picked up without taking a lock.
+"""
+
+import hashlib
+import json
+from collections.abc import MutableMapping
+from typing import Iterable, Mapping, NamedTuple, Optional, Tuple, Union
+
+from fuzzy_matcher import FuzzyMatcher
+from intent_matcher import IntentMatcher
+
+ResponseUpdates = Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+
+
+class CatalogSnapshot(NamedTuple):
+    """Serialized response catalog for one catalog version."""
+
+    version: int
+    etag: str
+    body: bytes
+
+
+class FrozenResponses(dict):
+    """
+    Read-only dict of trigger phrase to response.
+
+    Subclasses ``dict`` so lookups stay as fast as a plain dict, but every
+    mutating method raises ``TypeError``.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Response catalog versions are immutable; use ChatbotCore.add_responses")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def copy(self) -> dict:
+        return dict(self)
+
+
+class ResponseCatalog:
+    """
+    One immutable version of the response catalog and its derived indexes.
+    """
+
+    __slots__ = ("version", "responses", "_matcher", "_fuzzy", "_snapshot")
+
+    def __init__(self, responses: Mapping[str, str], version: int = 1, lazy: bool = False):
+        """
+        Build a catalog version and its indexes.
+
+        Read-only mappings (a ``FrozenResponses`` or any ``Mapping`` that is
+        not a ``MutableMapping``, such as a memory-mapped catalog file) are
+        used as they are; anything else is copied.
+
+        Args:
+            responses (Mapping[str, str]): Lowercased trigger phrase to response
+            version (int): Version number of this catalog
+            lazy (bool): Build the keyword matcher on first use instead of now
+        """
+        self.version = version
+        if isinstance(responses, FrozenResponses) or not isinstance(responses, (dict, MutableMapping)):
+            self.responses = responses
+        else:
+            self.responses = FrozenResponses(responses)
+        self._matcher: Optional[IntentMatcher] = None if lazy else IntentMatcher(self.responses)
+        self._fuzzy: Optional[FuzzyMatcher] = None
+        self._snapshot: Optional[CatalogSnapshot] = None
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    @property
+    def matcher(self) -> IntentMatcher:
+        """Keyword matcher over the trigger phrases."""
+        matcher = self._matcher
+        if matcher is None:
+            matcher = self._matcher = IntentMatcher(self.responses)
+        return matcher
+
+    @property
+    def fuzzy(self) -> FuzzyMatcher:
+        """Typo-tolerant matcher over the trigger words, built on first use."""
+        fuzzy = self._fuzzy
+        if fuzzy is None:
+            fuzzy = self._fuzzy = FuzzyMatcher(self.responses)
+        return fuzzy
+
+    def warm(self) -> "ResponseCatalog":
+        """
+        Build the lookup indexes that are otherwise built on first use.
+
+        Call this before publishing a version so no request pays for it.
+
+        Returns:
+            ResponseCatalog: This catalog
+        """
+        self.matcher
+        self.fuzzy
+        return self
+
+    def lookup(self, cleaned_input: str, fuzzy: bool = True) -> Optional[str]:
+        """
+        Look up a response: an exact match first, then the best keyword match.
+
+        If both miss, misspelled words are corrected to the nearest trigger
+        words and the corrected input is looked up the same way.
+
+        Args:
+            cleaned_input (str): Lowercased, stripped user input
+            fuzzy (bool): Try typo correction when nothing matches as typed
+
+        Returns:
+            Optional[str]: The matching response, or None
+        """
+        response = self._match(cleaned_input)
+        if response is not None or not fuzzy:
+            return response
+
+        corrected, corrections = self.fuzzy.correct(cleaned_input)
+        if corrections:
+            return self._match(corrected)
+        return None
+
+    def _match(self, cleaned_input: str) -> Optional[str]:
+        """Exact match on the whole input, then the best keyword match."""
+        response = self.responses.get(cleaned_input)
+        if response is not None:
+            return response
+
+        match = self.matcher.best_match(cleaned_input)
+        if match is not None:
+            return self.responses[match.key]
+        return None
+
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Get the serialized catalog, building it on first use.
+
+        Returns:
+            CatalogSnapshot: Version, ETag and JSON body of this catalog
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            body = json.dumps({
+                "responses": self.responses.copy(),
+                "count": len(self.responses)
+            }).encode("utf-8")
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            snapshot = CatalogSnapshot(self.version, etag, body)
+            self._snapshot = snapshot
+        return snapshot
+
+    def with_updates(self, updates: Mapping[str, str], removals: Iterable[str] = ()) -> "ResponseCatalog":
+        """
+        Build the next catalog version with the given changes applied.
+
+        Args:
+            updates (Mapping[str, str]): Normalized entries to add or replace
+            removals (Iterable[str]): Normalized keys to remove
+
+        Returns:
+            ResponseCatalog: The new version; this one is left unchanged
+        """
+        responses = dict(self.responses)
+        for key in removals:
+            responses.pop(key, None)
+        responses.update(updates)
+        return ResponseCatalog(responses, self.version + 1)
+
+
+def normalize_updates(updates: ResponseUpdates) -> Tuple[dict, int]:
+    """
+    Validate and normalize response updates.
+
+    Args:
+        updates (ResponseUpdates): Mapping or (key, response) pairs
+
+    Returns:
+        Tuple[dict, int]: Normalized entries and the number of invalid ones skipped
+    """
+    items = updates.items() if isinstance(updates, Mapping) else updates
+    normalized = {}
+    skipped = 0
+    for key, response in items:
+        if not key or not response or not isinstance(key, str) or not isinstance(response, str):
+            skipped += 1
+            continue
+        normalized[key.lower()] = response
+    return normalized, skipped
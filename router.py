@@ -0,0 +1,399 @@
+"""
+Router Module for Goldman Sachs Contact Center AI
+=================================================
+
+This module answers each message with the cheapest stage that can. A router
+tries its stages in order of cost, for example exact lookup, keyword rules,
+typo correction, knowledge base retrieval, the response cache and finally
+the LLM, and returns the first answer; the fallback reply is used if none
+answers. Stages compile what they match against once, when they are built or
+when the catalog they read is replaced, never per message.
+
+Every stage that runs is timed in ``chatbot_router_stage_duration_seconds``
+and every answer is counted by the stage that gave it in
+``chatbot_router_answers_total``, so the share of traffic reaching the LLM
+is visible per router.
+"""
+
+import abc
+import time
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from intent_matcher import IntentMatcher
+from metrics import ROUTER_ANSWERS, ROUTER_STAGE_SECONDS
+
+
+class RouteRequest:
+    """One message being routed."""
+
+    __slots__ = ("text", "cleaned", "history")
+
+    def __init__(self, text: str, history=None):
+        """
+        Initialize the request.
+
+        Args:
+            text (str): The message as sent
+            history: Optional ConversationHistory the turn belongs to
+        """
+        self.text = text
+        self.cleaned = text.lower().strip()
+        self.history = history
+
+
+class RouteResult(NamedTuple):
+    """The reply to a message and the stage that gave it."""
+
+    text: str
+    stage: str
+
+
+class Stage(abc.ABC):
+    """
+    One way of answering messages.
+
+    Subclasses implement ``answer``, which returns None to pass the message
+    on to the next stage. Stages that can send their reply as it is produced
+    also implement ``stream``.
+    """
+
+    name = "stage"
+    # True if answering records the turn in the history itself
+    records_turn = False
+    # True if ``stream`` yields the reply token by token
+    streams = False
+
+    @abc.abstractmethod
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        """Answer the message, or return None to pass it on."""
+
+    async def answer_async(self, request: RouteRequest) -> Optional[str]:
+        """Answer without blocking the event loop; cheap stages just answer."""
+        return self.answer(request)
+
+    def stream(self, request: RouteRequest) -> Iterator[str]:
+        """Yield the reply token by token; only stages that set ``streams`` implement it."""
+        raise TypeError(f"{self.name} stage does not stream")
+
+
+class ExactStage(Stage):
+    """Looks the whole message up in a ChatbotCore's current catalog."""
+
+    name = "exact"
+
+    def __init__(self, core):
+        self.core = core
+
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        return self.core.catalog.responses.get(request.cleaned)
+
+
+class KeywordStage(Stage):
+    """Picks the best trigger phrase of the catalog found in the message."""
+
+    name = "keyword"
+
+    def __init__(self, core):
+        self.core = core
+
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        catalog = self.core.catalog
+        match = catalog.matcher.best_match(request.cleaned)
+        return catalog.responses[match.key] if match is not None else None
+
+
+class FuzzyStage(Stage):
+    """Corrects misspelled trigger words and looks the message up again."""
+
+    name = "fuzzy"
+
+    def __init__(self, core):
+        self.core = core
+
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        if not self.core.fuzzy_matching:
+            return None
+        catalog = self.core.catalog
+        corrected, corrections = catalog.fuzzy.correct(request.cleaned)
+        return catalog.lookup(corrected, fuzzy=False) if corrections else None
+
+
+class RetrievalStage(Stage):
+    """Searches a ChatbotCore's knowledge base, if it has one."""
+
+    name = "retrieval"
+
+    def __init__(self, core):
+        self.core = core
+
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        retriever = self.core.retriever
+        return retriever.best_answer(request.cleaned) if retriever is not None else None
+
+
+class RulesStage(Stage):
+    """
+    Keyword rules: the first rule with a phrase found in the message answers.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[Sequence[str], str]], whole_words: bool = True,
+                 name: str = "rules"):
+        """
+        Compile the rules.
+
+        Args:
+            rules (Sequence[Tuple[Sequence[str], str]]): (phrases, reply) pairs in priority order
+            whole_words (bool): Only match phrases on word boundaries
+            name (str): Stage label for the metrics
+        """
+        self.name = name
+        self.replies = [reply for _, reply in rules]
+        self.matcher = IntentMatcher(
+            [phrase for phrases, _ in rules for phrase in phrases],
+            priorities={phrase: index for index, (phrases, _) in enumerate(rules) for phrase in phrases},
+            whole_words=whole_words,
+        )
+
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        match = self.matcher.best_match(request.cleaned)
+        return self.replies[match.priority] if match is not None else None
+
+
+class CoreStage(Stage):
+    """
+    A ChatbotCore's own answer, found through its router.
+
+    Its exact, keyword, fuzzy and retrieval stages are timed under the
+    "core" router.
+    """
+
+    name = "catalog"
+
+    def __init__(self, core):
+        self.core = core
+
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        return self.core.confident_response(request.text)
+
+
+class CacheStage(Stage):
+    """Answers from an AIChatbot's response cache without calling the API."""
+
+    name = "cache"
+
+    def __init__(self, ai_chatbot):
+        self.ai_chatbot = ai_chatbot
+
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        return self.ai_chatbot.cached_response(request.text, history=request.history)
+
+
+class LLMStage(Stage):
+    """
+    Asks an AIChatbot, which records the turn itself.
+
+    Meant to follow a ``CacheStage``, so the cache is not looked up twice.
+    """
+
+    name = "llm"
+    records_turn = True
+    streams = True
+
+    def __init__(self, ai_chatbot, deadline: Optional[float] = None, hedge: Optional[Stage] = None):
+        """
+        Initialize the stage.
+
+        Args:
+            ai_chatbot: The AIChatbot to ask
+            deadline (Optional[float]): Seconds to wait for the API before passing
+            hedge (Optional[Stage]): Cheaper stage raced against the API call
+        """
+        self.ai_chatbot = ai_chatbot
+        self.deadline = deadline
+        self.hedge = hedge
+
+    def answer(self, request: RouteRequest) -> Optional[str]:
+        hedge = (lambda: self.hedge.answer(request)) if self.hedge is not None else None
+        return self.ai_chatbot.get_ai_response(request.text, history=request.history, deadline=self.deadline,
+                                               hedge=hedge, check_cache=False)
+
+    def stream(self, request: RouteRequest) -> Iterator[str]:
+        # A stream has no deadline to race, so the hedge is simply asked first
+        answer = self.hedge.answer(request) if self.hedge is not None else None
+        if answer:
+            if request.history is not None:
+                request.history.add_turn(request.text, answer)
+            yield answer
+            return
+        yield from self.ai_chatbot.stream_ai_response(request.text, history=request.history)
+
+    async def answer_async(self, request: RouteRequest) -> Optional[str]:
+        hedge = (lambda: self.hedge.answer(request)) if self.hedge is not None else None
+        return await self.ai_chatbot.get_ai_response_async(request.text, history=request.history,
+                                                           deadline=self.deadline, hedge=hedge,
+                                                           check_cache=False)
+
+
+class Router:
+    """
+    Tries stages in order and returns the first answer.
+    """
+
+    def __init__(self, stages: Sequence[Stage], fallback: Optional[str] = None, name: str = "router"):
+        """
+        Initialize the router.
+
+        Args:
+            stages (Sequence[Stage]): Stages, cheapest first
+            fallback (Optional[str]): Reply when no stage answers
+            name (str): Router label for the metrics
+        """
+        self.stages: Tuple[Stage, ...] = tuple(stages)
+        self.fallback = fallback
+        self.name = name
+        # Metric series looked up once, so timing a stage is a single observation
+        self._plan = [(stage, ROUTER_STAGE_SECONDS.labels(name, stage.name), ROUTER_ANSWERS.labels(name, stage.name))
+                      for stage in self.stages]
+        self._fallbacks = ROUTER_ANSWERS.labels(name, "fallback")
+
+    @staticmethod
+    def _answered(stage: Stage, answers, request: RouteRequest, text: str) -> RouteResult:
+        answers.inc()
+        if request.history is not None and not stage.records_turn:
+            request.history.add_turn(request.text, text)
+        return RouteResult(text, stage.name)
+
+    def _fell_back(self, request: RouteRequest) -> RouteResult:
+        self._fallbacks.inc()
+        if request.history is not None:
+            request.history.add_turn(request.text, self.fallback)
+        return RouteResult(self.fallback, "fallback")
+
+    def _answer(self, request: RouteRequest) -> Optional[RouteResult]:
+        perf_counter = time.perf_counter
+        for stage, timer, answers in self._plan:
+            started = perf_counter()
+            text = stage.answer(request)
+            timer.observe(perf_counter() - started)
+            if text:
+                return self._answered(stage, answers, request, text)
+        return None
+
+    def stream(self, user_input: str, history=None) -> Tuple[Optional[RouteResult], Optional[Iterator[str]]]:
+        """
+        Get the answer of the stages before the first streaming stage, or that stage's tokens.
+
+        Stages are tried in order as in ``answer`` until one answers or one
+        can stream. A streaming stage is counted as answering when its tokens
+        are handed out, but not timed; it records the turn itself once the
+        tokens have all been consumed.
+
+        Args:
+            user_input (str): The user's message
+            history: Optional ConversationHistory to record the turn in and give the LLM
+
+        Returns:
+            Tuple[Optional[RouteResult], Optional[Iterator[str]]]: The answer and its stage,
+            or the streaming stage's tokens; (None, None) if no stage answered or streams
+        """
+        request = RouteRequest(user_input, history)
+        perf_counter = time.perf_counter
+        for stage, timer, answers in self._plan:
+            if stage.streams:
+                answers.inc()
+                return None, stage.stream(request)
+            started = perf_counter()
+            text = stage.answer(request)
+            timer.observe(perf_counter() - started)
+            if text:
+                return self._answered(stage, answers, request, text), None
+        return None, None
+
+    def answer(self, user_input: str, history=None) -> Optional[RouteResult]:
+        """
+        Get the first stage's answer, without falling back.
+
+        Args:
+            user_input (str): The user's message
+            history: Optional ConversationHistory to record the turn in and give the LLM
+
+        Returns:
+            Optional[RouteResult]: The answer and its stage, or None if no stage answered
+        """
+        return self._answer(RouteRequest(user_input, history))
+
+    def route(self, user_input: str, history=None) -> RouteResult:
+        """
+        Get the first stage's answer, or the fallback reply.
+
+        Args:
+            user_input (str): The user's message
+            history: Optional ConversationHistory to record the turn in and give the LLM
+
+        Returns:
+            RouteResult: The reply and the stage that gave it ("fallback" if none did)
+        """
+        request = RouteRequest(user_input, history)
+        result = self._answer(request)
+        return result if result is not None else self._fell_back(request)
+
+    async def route_async(self, user_input: str, history=None) -> RouteResult:
+        """
+        Get the first stage's answer, or the fallback reply, without blocking the event loop.
+
+        Args:
+            user_input (str): The user's message
+            history: Optional ConversationHistory to record the turn in and give the LLM
+
+        Returns:
+            RouteResult: The reply and the stage that gave it ("fallback" if none did)
+        """
+        request = RouteRequest(user_input, history)
+        for stage, timer, answers in self._plan:
+            started = time.perf_counter()
+            text = await stage.answer_async(request)
+            timer.observe(time.perf_counter() - started)
+            if text:
+                return self._answered(stage, answers, request, text)
+        return self._fell_back(request)
+
+
+def catalog_stages(core) -> List[Stage]:
+    """
+    Stages answering from a ChatbotCore's catalog and knowledge base.
+
+    Args:
+        core: ChatbotCore whose current catalog and retriever are used
+
+    Returns:
+        List[Stage]: Exact, keyword, fuzzy and retrieval stages, in that order
+    """
+    return [ExactStage(core), KeywordStage(core), FuzzyStage(core), RetrievalStage(core)]
+
+
+def build_router(core, ai_chatbot=None, deadline: Optional[float] = None, race_catalog: bool = False,
+                 name: str = "app") -> Router:
+    """
+    Build the router the web apps answer ``/chat`` with.
+
+    Args:
+        core: ChatbotCore answering from the catalog
+        ai_chatbot: Optional AIChatbot asked when the catalog has no answer
+        deadline (Optional[float]): Seconds to wait for the AI chatbot
+        race_catalog (bool): Start the AI chatbot's call alongside the knowledge base
+            lookup, once the cheaper catalog stages have missed
+        name (str): Router label for the metrics
+
+    Returns:
+        Router: Catalog, then cache, then LLM; with ``race_catalog`` the exact,
+        keyword and fuzzy stages answer first and knowledge base retrieval runs
+        as the LLM stage's hedge, so catalog hits never start an LLM call
+    """
+    if ai_chatbot is None:
+        stages = [CoreStage(core)]
+    elif race_catalog:
+        *cheap, retrieval = catalog_stages(core)
+        stages = [*cheap, CacheStage(ai_chatbot), LLMStage(ai_chatbot, deadline, hedge=retrieval)]
+    else:
+        stages = [CoreStage(core), CacheStage(ai_chatbot), LLMStage(ai_chatbot, deadline)]
+    return Router(stages, fallback=core.router.fallback, name=name)
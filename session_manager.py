@@ -0,0 +1,181 @@
+"""
+Session Manager Module for Goldman Sachs Contact Center AI
+==========================================================
+
+This module keeps per-customer conversation state for the web API, keyed by
+session ID. Memory is capped by evicting the least recently used sessions
+and any session idle for longer than the timeout.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from conversation_history import ConversationHistory
+
+MAX_SESSION_ID_LENGTH = 128
+
+
+class SessionState:
+    """
+    Conversation state for one customer.
+
+    Uses ``__slots__`` and creates the history lazily so idle or one-shot
+    sessions stay small.
+    """
+
+    __slots__ = ("session_id", "created_at", "last_seen", "turns", "dialog", "_history", "_history_tokens")
+
+    def __init__(self, session_id: str, now: float, history_tokens: int):
+        self.session_id = session_id
+        self.created_at = now
+        self.last_seen = now
+        self.turns = 0
+        # DialogState of a dialog flow in progress, if any
+        self.dialog = None
+        self._history = None
+        self._history_tokens = history_tokens
+
+    @property
+    def history(self) -> ConversationHistory:
+        """The session's token-budgeted conversation history."""
+        if self._history is None:
+            self._history = ConversationHistory(max_tokens=self._history_tokens)
+        return self._history
+
+    def record_turn(self, user_message: str, bot_message: str):
+        """
+        Record a completed exchange in the session history.
+
+        Args:
+            user_message (str): The customer's message
+            bot_message (str): The reply that was sent
+        """
+        self.history.add_turn(user_message, bot_message)
+
+
+class SessionManager:
+    """
+    Thread-safe store of sessions with LRU and idle-timeout eviction.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 1800.0,
+                 history_tokens: int = 1000, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the session manager.
+
+        Args:
+            max_sessions (int): Maximum sessions held in memory
+            idle_timeout (float): Seconds of inactivity before a session is evicted
+            history_tokens (int): Token budget for each session's history
+            clock (Callable[[], float]): Time source, injectable for tests
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.history_tokens = history_tokens
+        self._clock = clock
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_or_create(self, session_id: Optional[str] = None) -> SessionState:
+        """
+        Get an existing session or start a new one.
+
+        Unknown, expired, missing or malformed IDs start a new session with a
+        fresh server-generated ID; a client can never choose its session's ID.
+
+        Args:
+            session_id (Optional[str]): Session ID supplied by the client
+
+        Returns:
+            SessionState: The session, marked as just used
+        """
+        now = self._clock()
+        with self._lock:
+            self._evict_idle(now)
+
+            if isinstance(session_id, str) and 0 < len(session_id) <= MAX_SESSION_ID_LENGTH:
+                session = self._sessions.get(session_id)
+                if session is not None:
+                    session.last_seen = now
+                    session.turns += 1
+                    self._sessions.move_to_end(session_id)
+                    return session
+
+            session_id = secrets.token_hex(16)
+            session = SessionState(session_id, now, self.history_tokens)
+            session.turns = 1
+            self._sessions[session_id] = session
+            self.created += 1
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted_lru += 1
+            return session
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """
+        Look up a session without touching it.
+
+        Args:
+            session_id (str): The session ID
+
+        Returns:
+            Optional[SessionState]: The session, or None if unknown or expired
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or self._clock() - session.last_seen > self.idle_timeout:
+                return None
+            return session
+
+    def remove(self, session_id: str) -> bool:
+        """
+        End a session.
+
+        Args:
+            session_id (str): The session ID
+
+        Returns:
+            bool: True if the session existed
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict_idle(self, now: float):
+        """Drop idle sessions; the least recently used are at the front."""
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if now - oldest.last_seen <= self.idle_timeout:
+                break
+            sessions.popitem(last=False)
+            self.evicted_idle += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get occupancy statistics.
+
+        Returns:
+            Dict[str, float]: Active sessions, capacity and eviction counters
+        """
+        with self._lock:
+            self._evict_idle(self._clock())
+            active = len(self._sessions)
+            return {
+                "active_sessions": active,
+                "max_sessions": self.max_sessions,
+                "occupancy": active / self.max_sessions if self.max_sessions else 0.0,
+                "idle_timeout": self.idle_timeout,
+                "created": self.created,
+                "evicted_lru": self.evicted_lru,
+                "evicted_idle": self.evicted_idle,
+            }
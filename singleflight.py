@@ -0,0 +1,174 @@
+"""
+Single-Flight Module for Goldman Sachs Contact Center AI
+========================================================
+
+This module coalesces identical concurrent requests. The first caller for a
+key (the leader) runs the call; callers that arrive with the same key while
+it is in flight wait for it and receive the same result or exception
+instead of making their own. Once the call finishes the key is forgotten,
+so later callers start a fresh call.
+
+``SingleFlight`` is for threads and ``AsyncSingleFlight`` for coroutines.
+Both count leaders and shared callers in
+``chatbot_singleflight_requests_total``, so the coalescing ratio is
+``shared / (leader + shared)``.
+"""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from metrics import SINGLEFLIGHT_REQUESTS
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-flight call and its outcome."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncCall:
+    """One in-flight awaitable call and the number of callers awaiting it."""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Shares one call among threads that ask for the same key at the same time.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+
+        Args:
+            name (str): Group label for the metrics
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._leaders = SINGLEFLIGHT_REQUESTS.labels(name, "leader")
+        self._shared = SINGLEFLIGHT_REQUESTS.labels(name, "shared")
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """
+        Run ``func`` for ``key``, or wait for the call already running for it.
+
+        Args:
+            key (Hashable): Identifies identical requests
+            func (Callable[[], T]): The call to make if none is in flight
+
+        Returns:
+            T: The result of the call
+
+        Raises:
+            Exception: Whatever the call raised, in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._shared.inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._leaders.inc()
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Shares one awaitable call among coroutines that ask for the same key.
+
+    The call runs as its own task, so a caller that is cancelled (for
+    example because its client disconnected) does not cancel the call for
+    the others, unless it asks for the call to be cancelled once nobody else
+    awaits it. Must be used from a single event loop.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+
+        Args:
+            name (str): Group label for the metrics
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _AsyncCall] = {}
+        self._leaders = SINGLEFLIGHT_REQUESTS.labels(name, "leader")
+        self._shared = SINGLEFLIGHT_REQUESTS.labels(name, "shared")
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]], cancel_abandoned: bool = False) -> T:
+        """
+        Await ``func()`` for ``key``, or the call already running for it.
+
+        Args:
+            key (Hashable): Identifies identical requests
+            func (Callable[[], Awaitable[T]]): Starts the call if none is in flight
+            cancel_abandoned (bool): If this caller is cancelled while no other
+                caller awaits the call, cancel the call too instead of letting it finish
+
+        Returns:
+            T: The result of the call
+
+        Raises:
+            Exception: Whatever the call raised, in every waiting caller
+        """
+        call = self._calls.get(key)
+        if call is not None:
+            self._shared.inc()
+        else:
+            self._leaders.inc()
+            call = self._calls[key] = _AsyncCall(asyncio.ensure_future(func()))
+            call.future.add_done_callback(lambda done: self._forget(key, call))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.future)
+        except asyncio.CancelledError:
+            if cancel_abandoned and call.waiters == 1:
+                # Forget it now: the task is only marked cancelled once it next runs
+                call.future.cancel()
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _AsyncCall):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not call.future.cancelled():
+            call.future.exception()
@@ -0,0 +1,382 @@
+"""
+Unit Tests for the AI Chatbot
+=============================
+
+This module contains unit tests for AIChatbot, run against the local LLM stub.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ai_chatbot import AIChatbot, ai_chatbot_from_env, error_category
+from conversation_history import ConversationHistory
+import llm_client
+from llm_client import LLMClientProvider
+from llm_stub import AsyncStubOpenAI, StubOpenAI
+from metrics import LLM_ERRORS
+from rate_limiter import Overloaded, RateLimiter
+from response_cache import ResponseCache
+
+
+class TestAIChatbot(unittest.TestCase):
+    """Test cases for the AIChatbot class."""
+    
+    def test_get_ai_response(self):
+        """Test a completion and the resulting history."""
+        chatbot = AIChatbot(client=StubOpenAI(reply="Hello from the stub"))
+        self.assertEqual(chatbot.get_ai_response("hi"), "Hello from the stub")
+        self.assertEqual(len(chatbot.conversation_history), 2)
+    
+    def test_get_ai_response_async(self):
+        """Test an awaited completion."""
+        chatbot = AIChatbot(async_client=AsyncStubOpenAI(reply="Async reply"))
+        self.assertEqual(asyncio.run(chatbot.get_ai_response_async("hi")), "Async reply")
+    
+    def test_stream_ai_response(self):
+        """Test that tokens are yielded as they arrive."""
+        stub = StubOpenAI(reply="one two three four", latency=0.01, chunk_delay=0.05)
+        chatbot = AIChatbot(client=stub)
+        
+        started = time.perf_counter()
+        stream = chatbot.stream_ai_response("hi")
+        first = next(stream)
+        first_token_at = time.perf_counter() - started
+        tokens = [first] + list(stream)
+        total = time.perf_counter() - started
+        
+        self.assertEqual("".join(tokens), "one two three four")
+        self.assertEqual(len(tokens), 4)
+        self.assertLess(first_token_at, total / 2)
+        self.assertEqual(chatbot.conversation_history[-1]["content"], "one two three four")
+    
+    def test_errors_return_none(self):
+        """Test that API errors are reported, and raised to stream consumers."""
+        chatbot = AIChatbot(client=None)
+        self.assertIsNone(chatbot.get_ai_response("hi"))
+        with self.assertRaises(AttributeError):
+            list(chatbot.stream_ai_response("hi"))
+    
+    def test_broken_stream_is_not_cached(self):
+        """Test that a stream cut off part way raises and leaves no cached or recorded reply."""
+        cache = ResponseCache()
+        chatbot = AIChatbot(client=StubOpenAI(reply="Our branch hours are 9am to 5pm"), cache=cache)
+        create = chatbot.client.chat.completions.create
+        
+        def broken(**kwargs):
+            def chunks():
+                for index, chunk in enumerate(create(**kwargs)):
+                    if index == 4:
+                        raise ConnectionError("Connection reset by peer")
+                    yield chunk
+            return chunks()
+        
+        chatbot.client.chat.completions.create = broken
+        tokens = []
+        with self.assertRaises(ConnectionError):
+            for token in chatbot.stream_ai_response("When are you open?"):
+                tokens.append(token)
+        self.assertEqual("".join(tokens), "Our branch hours are")
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(len(chatbot.conversation_history), 0)
+    
+    def test_error_categories_are_counted(self):
+        """Test that API errors are sorted into categories and counted."""
+        self.assertEqual(error_category(Exception("Invalid API key: unauthorized")), "authentication")
+        self.assertEqual(error_category(Exception("Rate limit reached")), "rate_limit")
+        self.assertEqual(error_category(TimeoutError("Request timeout")), "timeout")
+        self.assertEqual(error_category(Exception("Connection reset")), "network")
+        self.assertEqual(error_category(Exception("boom")), "other")
+        
+        errors = LLM_ERRORS.labels(category="rate_limit")
+        before = errors.value
+        chatbot = AIChatbot(client=StubOpenAI())
+        
+        def rate_limited(**kwargs):
+            raise Exception("Rate limit reached")
+        
+        chatbot.client.chat.completions.create = rate_limited
+        with self.assertLogs("ai_chatbot", "ERROR") as logs:
+            self.assertIsNone(chatbot.get_ai_response("hi"))
+        self.assertEqual(errors.value, before + 1)
+        self.assertIn("Rate limit exceeded", logs.output[0])
+
+
+
+class TestAIChatbotFromEnv(unittest.TestCase):
+    """Test cases for building the web apps' AI chatbot from the environment."""
+    
+    def setUp(self):
+        """Point the shared provider at the stubs."""
+        llm_client.set_provider(LLMClientProvider(client_factory=lambda settings: StubOpenAI(),
+                                                  async_client_factory=lambda settings: AsyncStubOpenAI()))
+        self.addCleanup(llm_client.set_provider, None)
+    
+    def test_not_configured(self):
+        """Test that no AI chatbot is built without an API key or base URL."""
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "", "OPENAI_BASE_URL": ""}):
+            self.assertIsNone(ai_chatbot_from_env())
+    
+    def test_configured(self):
+        """Test that a base URL is enough, and that the rate limit comes from the environment."""
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "", "OPENAI_BASE_URL": "http://127.0.0.1:8089/v1",
+                                          "LLM_RATE_LIMIT_RPM": "600"}):
+            chatbot = ai_chatbot_from_env()
+        self.assertIsInstance(chatbot.rate_limiter, RateLimiter)
+        self.assertIsNotNone(chatbot.cache)
+        self.assertEqual(chatbot.get_ai_response("hi"), StubOpenAI().chat.completions.create(
+            messages=[], model="x").choices[0].message.content)
+        self.assertIsNotNone(asyncio.run(chatbot.get_ai_response_async("hello there")))
+
+
+class TestAIChatbotCoalescing(unittest.TestCase):
+    """Test cases for sharing API calls among identical concurrent requests."""
+    
+    def test_concurrent_identical_requests_share_a_call(self):
+        """Test that threads asking the same question make one API call."""
+        stub = StubOpenAI(latency=0.1, reply="Shared reply")
+        chatbot = AIChatbot(client=stub)
+        histories = [ConversationHistory() for _ in range(10)]
+        results = [None] * len(histories)
+        
+        def ask(index):
+            results[index] = chatbot.get_ai_response("Is the app down?", history=histories[index])
+        
+        threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(histories))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, ["Shared reply"] * 10)
+        self.assertEqual(stub.calls, 1)
+        # Every conversation still records its own turn
+        self.assertTrue(all(len(history) == 2 for history in histories))
+    
+    def test_concurrent_identical_requests_share_a_call_async(self):
+        """Test that coroutines asking the same question make one API call."""
+        stub = AsyncStubOpenAI(latency=0.05, reply="Shared reply")
+        chatbot = AIChatbot(async_client=stub)
+        
+        async def many():
+            return await asyncio.gather(*(
+                chatbot.get_ai_response_async("Is the app down?", history=ConversationHistory())
+                for _ in range(20)
+            ))
+        
+        self.assertEqual(asyncio.run(many()), ["Shared reply"] * 20)
+        self.assertEqual(stub.calls, 1)
+    
+    def test_coalescing_can_be_turned_off(self):
+        """Test that every request makes its own call without coalescing."""
+        stub = AsyncStubOpenAI(latency=0.05)
+        chatbot = AIChatbot(async_client=stub, coalesce=False)
+        
+        async def many():
+            return await asyncio.gather(*(
+                chatbot.get_ai_response_async("Is the app down?", history=ConversationHistory())
+                for _ in range(5)
+            ))
+        
+        asyncio.run(many())
+        self.assertEqual(stub.calls, 5)
+
+
+class TestAIChatbotRateLimit(unittest.TestCase):
+    """Test cases for rate limiting AIChatbot's API calls."""
+    
+    def test_shed_requests_raise_overloaded(self):
+        """Test that a shed request raises instead of reaching the API."""
+        stub = StubOpenAI()
+        chatbot = AIChatbot(client=stub, rate_limiter=RateLimiter(60, max_wait=0))
+        self.assertIsNotNone(chatbot.get_ai_response("First question", history=ConversationHistory()))
+        with self.assertRaises(Overloaded):
+            chatbot.get_ai_response("Second question", history=ConversationHistory())
+        with self.assertRaises(Overloaded):
+            list(chatbot.stream_ai_response("Third question", history=ConversationHistory()))
+        self.assertEqual(stub.calls, 1)
+    
+    def test_shed_requests_raise_overloaded_async(self):
+        """Test that a shed coroutine raises instead of reaching the API."""
+        stub = AsyncStubOpenAI()
+        chatbot = AIChatbot(async_client=stub, rate_limiter=RateLimiter(60, max_wait=0))
+        
+        async def two():
+            await chatbot.get_ai_response_async("First question", history=ConversationHistory())
+            await chatbot.get_ai_response_async("Second question", history=ConversationHistory())
+        
+        with self.assertRaises(Overloaded):
+            asyncio.run(two())
+        self.assertEqual(stub.calls, 1)
+    
+    def test_coalesced_requests_are_admitted_once(self):
+        """Test that callers sharing a call use one slot of the rate limit."""
+        stub = AsyncStubOpenAI(latency=0.05)
+        chatbot = AIChatbot(async_client=stub, rate_limiter=RateLimiter(60, max_wait=0))
+        
+        async def many():
+            return await asyncio.gather(*(
+                chatbot.get_ai_response_async("Is the app down?", history=ConversationHistory())
+                for _ in range(5)
+            ))
+        
+        self.assertEqual(len(set(asyncio.run(many()))), 1)
+        self.assertEqual(stub.calls, 1)
+
+
+class TestAIChatbotDeadline(unittest.TestCase):
+    """Test cases for deadlines and hedges on AIChatbot's API calls."""
+    
+    def test_missed_deadline_returns_none(self):
+        """Test that a slow call is abandoned at the deadline and still fills the cache."""
+        cache = ResponseCache()
+        chatbot = AIChatbot(client=StubOpenAI(latency=0.2, reply="Late reply"), cache=cache)
+        history = ConversationHistory()
+        started = time.perf_counter()
+        self.assertIsNone(chatbot.get_ai_response("Is the app down?", history=history, deadline=0.02))
+        self.assertLess(time.perf_counter() - started, 0.15)
+        self.assertEqual(len(history), 0)
+        # The abandoned call's reply is cached when it arrives
+        chatbot._deadline_pool.shutdown(wait=True)
+        self.assertEqual(len(cache), 1)
+    
+    def test_close_shuts_down_deadline_threads(self):
+        """Test that closing stops the deadline threads once their calls finish."""
+        chatbot = AIChatbot(client=StubOpenAI(latency=0.05, reply="Late reply"), cache=ResponseCache())
+        self.assertIsNone(chatbot.get_ai_response("Is the app down?", deadline=0.01))
+        threads = list(chatbot._deadline_pool._threads)
+        chatbot.close()
+        for thread in threads:
+            thread.join(1)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(len(chatbot.cache), 1)
+        with self.assertRaises(RuntimeError):
+            chatbot._deadline_pool.submit(time.sleep, 0)
+    
+    def test_missed_deadline_uses_cached_answer_to_bare_question(self):
+        """Test that a cached reply to the question without history is used at the deadline."""
+        chatbot = AIChatbot(client=StubOpenAI(reply="Fresh reply"), cache=ResponseCache())
+        self.assertEqual(chatbot.get_ai_response("Is the app down?", history=ConversationHistory()),
+                         "Fresh reply")
+        
+        chatbot.client = StubOpenAI(latency=0.2, reply="Late reply")
+        history = ConversationHistory()
+        history.add_turn("Hi", "Hello!")
+        self.assertEqual(chatbot.get_ai_response("Is the app down?", history=history, deadline=0.02),
+                         "Fresh reply")
+        self.assertEqual(len(history), 4)
+    
+    def test_answer_within_deadline(self):
+        """Test that a call answering in time is used as normal."""
+        chatbot = AIChatbot(client=StubOpenAI(latency=0.01, reply="On time"))
+        self.assertEqual(chatbot.get_ai_response("Is the app down?", history=ConversationHistory(),
+                                                 deadline=1.0), "On time")
+    
+    def test_hedge_wins_against_slow_call(self):
+        """Test that a confident hedge answer is used instead of waiting for the call."""
+        chatbot = AIChatbot(client=StubOpenAI(latency=0.2, reply="Late reply"))
+        history = ConversationHistory()
+        started = time.perf_counter()
+        self.assertEqual(chatbot.get_ai_response("hello", history=history, hedge=lambda: "Catalog reply"),
+                         "Catalog reply")
+        self.assertLess(time.perf_counter() - started, 0.15)
+        self.assertEqual(history.messages()[-1]["content"], "Catalog reply")
+        # Without a confident answer the call is waited for
+        self.assertEqual(chatbot.get_ai_response("hello", history=history, hedge=lambda: None),
+                         "Late reply")
+    
+    def test_deadline_and_hedge_async(self):
+        """Test deadlines and hedges on the async path."""
+        stub = AsyncStubOpenAI(latency=0.2, reply="Late reply")
+        chatbot = AIChatbot(async_client=stub)
+        
+        async def scenario():
+            missed = await chatbot.get_ai_response_async("Is the app down?", history=ConversationHistory(),
+                                                         deadline=0.02)
+            hedged = await chatbot.get_ai_response_async("hello", history=ConversationHistory(),
+                                                         hedge=lambda: "Catalog reply")
+            waited = await chatbot.get_ai_response_async("hello", history=ConversationHistory(),
+                                                         deadline=1.0, hedge=lambda: None)
+            return missed, hedged, waited
+        
+        started = time.perf_counter()
+        self.assertEqual(asyncio.run(scenario()), (None, "Catalog reply", "Late reply"))
+        self.assertLess(time.perf_counter() - started, 0.4)
+    
+    def test_abandoned_async_call_is_cancelled_without_cache(self):
+        """Test that the upstream call behind a coalesced request is cancelled when nobody needs it."""
+        def tracked(chatbot, cancelled):
+            create = chatbot.async_client.chat.completions.create
+            
+            async def wrapper(**kwargs):
+                try:
+                    return await create(**kwargs)
+                except asyncio.CancelledError:
+                    cancelled.append(kwargs["messages"][-1]["content"])
+                    raise
+            
+            chatbot.async_client.chat.completions.create = wrapper
+        
+        async def scenario(chatbot, cancelled):
+            missed = await chatbot.get_ai_response_async("Is the app down?", history=ConversationHistory(),
+                                                         deadline=0.02)
+            await asyncio.sleep(0.1)
+            # Checked before asyncio.run cancels whatever is still pending
+            return missed, list(cancelled), len(chatbot._async_flight)
+        
+        uncached, cancelled = AIChatbot(async_client=AsyncStubOpenAI(latency=0.5)), []
+        tracked(uncached, cancelled)
+        self.assertEqual(asyncio.run(scenario(uncached, cancelled)), (None, ["Is the app down?"], 0))
+        
+        # With a cache the call runs on to fill it
+        cached, cancelled = AIChatbot(async_client=AsyncStubOpenAI(latency=0.05), cache=ResponseCache()), []
+        tracked(cached, cancelled)
+        self.assertEqual(asyncio.run(scenario(cached, cancelled)), (None, [], 0))
+        self.assertEqual(len(cached.cache), 1)
+
+
+class TestAIChatbotCache(unittest.TestCase):
+    """Test cases for the response cache in front of the API."""
+    
+    def test_repeated_questions_hit_cache(self):
+        """Test that repeated first-turn questions skip the API."""
+        stub = StubOpenAI(reply="We open at 9am.")
+        cache = ResponseCache()
+        for _ in range(3):
+            chatbot = AIChatbot(client=stub, cache=cache)
+            self.assertEqual(chatbot.get_ai_response("What are your hours?"), "We open at 9am.")
+        self.assertEqual(stub.calls, 1)
+        self.assertEqual(cache.stats()["hits"], 2)
+    
+    def test_history_turns_can_skip_cache(self):
+        """Test the option to bypass the cache for history-dependent turns."""
+        stub = StubOpenAI(reply="Sure.")
+        chatbot = AIChatbot(client=stub, cache=ResponseCache(), cache_history_turns=False)
+        chatbot.get_ai_response("first")
+        chatbot.get_ai_response("second")
+        chatbot.get_ai_response("second")
+        self.assertEqual(stub.calls, 3)
+        self.assertEqual(len(chatbot.cache), 1)
+    
+    def test_stream_and_async_use_cache(self):
+        """Test that streaming and async paths share the cache."""
+        cache = ResponseCache()
+        AIChatbot(client=StubOpenAI(reply="Cached answer"), cache=cache).get_ai_response("faq")
+        
+        async_stub = AsyncStubOpenAI()
+        chatbot = AIChatbot(client=StubOpenAI(), async_client=async_stub, cache=cache)
+        self.assertEqual(asyncio.run(chatbot.get_ai_response_async("FAQ")), "Cached answer")
+        self.assertEqual(async_stub.calls, 0)
+        self.assertEqual(list(AIChatbot(client=None, cache=cache).stream_ai_response("faq")),
+                         ["Cached answer"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -4,7 +4,7 @@ Simple script to test if your OpenAI API key works
 """
 
 import os
-from openai import OpenAI
+from llm_client import get_provider
 
 def test_api_key():
     """Test if the OpenAI API key is working"""
@@ -31,7 +31,7 @@ def test_api_key():
     
     try:
         # Test the API
-        client = OpenAI(api_key=api_key)
+        client = get_provider(api_key=api_key).get_client()
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": "Say 'Hello, API key is working!'"}],
@@ -0,0 +1,487 @@
+"""
+Unit Tests for the Flask Web Application
+========================================
+
+This module contains unit tests for the chat API routes.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, sessions
+from catalog_reload import CatalogReloader
+from chatbot_core import ChatbotCore
+from unittest import mock
+import tempfile
+from chatbot_core import FALLBACK_RESPONSE, chatbot
+from ai_chatbot import AIChatbot
+from llm_stub import StubOpenAI, StubProfile, StubServer
+from metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, ROUTER_ANSWERS
+from rate_limiter import RateLimiter
+import importlib.util
+import json
+import subprocess
+import threading
+import time
+
+
+class TestChatRoute(unittest.TestCase):
+    """Test cases for the /chat endpoint."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.client = app.test_client()
+    
+    def test_chat_success(self):
+        """Test a normal chat message."""
+        response = self.client.post("/chat", json={"message": "hello"})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["status"], "success")
+        self.assertIn("Welcome", data["bot"])
+    
+    def test_chat_requires_message(self):
+        """Test that a missing message is rejected."""
+        response = self.client.post("/chat", json={"text": "hello"})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_chat_rejects_screened_input(self):
+        """Test that screened input reports the rule that fired."""
+        response = self.client.post("/chat", json={"message": "<script>alert(1)</script>"})
+        self.assertEqual(response.status_code, 400)
+        data = response.get_json()
+        self.assertEqual(data["rule"], "script_tag")
+        self.assertEqual(data["category"], "injection")
+    
+    def test_chat_dialog_flow(self):
+        """Test that a multi-step flow keeps its place across requests."""
+        first = self.client.post("/chat", json={"message": "Banking services"}).get_json()
+        self.assertIn("What's your name?", first["bot"])
+        session_id = first["session_id"]
+        replies = [self.client.post("/chat", json={"message": message, "session_id": session_id}).get_json()["bot"]
+                   for message in ("Ada", "account", "yes")]
+        self.assertIn("Nice to meet you, Ada!", replies[0])
+        self.assertIn("Account Services", replies[1])
+        self.assertIn("An account specialist will contact you shortly", replies[2])
+        self.assertIsNone(sessions.get(session_id).dialog)
+        self.assertEqual(len(sessions.get(session_id).history), 8)
+    
+    def test_chat_sessions(self):
+        """Test that replies carry a session ID that keeps the conversation."""
+        first = self.client.post("/chat", json={"message": "hello"}).get_json()
+        session_id = first["session_id"]
+        second = self.client.post("/chat", json={"message": "loan", "session_id": session_id}).get_json()
+        self.assertEqual(second["session_id"], session_id)
+        third = self.client.post("/chat", json={"message": "bye"},
+                                 headers={"X-Session-ID": session_id}).get_json()
+        self.assertEqual(third["session_id"], session_id)
+        self.assertEqual(len(sessions.get(session_id).history), 6)
+        
+        # Client-chosen IDs are not adopted
+        chosen = self.client.post("/chat", json={"message": "hello", "session_id": "chosen-by-client"}).get_json()
+        self.assertNotEqual(chosen["session_id"], "chosen-by-client")
+        self.assertIsNone(sessions.get("chosen-by-client"))
+        
+        stats = self.client.get("/sessions").get_json()
+        self.assertGreaterEqual(stats["active_sessions"], 1)
+    
+    def test_chat_falls_back_to_ai_chatbot(self):
+        """Test that unmatched messages are answered by the AI chatbot."""
+        app.config['AI_CHATBOT'] = AIChatbot(client=StubOpenAI(reply="From the LLM"))
+        try:
+            data = self.client.post("/chat", json={"message": "tell me something new"}).get_json()
+            self.assertEqual(data["bot"], "From the LLM")
+            data = self.client.post("/chat", json={"message": "hello"}).get_json()
+            self.assertIn("Welcome", data["bot"])
+        finally:
+            app.config['AI_CHATBOT'] = None
+    
+    def test_router_built_once_across_threads(self):
+        """Test that concurrent requests share one router per AI chatbot setting."""
+        app.config['AI_CHATBOT'] = AIChatbot(client=StubOpenAI(reply="From the LLM"))
+        try:
+            with mock.patch.object(app_module, "build_router", wraps=app_module.build_router) as build:
+                routers = []
+                threads = [threading.Thread(target=lambda: routers.append(app_module.get_router()))
+                           for _ in range(16)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            self.assertEqual(build.call_count, 1)
+            self.assertEqual(len({id(router) for router in routers}), 1)
+        finally:
+            app.config['AI_CHATBOT'] = None
+    
+    def test_chat_deadline_and_catalog_race(self):
+        """Test that a slow AI chatbot is cut off at the deadline and raced by the catalog."""
+        stub = StubOpenAI(latency=0.3, reply="From the LLM")
+        app.config['AI_CHATBOT'] = AIChatbot(client=stub)
+        try:
+            with mock.patch.dict(app.config, {'LLM_DEADLINE': 0.02}):
+                started = time.perf_counter()
+                data = self.client.post("/chat", json={"message": "tell me something new"}).get_json()
+                self.assertLess(time.perf_counter() - started, 0.25)
+                self.assertEqual(data["bot"], chatbot.get_response("tell me something new"))
+            
+            with mock.patch.dict(app.config, {'LLM_RACE_CATALOG': True}):
+                started = time.perf_counter()
+                data = self.client.post("/chat", json={"message": "hello"}).get_json()
+                self.assertLess(time.perf_counter() - started, 0.25)
+                self.assertIn("Welcome", data["bot"])
+                data = self.client.post("/chat", json={"message": "tell me something new"}).get_json()
+                self.assertEqual(data["bot"], "From the LLM")
+        finally:
+            app.config['AI_CHATBOT'] = None
+    
+    def test_chat_overload_policies(self):
+        """Test that shed AI requests fall back to the catalog or get a 429."""
+        app.config['AI_CHATBOT'] = AIChatbot(client=StubOpenAI(reply="From the LLM"),
+                                             rate_limiter=RateLimiter(60, max_wait=0))
+        try:
+            data = self.client.post("/chat", json={"message": "tell me something new"}).get_json()
+            self.assertEqual(data["bot"], "From the LLM")
+            
+            response = self.client.post("/chat", json={"message": "tell me something else"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["bot"], chatbot.get_response("tell me something else"))
+            
+            with mock.patch.dict(app.config, {'LLM_OVERLOAD_POLICY': 'reject'}):
+                response = self.client.post("/chat", json={"message": "and another thing"})
+                self.assertEqual(response.status_code, 429)
+                self.assertEqual(response.headers["Retry-After"], "1")
+                
+                response = self.client.post("/chat/stream", json={"message": "and another thing"})
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("event: error", response.get_data(as_text=True))
+        finally:
+            app.config['AI_CHATBOT'] = None
+
+
+
+class TestMetricsRoute(unittest.TestCase):
+    """Test cases for the /metrics endpoint."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.client = app.test_client()
+    
+    def test_metrics_exposition(self):
+        """Test that requests and chatbot results show up in the metrics."""
+        self.client.post("/chat", json={"message": "hello"})
+        self.client.post("/chat", json={"message": "something unrelated"})
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        
+        text = response.get_data(as_text=True)
+        self.assertIn('chatbot_core_responses_total{result="hit"}', text)
+        self.assertIn('chatbot_core_responses_total{result="fallback"}', text)
+        self.assertIn('chatbot_http_request_duration_seconds_count{route="/chat",method="POST",status="200"}', text)
+        self.assertIn('chatbot_http_requests_in_flight{route="/metrics"} 1', text)
+        self.assertIn("chatbot_sessions_active", text)
+    
+    def test_unhandled_errors_leave_in_flight(self):
+        """Test that a request whose exception propagates is counted as a finished 500."""
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels("/health")
+        errors = HTTP_REQUEST_SECONDS.labels("/health", "GET", 500)
+        before = sum(errors.totals()[0])
+        with mock.patch.dict(app.config, {'PROPAGATE_EXCEPTIONS': True}), \
+                mock.patch("app.jsonify", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.client.get("/health")
+        self.assertEqual(in_flight.value, 0)
+        self.assertEqual(sum(errors.totals()[0]), before + 1)
+
+
+class TestAdminReloadRoute(unittest.TestCase):
+    """Test cases for the /admin/reload endpoint."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.client = app.test_client()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "catalog.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"hello": "Hi from the file."}, f)
+        self.core = ChatbotCore()
+        self.reloader = CatalogReloader(self.core, self.path)
+        environ = mock.patch.dict(os.environ, {"ADMIN_TOKEN": "s3cret"})
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.headers = {"X-Admin-Token": "s3cret"}
+    
+    def test_reload_not_configured(self):
+        """Test that reloading without a catalog file is a 404."""
+        with mock.patch.object(app_module, "catalog_reloader", None):
+            self.assertEqual(self.client.post("/admin/reload", headers=self.headers).status_code, 404)
+    
+    def test_reload_disabled_without_admin_token(self):
+        """Test that the endpoint is disabled while ADMIN_TOKEN is unset."""
+        with mock.patch.object(app_module, "catalog_reloader", self.reloader), \
+                mock.patch.dict(os.environ, {"ADMIN_TOKEN": ""}):
+            for headers in ({}, {"X-Admin-Token": ""}, self.headers):
+                with self.subTest(headers=headers):
+                    response = self.client.post("/admin/reload", json={"wait": True}, headers=headers)
+                    self.assertEqual(response.status_code, 404)
+        self.assertIsNone(self.reloader.last_result)
+    
+    def test_reload_and_wait(self):
+        """Test a reload that waits for its outcome."""
+        with mock.patch.object(app_module, "catalog_reloader", self.reloader):
+            response = self.client.post("/admin/reload", json={"wait": True}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual((data["status"], data["entries"]), ("success", 1))
+        self.assertEqual(self.core.get_response("hello"), "Hi from the file.")
+    
+    def test_reload_in_background(self):
+        """Test that a plain reload request is accepted right away."""
+        with mock.patch.object(app_module, "catalog_reloader", self.reloader):
+            response = self.client.post("/admin/reload", headers=self.headers)
+        self.assertEqual(response.status_code, 202)
+        self.assertIn(response.get_json()["status"], ("reloading", "queued"))
+    
+    def test_reload_requires_admin_token(self):
+        """Test that ADMIN_TOKEN protects the endpoint."""
+        with mock.patch.object(app_module, "catalog_reloader", self.reloader):
+            self.assertEqual(self.client.post("/admin/reload", json={"wait": True}).status_code, 403)
+            response = self.client.post("/admin/reload", json={"wait": True}, headers={"X-Admin-Token": "wrong"})
+            self.assertEqual(response.status_code, 403)
+            response = self.client.post("/admin/reload", json={"wait": True}, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+    
+    def test_failed_reload(self):
+        """Test that a broken file is reported and the catalog kept."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("[")
+        with mock.patch.object(app_module, "catalog_reloader", self.reloader):
+            response = self.client.post("/admin/reload", json={"wait": True}, headers=self.headers)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.get_json()["status"], "error")
+        self.assertIn("Welcome", self.core.get_response("hello"))
+
+
+class TestResponsesRoute(unittest.TestCase):
+    """Test cases for the /responses endpoint."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.client = app.test_client()
+    
+    def test_etag_and_not_modified(self):
+        """Test that an unchanged catalog answers If-None-Match with a 304."""
+        response = self.client.get("/responses")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        self.assertEqual(response.get_json()["count"], len(response.get_json()["responses"]))
+        
+        response = self.client.get("/responses", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b"")
+        self.assertEqual(response.headers["ETag"], etag)
+    
+    def test_weak_and_star_etags_match(self):
+        """Test that If-None-Match compares weakly and accepts *, like the ASGI app."""
+        etag = self.client.get("/responses").headers["ETag"]
+        for if_none_match in (f'"stale", W/{etag}', "*"):
+            with self.subTest(if_none_match=if_none_match):
+                response = self.client.get("/responses", headers={"If-None-Match": if_none_match})
+                self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get("/responses", headers={"If-None-Match": '"stale"'}).status_code, 200)
+    
+    def test_etag_changes_with_catalog(self):
+        """Test that adding a response produces a new ETag."""
+        etag = self.client.get("/responses").headers["ETag"]
+        chatbot.add_response("etag test key", "etag test response")
+        try:
+            response = self.client.get("/responses", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etag)
+            self.assertIn("etag test key", response.get_json()["responses"])
+        finally:
+            chatbot.remove_response("etag test key")
+
+
+class TestChatStreamRoute(unittest.TestCase):
+    """Test cases for the /chat/stream endpoint."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.client = app.test_client()
+    
+    def tearDown(self):
+        """Remove any configured AI chatbot."""
+        app.config['AI_CHATBOT'] = None
+    
+    def read_events(self, response):
+        """Parse a Server-Sent Events body into (event, data) pairs."""
+        events = []
+        for block in response.get_data(as_text=True).strip().split("\n\n"):
+            event = "message"
+            for line in block.split("\n"):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    events.append((event, json.loads(line[len("data: "):])))
+        return events
+    
+    def test_stream_predefined_response(self):
+        """Test that predefined replies are sent as one token."""
+        response = self.client.post("/chat/stream", json={"message": "hello"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        events = self.read_events(response)
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual(events[0][1]["token"], events[-1][1]["bot"])
+    
+    def test_stream_ai_tokens(self):
+        """Test that AI chatbot tokens are forwarded as they arrive."""
+        app.config['AI_CHATBOT'] = AIChatbot(client=StubOpenAI(reply="one two three", chunk_delay=0.001))
+        response = self.client.post("/chat/stream", json={"message": "tell me something new"})
+        events = self.read_events(response)
+        self.assertEqual([data["token"] for event, data in events[:-1]], ["one", " two", " three"])
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual(events[-1][1]["bot"], "one two three")
+    
+    def test_stream_goes_through_router(self):
+        """Test that streams are answered by the app router, with only the LLM stage streamed."""
+        stub = StubOpenAI(reply="one two three")
+        app.config['AI_CHATBOT'] = AIChatbot(client=stub)
+        catalog, llm = ROUTER_ANSWERS.labels("app", "catalog"), ROUTER_ANSWERS.labels("app", "llm")
+        before = (catalog.value, llm.value)
+        with mock.patch.object(app_module, "get_router", wraps=app_module.get_router) as get_router:
+            greeting = self.read_events(self.client.post("/chat/stream", json={"message": "hello"}))
+            reply = self.read_events(self.client.post("/chat/stream", json={"message": "tell me something new"}))
+        self.assertIn("Welcome", greeting[-1][1]["bot"])
+        self.assertEqual(reply[-1][1]["bot"], "one two three")
+        self.assertEqual(get_router.call_count, 2)
+        self.assertEqual((catalog.value, llm.value), (before[0] + 1, before[1] + 1))
+        self.assertEqual(stub.calls, 1)
+    
+    def test_stream_broken_mid_reply(self):
+        """Test that a stream breaking after some tokens ends with an error, not a done event."""
+        ai_chatbot = AIChatbot(client=StubOpenAI(reply="Our branch hours are 9am to 5pm"))
+        create = ai_chatbot.client.chat.completions.create
+        
+        def broken(**kwargs):
+            for index, chunk in enumerate(create(**kwargs)):
+                if index == 4:
+                    raise ConnectionError("Connection reset by peer")
+                yield chunk
+        
+        ai_chatbot.client.chat.completions.create = broken
+        app.config['AI_CHATBOT'] = ai_chatbot
+        events = self.read_events(self.client.post("/chat/stream", json={"message": "When are you open?"}))
+        self.assertEqual("".join(data["token"] for event, data in events[:-1]), "Our branch hours are")
+        self.assertEqual(events[-1][0], "error")
+        self.assertEqual(events[-1][1]["status"], "error")
+        self.assertNotIn("done", [event for event, data in events])
+        
+        # A call that fails before any token falls back to the fallback reply
+        def refused(**kwargs):
+            raise ConnectionError("Connection refused")
+        
+        ai_chatbot.client.chat.completions.create = refused
+        events = self.read_events(self.client.post("/chat/stream", json={"message": "When are you open?"}))
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual(events[-1][1]["bot"], FALLBACK_RESPONSE)
+    
+    def test_stream_rejects_screened_input(self):
+        """Test that screening applies to the streaming endpoint."""
+        response = self.client.post("/chat/stream", json={"message": "javascript:alert(1)"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestChatBatchRoute(unittest.TestCase):
+    """Test cases for the /chat/batch endpoint."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.client = app.test_client()
+        self.original_config = dict(app.config)
+    
+    def tearDown(self):
+        """Restore the application configuration."""
+        app.config.update(self.original_config)
+    
+    def test_batch_results_in_order(self):
+        """Test that results come back in order with per-item errors."""
+        response = self.client.post("/chat/batch", json={
+            "messages": ["hello", 42, "<script>", "bye"]
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["count"], 4)
+        self.assertEqual([r["index"] for r in data["results"]], [0, 1, 2, 3])
+        self.assertEqual([r["status"] for r in data["results"]], ["success", "error", "error", "success"])
+        self.assertEqual(data["results"][2]["rule"], "script_tag")
+        self.assertIn("Goodbye", data["results"][3]["bot"])
+    
+    def test_batch_size_limit(self):
+        """Test that oversized batches are rejected."""
+        app.config['MAX_BATCH_SIZE'] = 3
+        response = self.client.post("/chat/batch", json={"messages": ["hi"] * 4})
+        self.assertEqual(response.status_code, 413)
+    
+    def test_batch_requires_messages(self):
+        """Test that the messages field must be a non-empty list."""
+        for payload in [{"messages": []}, {"messages": "hello"}, {"message": "hello"}]:
+            with self.subTest(payload=payload):
+                response = self.client.post("/chat/batch", json=payload)
+                self.assertEqual(response.status_code, 400)
+    
+    def test_large_batch_is_streamed(self):
+        """Test that large batches stream a body with the same shape."""
+        app.config['BATCH_STREAM_THRESHOLD'] = 2
+        response = self.client.post("/chat/batch", json={"messages": ["hello", "loan", "", "account"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual(data["count"], 4)
+        self.assertEqual(data["results"][2]["status"], "error")
+        self.assertIn("loans", data["results"][1]["bot"])
+
+
+@unittest.skipUnless(importlib.util.find_spec("openai"), "openai is not installed")
+class TestConfiguredFromEnvironment(unittest.TestCase):
+    """Test cases for the AI chatbot the app builds from its environment."""
+    
+    # Imports the real app in a fresh interpreter and prints each /chat status, Retry-After and reply
+    SCRIPT = (
+        "import json\n"
+        "from app import app\n"
+        "client = app.test_client()\n"
+        "responses = [client.post('/chat', json={'message': message})\n"
+        "             for message in ('Tell me a story about owls', 'Tell me a story about bats')]\n"
+        "print(json.dumps([[r.status_code, r.headers.get('Retry-After'), r.get_json().get('bot')]"
+        " for r in responses]))\n"
+    )
+    
+    def test_llm_rate_limit_sheds_requests(self):
+        """Test that OPENAI_BASE_URL and LLM_RATE_LIMIT_RPM configure the app without code changes."""
+        server = StubServer(StubProfile(reply="Once upon a time")).start()
+        self.addCleanup(server.stop)
+        environ = {name: value for name, value in os.environ.items()
+                   if not name.startswith(("OPENAI_", "LLM_", "CATALOG_", "KNOWLEDGE_BASE_"))}
+        environ.update(OPENAI_BASE_URL=server.base_url, OPENAI_API_KEY="sk-stub", OPENAI_MAX_RETRIES="0",
+                       LLM_RATE_LIMIT_RPM="1", LLM_OVERLOAD_POLICY="reject")
+        result = subprocess.run([sys.executable, "-c", self.SCRIPT], env=environ, capture_output=True,
+                                text=True, timeout=60, cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        first, second = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(first, [200, None, "Once upon a time"])
+        self.assertEqual(second[0], 429)
+        self.assertGreater(int(second[1]), 0)
+        self.assertEqual(server.requests, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,213 @@
+"""
+Unit Tests for the ASGI Web Application
+=======================================
+
+This module contains unit tests for the asyncio-native serving mode.
+"""
+
+import asyncio
+import importlib.util
+import json
+import subprocess
+import tempfile
+import time
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ai_chatbot import AIChatbot
+from asgi_app import ChatASGIApp, call_app
+from catalog_reload import CatalogReloader
+from chatbot_core import ChatbotCore
+from llm_stub import AsyncStubOpenAI, StubProfile, StubServer
+from rate_limiter import RateLimiter
+
+
+def request(app, method, path, payload=None, headers=None):
+    """Call the app and decode the JSON body."""
+    status, headers, body = asyncio.run(call_app(app, method, path, payload, headers))
+    return status, json.loads(body) if body else None
+
+
+class TestChatASGIApp(unittest.TestCase):
+    """Test cases for the ChatASGIApp routes."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.app = ChatASGIApp(core=ChatbotCore())
+    
+    def test_health(self):
+        """Test the health check endpoint."""
+        status, data = request(self.app, "GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(data["status"], "healthy")
+    
+    def test_chat(self):
+        """Test the chat endpoint contract."""
+        status, data = request(self.app, "POST", "/chat", {"message": "hello"})
+        self.assertEqual(status, 200)
+        self.assertEqual(data["status"], "success")
+        self.assertIn("Welcome", data["bot"])
+        
+        status, data = request(self.app, "POST", "/chat", {"message": ""})
+        self.assertEqual(status, 400)
+        
+        status, data = request(self.app, "POST", "/chat", {"message": "<script>"})
+        self.assertEqual(status, 400)
+        self.assertEqual(data["rule"], "script_tag")
+    
+    def test_chat_dialog_flow(self):
+        """Test that a multi-step flow keeps its place across requests."""
+        status, data = request(self.app, "POST", "/chat", {"message": "loan services"})
+        self.assertIn("Loan Services", data["bot"])
+        status, data = request(self.app, "POST", "/chat",
+                               {"message": "business", "session_id": data["session_id"]})
+        self.assertIn("business loans", data["bot"])
+        self.assertIsNone(self.app.sessions.get(data["session_id"]).dialog)
+    
+    def test_responses(self):
+        """Test the responses endpoint."""
+        status, data = request(self.app, "GET", "/responses")
+        self.assertEqual(status, 200)
+        self.assertEqual(data["count"], len(data["responses"]))
+        
+        _, headers, _ = asyncio.run(call_app(self.app, "GET", "/responses"))
+        etag = dict(headers)[b"etag"]
+        for if_none_match in (etag, b'"stale", W/' + etag, b"*"):
+            with self.subTest(if_none_match=if_none_match):
+                status, _, body = asyncio.run(call_app(self.app, "GET", "/responses",
+                                                       headers=[(b"if-none-match", if_none_match)]))
+                self.assertEqual((status, body), (304, b""))
+    
+    def test_metrics(self):
+        """Test the Prometheus metrics endpoint."""
+        request(self.app, "GET", "/health")
+        status, headers, body = asyncio.run(call_app(self.app, "GET", "/metrics"))
+        self.assertEqual(status, 200)
+        self.assertEqual(dict(headers)[b"content-type"].split(b";")[0], b"text/plain")
+        self.assertIn(b'chatbot_http_request_duration_seconds_count{route="/health",method="GET",status="200"}',
+                      body)
+    
+    def test_admin_reload(self):
+        """Test reloading the catalog from its file, only with the admin token."""
+        token = [(b"x-admin-token", b"s3cret")]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"hello": "Hi from the file."}, f)
+            core = ChatbotCore()
+            app = ChatASGIApp(core=core, reloader=CatalogReloader(core, path))
+            with mock.patch.dict(os.environ, {"ADMIN_TOKEN": ""}):
+                self.assertEqual(request(app, "POST", "/admin/reload", {"wait": True}, token)[0], 404)
+            with mock.patch.dict(os.environ, {"ADMIN_TOKEN": "s3cret"}):
+                self.assertEqual(request(self.app, "POST", "/admin/reload", headers=token)[0], 404)
+                self.assertEqual(request(app, "POST", "/admin/reload", {"wait": True})[0], 403)
+                status, data = request(app, "POST", "/admin/reload", {"wait": True}, token)
+        self.assertEqual((status, data["status"], data["entries"]), (200, "success", 1))
+        self.assertEqual(request(app, "POST", "/chat", {"message": "hello"})[1]["bot"], "Hi from the file.")
+    
+    def test_unknown_route_and_method(self):
+        """Test 404 and 405 handling."""
+        self.assertEqual(request(self.app, "GET", "/missing")[0], 404)
+        self.assertEqual(request(self.app, "GET", "/chat")[0], 405)
+    
+    def test_lifespan_closes_ai_chatbot(self):
+        """Test that lifespan shutdown closes the AI chatbot's deadline threads."""
+        ai_chatbot = AIChatbot(async_client=AsyncStubOpenAI())
+        app = ChatASGIApp(core=ChatbotCore(), ai_chatbot=ai_chatbot)
+        messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+        sent = []
+        
+        async def receive():
+            return next(messages)
+        
+        async def send(message):
+            sent.append(message["type"])
+        
+        asyncio.run(app({"type": "lifespan"}, receive, send))
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        with self.assertRaises(RuntimeError):
+            ai_chatbot._deadline_pool.submit(time.sleep, 0)
+    
+    def test_chat_awaits_ai_chatbot(self):
+        """Test that unmatched messages are answered concurrently by the AI chatbot."""
+        stub = AsyncStubOpenAI(latency=0.05, reply="From the LLM")
+        app = ChatASGIApp(core=ChatbotCore(), ai_chatbot=AIChatbot(async_client=stub))
+        
+        async def many():
+            return await asyncio.gather(*(
+                call_app(app, "POST", "/chat", {"message": "tell me something new #{}".format(i)})
+                for i in range(50)
+            ))
+        
+        begin = time.perf_counter()
+        results = asyncio.run(many())
+        elapsed = time.perf_counter() - begin
+        
+        self.assertEqual(stub.calls, 50)
+        self.assertTrue(all(json.loads(body)["bot"] == "From the LLM" for _, _, body in results))
+        # 50 calls of 50 ms each must overlap rather than run back to back
+        self.assertLess(elapsed, 1.0)
+    
+    def test_chat_deadline_and_catalog_race(self):
+        """Test that a slow AI chatbot is cut off at the deadline and raced by the catalog."""
+        stub = AsyncStubOpenAI(latency=0.3, reply="From the LLM")
+        app = ChatASGIApp(core=ChatbotCore(), ai_chatbot=AIChatbot(async_client=stub),
+                          deadline=0.02, race_catalog=True)
+        started = time.perf_counter()
+        self.assertIn("Welcome", request(app, "POST", "/chat", {"message": "hello"})[1]["bot"])
+        self.assertNotEqual(request(app, "POST", "/chat", {"message": "tell me something new"})[1]["bot"],
+                            "From the LLM")
+        self.assertLess(time.perf_counter() - started, 0.25)
+    
+    def test_chat_overload_policies(self):
+        """Test that shed AI requests fall back to the catalog or get a 429."""
+        for policy, expected_status in (("fallback", 200), ("reject", 429)):
+            with self.subTest(policy=policy):
+                stub = AsyncStubOpenAI(reply="From the LLM")
+                ai_chatbot = AIChatbot(async_client=stub, rate_limiter=RateLimiter(60, max_wait=0))
+                app = ChatASGIApp(core=ChatbotCore(), ai_chatbot=ai_chatbot, overload_policy=policy)
+                self.assertEqual(request(app, "POST", "/chat", {"message": "tell me something new"})[1]["bot"],
+                                 "From the LLM")
+                status, headers, body = asyncio.run(
+                    call_app(app, "POST", "/chat", {"message": "tell me something else"}))
+                self.assertEqual(status, expected_status)
+                if policy == "reject":
+                    self.assertIn((b"retry-after", b"1"), headers)
+                else:
+                    self.assertNotEqual(json.loads(body)["bot"], "From the LLM")
+                self.assertEqual(stub.calls, 1)
+
+
+@unittest.skipUnless(importlib.util.find_spec("openai"), "openai is not installed")
+class TestConfiguredFromEnvironment(unittest.TestCase):
+    """Test cases for the AI chatbot the module-level app builds from its environment."""
+    
+    # Imports the real ASGI app in a fresh interpreter and prints the /chat status and reply
+    SCRIPT = (
+        "import asyncio, json\n"
+        "from asgi_app import app, call_app\n"
+        "status, headers, body = asyncio.run(call_app(app, 'POST', '/chat', {'message': 'Tell me a story about owls'}))\n"
+        "print(json.dumps([status, json.loads(body)['bot'], app.ai_chatbot.async_client is not None]))\n"
+    )
+    
+    def test_async_chatbot_from_environment(self):
+        """Test that OPENAI_BASE_URL gives the module-level app an async AI chatbot."""
+        server = StubServer(StubProfile(reply="Once upon a time")).start()
+        self.addCleanup(server.stop)
+        environ = {name: value for name, value in os.environ.items()
+                   if not name.startswith(("OPENAI_", "LLM_", "CATALOG_", "KNOWLEDGE_BASE_"))}
+        environ.update(OPENAI_BASE_URL=server.base_url, OPENAI_MAX_RETRIES="0")
+        result = subprocess.run([sys.executable, "-c", self.SCRIPT], env=environ, capture_output=True,
+                                text=True, timeout=60, cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout.strip().splitlines()[-1]), [200, "Once upon a time", True])
+        self.assertEqual(server.requests, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
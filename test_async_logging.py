@@ -0,0 +1,169 @@
+"""
+Unit Tests for Async Logging
+============================
+
+This module contains unit tests for the off-thread structured logging pipeline.
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+import logging
+import queue
+import tempfile
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_logging import (DeferredQueueHandler, SamplingFilter, StructuredFormatter,
+                           configure_async_logging)
+
+
+class CountingFormatter(logging.Formatter):
+    """Formatter that counts how often it runs."""
+    
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+    
+    def format(self, record):
+        self.calls += 1
+        return super().format(record)
+
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestDeferredQueueHandler(unittest.TestCase):
+    """Test cases for the non-blocking queue handler."""
+    
+    def test_record_is_not_formatted_on_caller(self):
+        """Test that the message is left unformatted for the listener."""
+        log_queue = queue.Queue()
+        handler = DeferredQueueHandler(log_queue)
+        formatter = CountingFormatter()
+        handler.setFormatter(formatter)
+        
+        handler.handle(make_record())
+        record = log_queue.get_nowait()
+        
+        self.assertEqual(formatter.calls, 0)
+        self.assertEqual(record.msg, "hello %s")
+        self.assertEqual(record.args, ("world",))
+    
+    def test_full_queue_drops_and_counts(self):
+        """Test that a full queue drops records instead of blocking."""
+        log_queue = queue.Queue(maxsize=2)
+        handler = DeferredQueueHandler(log_queue)
+        
+        for _ in range(5):
+            handler.handle(make_record())
+        
+        self.assertEqual(log_queue.qsize(), 2)
+        self.assertEqual(handler.dropped, 3)
+
+
+class TestSamplingFilter(unittest.TestCase):
+    """Test cases for INFO sampling."""
+    
+    def test_keeps_one_in_n_info_records(self):
+        """Test that one in N records below WARNING pass."""
+        sampler = SamplingFilter(4)
+        kept = sum(sampler.filter(make_record()) for _ in range(100))
+        self.assertEqual(kept, 25)
+    
+    def test_warnings_always_pass(self):
+        """Test that WARNING and above are never sampled out."""
+        sampler = SamplingFilter(100)
+        for level in (logging.WARNING, logging.ERROR, logging.CRITICAL):
+            self.assertTrue(all(sampler.filter(make_record(level)) for _ in range(10)))
+    
+    def test_rate_one_keeps_everything(self):
+        """Test that a rate of 1 disables sampling."""
+        sampler = SamplingFilter(1)
+        self.assertTrue(all(sampler.filter(make_record()) for _ in range(10)))
+
+
+class TestStructuredFormatter(unittest.TestCase):
+    """Test cases for JSON line output."""
+    
+    def test_formats_json_with_extra_fields(self):
+        """Test that the output is one JSON object including extra fields."""
+        line = StructuredFormatter().format(make_record(session_id="abc"))
+        entry = json.loads(line)
+        
+        self.assertEqual(entry["message"], "hello world")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "test")
+        self.assertEqual(entry["session_id"], "abc")
+        self.assertNotIn("\n", line)
+    
+    def test_includes_exception(self):
+        """Test that exception tracebacks are included."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("test", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+        entry = json.loads(StructuredFormatter().format(record))
+        self.assertIn("ValueError: boom", entry["exc_info"])
+
+
+class TestConfigureAsyncLogging(unittest.TestCase):
+    """Test cases for the end-to-end pipeline."""
+    
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+    
+    def tearDown(self):
+        for handler in list(self.root.handlers):
+            self.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+    
+    def test_records_are_written_by_listener(self):
+        """Test that logged records come out as JSON lines after stop."""
+        stream = io.StringIO()
+        listener = configure_async_logging(stream=stream)
+        logging.getLogger("test.pipeline").info("Processed message: %s", "hello")
+        listener.stop()
+        
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["message"], "Processed message: hello")
+    
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_forked_worker_writes_records(self):
+        """Test that a worker forked after configuration gets its own writer thread."""
+        with tempfile.TemporaryFile("w+") as stream:
+            listener = configure_async_logging(stream=stream)
+            pid = os.fork()
+            if pid == 0:
+                logging.getLogger("test.pipeline").warning("From the worker")
+                listener.stop()
+                stream.flush()
+                os._exit(0)
+            os.waitpid(pid, 0)
+            listener.stop()
+            stream.seek(0)
+            self.assertEqual(json.loads(stream.readline())["message"], "From the worker")
+    
+    def test_replaces_root_handlers(self):
+        """Test that the queue handler is the only root handler."""
+        listener = configure_async_logging(stream=io.StringIO())
+        try:
+            self.assertEqual(len(self.root.handlers), 1)
+            self.assertIsInstance(self.root.handlers[0], DeferredQueueHandler)
+        finally:
+            listener.stop()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
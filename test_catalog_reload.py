@@ -0,0 +1,163 @@
+"""
+Unit Tests for Catalog Reloading
+================================
+
+This module contains unit tests for reloading the response catalog from its
+file while the service is running.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import time
+from unittest import mock
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog_reload import CatalogReloader, admin_enabled, admin_token_matches, reloader_from_env
+from catalog_store import write_catalog
+from chatbot_core import ChatbotCore
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll until ``condition()`` is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestCatalogReloader(unittest.TestCase):
+    """Test cases for the CatalogReloader class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "catalog.json")
+        self.write({"hello": "Hi, version one."})
+        self.core = ChatbotCore()
+        self.core.load_catalog(self.path)
+        self.reloader = CatalogReloader(self.core, self.path, interval=0.01)
+        self.addCleanup(self.reloader.stop)
+    
+    def write(self, responses):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(responses, f)
+        # Make the change visible even on filesystems with coarse timestamps
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    
+    def test_reload_swaps_in_new_version(self):
+        """Test that a reload publishes a fully built new version."""
+        old_catalog = self.core.catalog
+        self.write({"hello": "Hi, version two.", "loan": "Loans!"})
+        result = self.reloader.reload()
+        self.assertTrue(result.ok)
+        self.assertEqual((result.version, result.entries), (old_catalog.version + 1, 2))
+        self.assertEqual(self.core.get_response("hello"), "Hi, version two.")
+        # The new version was warmed before it was published
+        self.assertIsNotNone(self.core.catalog._matcher)
+        self.assertIsNotNone(self.core.catalog._fuzzy)
+        # A request still holding the old version is unaffected
+        self.assertEqual(old_catalog.lookup("hello"), "Hi, version one.")
+    
+    def test_failed_reload_keeps_current_catalog(self):
+        """Test that an invalid file leaves the catalog in place."""
+        version = self.core.version
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        result = self.reloader.reload()
+        self.assertFalse(result.ok)
+        self.assertIsNotNone(result.error)
+        self.assertEqual(self.core.version, version)
+        self.assertEqual(self.core.get_response("hello"), "Hi, version one.")
+        # The broken file is not retried until it changes
+        self.assertFalse(self.reloader.check())
+
+        self.write({})
+        self.assertFalse(self.reloader.reload().ok)
+        self.assertEqual(self.core.version, version)
+    
+    def test_check_reloads_only_on_change(self):
+        """Test change detection."""
+        self.assertFalse(self.reloader.check())
+        self.write({"hello": "Hi, version two."})
+        self.assertTrue(self.reloader.check())
+        self.assertEqual(self.core.get_response("hello"), "Hi, version two.")
+        self.assertFalse(self.reloader.check())
+    
+    def test_request_reload_runs_in_background(self):
+        """Test that a requested reload completes on another thread."""
+        version = self.core.version
+        self.write({"hello": "Hi, version two."})
+        self.assertTrue(self.reloader.request_reload())
+        self.assertTrue(wait_for(lambda: self.core.version > version))
+        self.assertTrue(wait_for(lambda: not self.reloader._running))
+        self.assertEqual(self.core.get_response("hello"), "Hi, version two.")
+    
+    def test_watcher_picks_up_changes(self):
+        """Test that a watched file is reloaded after it changes."""
+        self.reloader.start()
+        self.write({"hello": "Hi, version three."})
+        self.assertTrue(wait_for(lambda: self.core.get_response("hello") == "Hi, version three."))
+        self.reloader.stop()
+    
+    def test_reload_from_catalog_file(self):
+        """Test reloading a precompiled catalog file."""
+        path = self.path.replace(".json", ".gscat")
+        write_catalog({"hello": "Hi from the catalog file."}, path)
+        reloader = CatalogReloader(self.core, path)
+        self.assertTrue(reloader.reload().ok)
+        self.assertEqual(self.core.get_response("hello"), "Hi from the catalog file.")
+    
+    def test_reloader_from_env_builds_indexes_at_startup(self):
+        """Test that the configured catalog is ready before the first request."""
+        path = self.path.replace(".json", ".gscat")
+        write_catalog({"credit card": "Cards!"}, path)
+        core = ChatbotCore()
+        with mock.patch.dict(os.environ, {"CATALOG_PATH": path, "CATALOG_RELOAD_INTERVAL": "0"}):
+            reloader = reloader_from_env(core)
+        self.assertEqual(reloader.path, path)
+        self.assertIsNotNone(core.catalog._matcher)
+        self.assertIsNotNone(core.catalog._fuzzy)
+        self.assertEqual(core.get_response("credt card"), "Cards!")
+    
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_forked_worker_keeps_watching(self):
+        """Test that a worker forked from a preloaded app gets its own watcher."""
+        self.reloader.start()
+        pid = os.fork()
+        if pid == 0:
+            watcher = self.reloader._watcher
+            self.write({"hello": "Hi from the worker."})
+            ok = (watcher is not None and watcher.is_alive()
+                  and wait_for(lambda: self.core.get_response("hello") == "Hi from the worker."))
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+class TestAdminToken(unittest.TestCase):
+    """Test cases for admin token checks."""
+    
+    def test_token(self):
+        """Test that only the configured token matches, and nothing does without one."""
+        with mock.patch.dict(os.environ, {"ADMIN_TOKEN": ""}):
+            self.assertFalse(admin_enabled())
+            self.assertFalse(admin_token_matches(None))
+            self.assertFalse(admin_token_matches(""))
+        with mock.patch.dict(os.environ, {"ADMIN_TOKEN": "s3cret"}):
+            self.assertTrue(admin_enabled())
+            self.assertTrue(admin_token_matches("s3cret"))
+            self.assertFalse(admin_token_matches("wrong"))
+            self.assertFalse(admin_token_matches(None))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
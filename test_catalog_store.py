@@ -0,0 +1,160 @@
+"""
+Unit Tests for the Catalog Store
+================================
+
+This module contains unit tests for the memory-mapped catalog file format.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog_store import MappedResponses, load_source, write_catalog
+from chatbot_core import ChatbotCore
+from response_catalog import ResponseCatalog
+
+
+class CatalogFileTestCase(unittest.TestCase):
+    """Base class that provides a temporary directory."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+    
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+    
+    def mapped(self, responses):
+        path = self.path("catalog.gscat")
+        write_catalog(responses, path)
+        mapped = MappedResponses(path)
+        self.addCleanup(mapped.close)
+        return mapped
+
+
+class TestMappedResponses(CatalogFileTestCase):
+    """Test cases for writing and reading catalog files."""
+    
+    def test_round_trip(self):
+        """Test that every entry reads back in order."""
+        responses = {"service code {}".format(i): "Reply {} ✓".format(i) for i in range(3000)}
+        mapped = self.mapped(responses)
+        self.assertEqual(len(mapped), 3000)
+        self.assertEqual(list(mapped), list(responses))
+        self.assertEqual(mapped.copy(), responses)
+        self.assertEqual(mapped["service code 1234"], "Reply 1234 ✓")
+        self.assertIn("service code 0", mapped)
+    
+    def test_missing_keys(self):
+        """Test lookups of keys that are not in the catalog."""
+        mapped = self.mapped({"hello": "Hi"})
+        self.assertIsNone(mapped.get("goodbye"))
+        self.assertNotIn("hell", mapped)
+        self.assertNotIn(42, mapped)
+        with self.assertRaises(KeyError):
+            mapped["goodbye"]
+    
+    def test_empty_catalog(self):
+        """Test that an empty catalog can be written and opened."""
+        mapped = self.mapped({})
+        self.assertEqual(len(mapped), 0)
+        self.assertIsNone(mapped.get("hello"))
+    
+    def test_read_only(self):
+        """Test that the mapping cannot be modified."""
+        mapped = self.mapped({"hello": "Hi"})
+        with self.assertRaises(TypeError):
+            mapped["hello"] = "Changed"
+    
+    def test_invalid_files_rejected(self):
+        """Test that files in another format are refused."""
+        path = self.path("bad.gscat")
+        for content in (b"", b"not a catalog file at all, just some text"):
+            with open(path, "wb") as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                MappedResponses(path)
+    
+    def test_truncated_file_rejected(self):
+        """Test that a cut-off catalog file is refused."""
+        path = self.path("catalog.gscat")
+        write_catalog({"service code {}".format(i): "Reply" for i in range(100)}, path)
+        with open(path, "r+b") as f:
+            f.truncate(200)
+        with self.assertRaises(ValueError):
+            MappedResponses(path)
+
+
+class TestLoadSource(CatalogFileTestCase):
+    """Test cases for reading catalog source files."""
+    
+    def test_json_object(self):
+        """Test that keys are normalized and invalid entries skipped."""
+        path = self.path("source.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"Hello": "Hi", "empty": ""}, f)
+        self.assertEqual(load_source(path), ({"hello": "Hi"}, 1))
+    
+    def test_json_list_and_csv(self):
+        """Test the list and CSV layouts."""
+        path = self.path("source.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([{"key": "loan", "response": "Loans"}], f)
+        self.assertEqual(load_source(path), ({"loan": "Loans"}, 0))
+
+        path = self.path("source.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write("key,response\nLoan,Loans\nbye,\n")
+        self.assertEqual(load_source(path), ({"loan": "Loans"}, 1))
+
+
+class TestMappedCatalog(CatalogFileTestCase):
+    """Test cases for serving responses from a catalog file."""
+    
+    def test_lazy_catalog_matches_like_in_memory(self):
+        """Test that a mapped catalog answers exactly like a built one."""
+        responses = ChatbotCore().get_available_responses()
+        mapped = ResponseCatalog(self.mapped(responses), lazy=True)
+        built = ResponseCatalog(responses)
+        self.assertIsInstance(mapped.responses, MappedResponses)
+        for message in ("hello", "i need a loan", "credit card fees", "my acount", "weather"):
+            self.assertEqual(mapped.lookup(message), built.lookup(message))
+        self.assertEqual(json.loads(mapped.snapshot().body), json.loads(built.snapshot().body))
+    
+    def test_chatbot_core_load_catalog(self):
+        """Test that ChatbotCore swaps in a catalog file as a new version."""
+        path = self.path("catalog.gscat")
+        write_catalog({"wire transfer": "Wires take one business day."}, path)
+        core = ChatbotCore()
+        version = core.version
+        self.assertEqual(core.load_catalog(path), 1)
+        self.assertEqual(core.version, version + 1)
+        self.assertEqual(core.get_response("How long does a wire transfer take?"),
+                         "Wires take one business day.")
+        self.assertEqual(core.get_available_responses(), {"wire transfer": "Wires take one business day."})
+
+        # Updates on top of a mapped catalog produce an in-memory version
+        core.add_response("hello", "Hi")
+        self.assertEqual(core.get_response("hello"), "Hi")
+        self.assertEqual(len(core.responses), 2)
+    
+    def test_load_catalog_rejects_bad_file(self):
+        """Test that a bad file leaves the current catalog in place."""
+        path = self.path("bad.gscat")
+        with open(path, "wb") as f:
+            f.write(b"{}")
+        core = ChatbotCore()
+        version = core.version
+        with self.assertRaises(ValueError):
+            core.load_catalog(path)
+        self.assertEqual(core.version, version)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
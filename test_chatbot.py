@@ -14,6 +14,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from chatbot_core import ChatbotCore
 import json
+import threading
+from unittest import mock
 
 
 class TestChatbotCore(unittest.TestCase):
@@ -124,6 +126,18 @@ class TestChatbotCore(unittest.TestCase):
         response = self.chatbot.get_response("<script>alert('xss')</script>")
         self.assertIn("I'm sorry, I didn't understand", response)
     
+    def test_confident_response(self):
+        """Test that only answers are confident, never fallbacks, rejections or errors."""
+        self.assertIn("Welcome", self.chatbot.confident_response("hello"))
+        self.assertIsNone(self.chatbot.confident_response("random text"))
+        self.assertIsNone(self.chatbot.confident_response("   "))
+        self.assertIsNone(self.chatbot.confident_response("<script>alert('xss')</script>"))
+        self.assertIsNone(self.chatbot.confident_response(None))
+        
+        with mock.patch.object(self.chatbot.router, "route", side_effect=RuntimeError("boom")):
+            self.assertIn("technical difficulties", self.chatbot.get_response("hello"))
+            self.assertIsNone(self.chatbot.confident_response("hello"))
+    
     def test_add_response(self):
         """Test adding new responses."""
         # Test successful addition
@@ -160,6 +174,74 @@ class TestChatbotCore(unittest.TestCase):
         original_count = len(self.chatbot.responses)
         responses["new_key"] = "new_value"
         self.assertEqual(len(self.chatbot.responses), original_count)
+    
+    def test_catalog_snapshot(self):
+        """Test that the serialized catalog is cached per version."""
+        snapshot = self.chatbot.get_catalog_snapshot()
+        self.assertIs(self.chatbot.get_catalog_snapshot(), snapshot)
+        self.assertEqual(json.loads(snapshot.body)["count"], len(self.chatbot.responses))
+        
+        self.chatbot.add_response("new key", "new response")
+        updated = self.chatbot.get_catalog_snapshot()
+        self.assertGreater(updated.version, snapshot.version)
+        self.assertNotEqual(updated.etag, snapshot.etag)
+        
+        # The ETag depends only on content, not on the version counter
+        self.assertEqual(ChatbotCore().get_catalog_snapshot().etag, snapshot.etag)
+    
+    def test_catalog_versions_are_immutable(self):
+        """Test that published catalog versions cannot be modified in place."""
+        with self.assertRaises(TypeError):
+            self.chatbot.responses["new"] = "value"
+        with self.assertRaises(TypeError):
+            self.chatbot.responses.update({"new": "value"})
+        
+        catalog = self.chatbot.catalog
+        self.chatbot.add_response("new", "value")
+        self.assertNotIn("new", catalog.responses)
+        self.assertIsNot(self.chatbot.catalog, catalog)
+    
+    def test_add_responses_bulk(self):
+        """Test that a bulk update is applied as a single new version."""
+        version = self.chatbot.version
+        entries = {"Topic {}".format(i): "Answer {}".format(i) for i in range(10000)}
+        entries[""] = "skipped"
+        self.assertEqual(self.chatbot.add_responses(entries), 10000)
+        self.assertEqual(self.chatbot.version, version + 1)
+        self.assertEqual(self.chatbot.get_response("tell me about topic 4321"), "Answer 4321")
+        self.assertEqual(self.chatbot.add_responses([("pair key", "pair value")]), 1)
+        self.assertEqual(self.chatbot.get_response("pair key"), "pair value")
+    
+    def test_remove_and_replace_responses(self):
+        """Test removing one response and replacing the whole catalog."""
+        self.assertTrue(self.chatbot.remove_response("LOAN"))
+        self.assertFalse(self.chatbot.remove_response("loan"))
+        self.assertIn("I'm sorry, I didn't understand", self.chatbot.get_response("loan"))
+        
+        self.assertEqual(self.chatbot.replace_responses({"only": "The only response"}), 1)
+        self.assertEqual(self.chatbot.get_available_responses(), {"only": "The only response"})
+    
+    def test_concurrent_reads_during_updates(self):
+        """Test that readers always see a complete catalog while writers swap versions."""
+        errors = []
+        stop = threading.Event()
+        
+        def reader():
+            while not stop.is_set():
+                if self.chatbot.get_response("hello") != "Hi there! Welcome to Goldman Sachs support. How can I help you?":
+                    errors.append("hello")
+        
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for i in range(200):
+            self.chatbot.add_response("key {}".format(i), "value {}".format(i))
+        stop.set()
+        for thread in readers:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.chatbot.responses), 205)
 
 
 class TestChatbotIntegration(unittest.TestCase):
@@ -0,0 +1,65 @@
+"""
+Unit Tests for the Conversation History
+=======================================
+
+This module contains unit tests for the token-budgeted conversation history.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from conversation_history import ConversationHistory, estimate_tokens
+from ai_chatbot import AIChatbot
+from llm_stub import StubOpenAI
+
+
+class TestConversationHistory(unittest.TestCase):
+    """Test cases for the ConversationHistory class."""
+    
+    def test_running_token_total(self):
+        """Test that the running total matches the retained messages."""
+        history = ConversationHistory(max_tokens=1000)
+        history.add_turn("hello there", "hi, how can I help?")
+        self.assertEqual(len(history), 2)
+        self.assertEqual(history.total_tokens,
+                         estimate_tokens("hello there") + estimate_tokens("hi, how can I help?"))
+    
+    def test_trims_to_token_budget(self):
+        """Test that old messages are dropped to respect the budget."""
+        history = ConversationHistory(max_tokens=50, token_counter=lambda text: 10)
+        for i in range(100):
+            history.add_turn("question {}".format(i), "answer {}".format(i))
+        self.assertLessEqual(history.total_tokens, 50)
+        self.assertEqual(history.total_tokens, 10 * len(history))
+        self.assertEqual(history[-1]["content"], "answer 99")
+        self.assertEqual(history[0]["role"], "user")
+    
+    def test_max_messages(self):
+        """Test the optional hard cap on message count."""
+        history = ConversationHistory(max_tokens=10000, max_messages=4)
+        for i in range(10):
+            history.add_turn("q{}".format(i), "a{}".format(i))
+        self.assertEqual([m["content"] for m in history.messages()], ["q8", "a8", "q9", "a9"])
+    
+    def test_clear(self):
+        """Test clearing the history."""
+        history = ConversationHistory()
+        history.add_turn("q", "a")
+        history.clear()
+        self.assertEqual((len(history), history.total_tokens), (0, 0))
+    
+    def test_ai_chatbot_history_is_bounded(self):
+        """Test that a long AIChatbot session does not grow without bound."""
+        chatbot = AIChatbot(client=StubOpenAI(reply="ok " * 20), history_tokens=200)
+        for i in range(500):
+            chatbot.get_ai_response("message number {}".format(i))
+        self.assertLessEqual(chatbot.conversation_history.total_tokens, 200)
+        self.assertLess(len(chatbot.conversation_history), 20)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
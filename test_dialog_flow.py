@@ -0,0 +1,140 @@
+"""
+Unit Tests for Dialog Flows
+===========================
+
+This module contains unit tests for compiling and running multi-step dialog
+flows.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dialog_flow import BANKING_FLOWS, CANCEL_REPLY, RETRY_PROMPT, DialogEngine, DialogState
+from metrics import DIALOG_EVENTS
+from session_manager import SessionManager
+
+
+class TestDialogEngine(unittest.TestCase):
+    """Test cases for the DialogEngine class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.engine = DialogEngine(BANKING_FLOWS)
+    
+    def test_services_flow(self):
+        """Test the name, choice and loan steps in order."""
+        reply, dialog = self.engine.respond(None, "Banking services!")
+        self.assertIn("What's your name?", reply)
+        self.assertIn("Type 'cancel' at any time to stop.", reply)
+        self.assertEqual(self.engine.state_name(dialog), "services.ask_name")
+        
+        reply, dialog = self.engine.respond(dialog, "  Ada ")
+        self.assertTrue(reply.startswith("Nice to meet you, Ada! How can I assist you today?"))
+        self.assertEqual(dialog.slots, ("Ada",))
+        
+        reply, dialog = self.engine.respond(dialog, "I'd like a LOAN please")
+        self.assertEqual(self.engine.state_name(dialog), "loan.menu")
+        
+        reply, dialog = self.engine.respond(dialog, "home")
+        self.assertIn("Thank you for using our service, Ada!", reply)
+        self.assertIsNone(dialog)
+    
+    def test_unmatched_messages_are_not_handled(self):
+        """Test that messages outside a dialog that start none are passed on."""
+        self.assertIsNone(self.engine.respond(None, "hello"))
+        self.assertIsNone(self.engine.respond(None, "account"))
+    
+    def test_only_whole_message_triggers_start_flows(self):
+        """Test that questions mentioning a trigger are passed on, and commands start flows."""
+        for message in ("What services do you offer?", "How do I reset my account services password?",
+                        "Can I apply for a loan online?", "/mortgage"):
+            with self.subTest(message=message):
+                self.assertIsNone(self.engine.respond(None, message))
+        
+        _, dialog = self.engine.respond(None, "  Account   Services. ")
+        self.assertEqual(self.engine.state_name(dialog), "account.menu")
+        self.assertEqual(dialog.slots, ("there",))
+        _, dialog = self.engine.respond(None, "/Loan")
+        self.assertEqual(self.engine.state_name(dialog), "loan.menu")
+    
+    def test_unmatched_choices(self):
+        """Test that an unmatched choice goes to "otherwise" or asks again."""
+        _, dialog = self.engine.respond(None, "services")
+        _, dialog = self.engine.respond(dialog, "")
+        reply, dialog = self.engine.respond(dialog, "pizza")
+        self.assertTrue(reply.startswith("Sorry there, I can only help with 'account' or 'loan' services."))
+        self.assertIn("Type 'cancel' at any time to stop.", reply)
+        self.assertEqual(self.engine.state_name(dialog), "services.ask_choice")
+        
+        _, dialog = self.engine.respond(None, "loan options")
+        reply, retried = self.engine.respond(dialog, "pizza")
+        self.assertTrue(reply.startswith(RETRY_PROMPT))
+        self.assertIn("Type 'cancel' at any time to stop.", reply)
+        self.assertEqual(retried, dialog._replace(retries=1))
+        
+        # Answering the retry starts counting afresh
+        _, dialog = self.engine.respond(None, "services")
+        _, dialog = self.engine.respond(dialog, "")
+        _, dialog = self.engine.respond(dialog, "pizza")
+        _, dialog = self.engine.respond(dialog, "account")
+        self.assertEqual(dialog.retries, 0)
+        self.assertIsNotNone(self.engine.respond(dialog, "pizza"))
+    
+    def test_second_unmatched_reply_ends_dialog(self):
+        """Test that a second unusable reply in a row ends the dialog and is passed on."""
+        abandoned = DIALOG_EVENTS.labels("services", "abandoned")
+        before = abandoned.value
+        session = SessionManager().get_or_create(None)
+        self.engine.handle(session, "services")
+        self.engine.handle(session, "Ada")
+        self.assertIn("I can only help with", self.engine.handle(session, "what are your opening hours?"))
+        self.assertIsNone(self.engine.handle(session, "seriously, when do you open?"))
+        self.assertIsNone(session.dialog)
+        self.assertEqual(abandoned.value, before + 1)
+        self.assertEqual(len(session.history), 6)
+    
+    def test_cancel(self):
+        """Test that a cancel phrase ends the dialog and is counted."""
+        cancelled = DIALOG_EVENTS.labels("loan", "cancelled")
+        before = cancelled.value
+        _, dialog = self.engine.respond(None, "apply for a loan")
+        self.assertEqual(self.engine.respond(dialog, "Cancel"), (CANCEL_REPLY, None))
+        self.assertEqual(cancelled.value, before + 1)
+    
+    def test_start(self):
+        """Test starting a flow by name."""
+        reply, dialog = self.engine.start("account")
+        self.assertIn("Account Services", reply)
+        self.assertEqual(self.engine.respond(dialog, "not now")[1], None)
+        with self.assertRaises(KeyError):
+            self.engine.start("mortgage")
+    
+    def test_handle_keeps_state_in_session(self):
+        """Test that the dialog state lives in the session and turns are recorded."""
+        session = SessionManager().get_or_create(None)
+        self.assertIsNone(self.engine.handle(session, "hello"))
+        self.engine.handle(session, "main menu")
+        self.assertIsInstance(session.dialog, DialogState)
+        self.engine.handle(session, "Grace")
+        self.assertEqual(session.dialog.slots, ("Grace",))
+        self.assertEqual(len(session.history), 4)
+    
+    def test_invalid_flows(self):
+        """Test that flows with unknown names or loops are rejected."""
+        invalid = {
+            "target": {"steps": {"a": {"say": "Hi", "next": "missing"}}},
+            "slot": {"steps": {"a": {"say": "Hi {name}"}}},
+            "loop": {"steps": {"a": {"say": "A", "next": "b"}, "b": {"say": "B", "next": "a"}}},
+        }
+        for name, flow in invalid.items():
+            with self.subTest(flow=name):
+                with self.assertRaises(ValueError):
+                    DialogEngine({name: flow})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+"""
+Unit Tests for the Fuzzy Matcher
+================================
+
+This module contains unit tests for typo-tolerant intent lookup.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fuzzy_matcher import FuzzyMatcher, edit_distance
+from chatbot_core import ChatbotCore
+
+
+class TestEditDistance(unittest.TestCase):
+    """Test cases for the bounded edit distance."""
+    
+    def test_distances(self):
+        """Test insertions, deletions, substitutions and swaps."""
+        self.assertEqual(edit_distance("account", "account", 2), 0)
+        self.assertEqual(edit_distance("acount", "account", 2), 1)
+        self.assertEqual(edit_distance("hellp", "hello", 2), 1)
+        self.assertEqual(edit_distance("laon", "loan", 2), 1)
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+    
+    def test_early_exit(self):
+        """Test that distances beyond the limit are capped."""
+        self.assertEqual(edit_distance("kitten", "sitting", 1), 2)
+        self.assertEqual(edit_distance("a", "abcdef", 2), 3)
+
+
+class TestFuzzyMatcher(unittest.TestCase):
+    """Test cases for the FuzzyMatcher class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.matcher = FuzzyMatcher(["hello", "account", "loan", "credit card", "bye", "transaction dispute"])
+    
+    def test_corrects_typos(self):
+        """Test that misspelled trigger words are corrected."""
+        corrected, corrections = self.matcher.correct("my acount and credt card")
+        self.assertEqual(corrected, "my account and credit card")
+        self.assertEqual([c.term for c in corrections], ["account", "credit"])
+        self.assertTrue(all(c.confidence >= 0.8 for c in corrections))
+    
+    def test_long_words_allow_two_edits(self):
+        """Test that long words tolerate two edits but medium words only one."""
+        self.assertEqual(self.matcher.correct_word("trnsacton").term, "transaction")
+        self.assertEqual(self.matcher.correct_word("disptue").term, "dispute")
+        self.assertIsNone(self.matcher.correct_word("acnout"))
+    
+    def test_short_and_distant_words_are_left_alone(self):
+        """Test that short words and words two edits from a short trigger stay as typed."""
+        self.assertEqual(self.matcher.correct("help me"), ("help me", []))
+        self.assertIsNone(self.matcher.correct_word("byee"))
+        self.assertIsNone(self.matcher.correct_word("random"))
+    
+    def test_ambiguous_corrections_are_skipped(self):
+        """Test that a word equally close to two triggers is not corrected."""
+        matcher = FuzzyMatcher(["price", "prize"])
+        self.assertIsNone(matcher.correct_word("prise"))
+    
+    def test_words_with_digits_are_left_alone(self):
+        """Test that codes and numbers are never corrected."""
+        matcher = FuzzyMatcher(["topic 4321"])
+        self.assertEqual(matcher.correct("topic 4322"), ("topic 4322", []))
+
+
+class TestChatbotCoreFuzzyLookup(unittest.TestCase):
+    """Test cases for the fuzzy stage of ChatbotCore lookups."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.chatbot = ChatbotCore()
+    
+    def test_typos_reach_predefined_responses(self):
+        """Test that common typos get the intended response."""
+        responses = self.chatbot.get_available_responses()
+        self.assertEqual(self.chatbot.get_response("acount"), responses["account"])
+        self.assertEqual(self.chatbot.get_response("I need a credt card"), responses["credit card"])
+        self.assertEqual(self.chatbot.get_response("hellp"), responses["hello"])
+    
+    def test_exact_match_is_preferred(self):
+        """Test that fuzzy matching only runs when the exact lookup misses."""
+        self.chatbot.add_response("acount", "Spelled this way on purpose")
+        self.assertEqual(self.chatbot.get_response("acount"), "Spelled this way on purpose")
+    
+    def test_fuzzy_matching_can_be_disabled(self):
+        """Test that typo correction can be turned off."""
+        chatbot = ChatbotCore(fuzzy_matching=False)
+        self.assertIn("I'm sorry, I didn't understand", chatbot.get_response("acount"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
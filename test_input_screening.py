@@ -0,0 +1,80 @@
+"""
+Unit Tests for Input Screening
+==============================
+
+This module contains unit tests for the single-pass input screening engine.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from input_screening import InputScreener, ScreeningRule, default_screener
+from chatbot_core import ChatbotCore
+
+
+class TestInputScreener(unittest.TestCase):
+    """Test cases for the InputScreener class."""
+    
+    def test_default_rules(self):
+        """Test that the default rules catch the known injection patterns."""
+        test_cases = [
+            ("<script>alert('xss')</script>", "script_tag"),
+            ("JavaScript:alert('xss')", "javascript_uri"),
+            ("DATA:text/html,hi", "data_uri"),
+            ("VBScript:msgbox", "vbscript_uri"),
+        ]
+        
+        for text, rule in test_cases:
+            with self.subTest(text=text):
+                result = default_screener.screen(text)
+                self.assertIsNotNone(result)
+                self.assertEqual(result.rule, rule)
+                self.assertEqual(result.category, "injection")
+    
+    def test_clean_input(self):
+        """Test that ordinary messages pass screening."""
+        for text in ["hello", "What is my account balance?", "", "a" * 1000]:
+            with self.subTest(text=text):
+                self.assertIsNone(default_screener.screen(text))
+    
+    def test_reports_position(self):
+        """Test that the result points at the offending text."""
+        text = "hi <SCRIPT src=x>"
+        result = default_screener.screen(text)
+        self.assertEqual(text[result.start:result.end].lower(), "<script")
+    
+    def test_custom_rules(self):
+        """Test screening with many custom rules across categories."""
+        rules = [ScreeningRule("word_{}".format(i), "badword{:04d}".format(i), "profanity")
+                 for i in range(500)]
+        rules.append(ScreeningRule("ssn_label", "social security number", "pii"))
+        screener = InputScreener(rules)
+        self.assertEqual(len(screener), 501)
+        self.assertEqual(screener.screen("you BADWORD0321!").rule, "word_321")
+        self.assertEqual(screener.screen("my Social Security Number is").category, "pii")
+        self.assertIsNone(screener.screen("a polite message"))
+
+
+class TestChatbotScreening(unittest.TestCase):
+    """Test cases for screening through ChatbotCore."""
+    
+    def test_screen_input(self):
+        """Test that ChatbotCore reports which rule fired."""
+        chatbot = ChatbotCore()
+        self.assertEqual(chatbot.screen_input("<script>").rule, "script_tag")
+        self.assertIsNone(chatbot.screen_input("hello"))
+        self.assertIsNone(chatbot.screen_input(None))
+    
+    def test_custom_screener(self):
+        """Test that validation uses the configured screener."""
+        chatbot = ChatbotCore(screener=InputScreener([ScreeningRule("card", "4111", "pii")]))
+        self.assertFalse(chatbot.validate_input("my card is 4111 1111"))
+        self.assertTrue(chatbot.validate_input("<script>"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,97 @@
+"""
+Unit Tests for the Intent Matcher
+=================================
+
+This module contains unit tests for the compiled multi-keyword matcher.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from intent_matcher import IntentMatcher, Match
+from chatbot_core import ChatbotCore
+import casual_chatbot
+
+
+class TestIntentMatcher(unittest.TestCase):
+    """Test cases for the IntentMatcher class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.matcher = IntentMatcher(["hello", "loan", "credit card", "card"])
+    
+    def test_find_all_reports_positions(self):
+        """Test that every trigger is reported with its position."""
+        text = "hello, I need a loan"
+        matches = self.matcher.find_all(text)
+        self.assertEqual([m.key for m in matches], ["hello", "loan"])
+        for match in matches:
+            self.assertEqual(text[match.start:match.end], match.key)
+    
+    def test_overlapping_triggers(self):
+        """Test that overlapping triggers are all found."""
+        keys = [m.key for m in self.matcher.find_all("my credit card")]
+        self.assertEqual(sorted(keys), ["card", "credit card"])
+    
+    def test_case_insensitive(self):
+        """Test that matching ignores case and keeps original positions."""
+        matches = self.matcher.find_all("HeLLo there")
+        self.assertEqual(matches, [Match("hello", 0, 5, 0)])
+    
+    def test_whole_words(self):
+        """Test that triggers glued to other words are ignored."""
+        self.assertEqual(self.matcher.find_all("loans and cardigans"), [])
+        substring_matcher = IntentMatcher(["loan"], whole_words=False)
+        self.assertEqual(len(substring_matcher.find_all("loans")), 1)
+    
+    def test_best_match_priority_order(self):
+        """Test priority, then length, then position ordering."""
+        self.assertEqual(self.matcher.best_match("card or credit card").key, "credit card")
+        self.assertEqual(self.matcher.best_match("loan and hello").key, "hello")
+        
+        prioritized = IntentMatcher(["hello", "loan"], priorities={"loan": -1})
+        self.assertEqual(prioritized.best_match("hello, I need a loan").key, "loan")
+        self.assertIsNone(prioritized.best_match("nothing here"))
+    
+    def test_large_catalog(self):
+        """Test matching against a large number of triggers."""
+        matcher = IntentMatcher(["trigger {}".format(i) for i in range(10000)])
+        self.assertEqual(len(matcher), 10000)
+        self.assertEqual(matcher.best_match("please run trigger 9876 now").key, "trigger 9876")
+
+
+class TestKeywordResponses(unittest.TestCase):
+    """Test cases for keyword matching in the chatbot front-ends."""
+    
+    def test_core_matches_phrases_in_sentence(self):
+        """Test that ChatbotCore answers triggers found inside a sentence."""
+        chatbot = ChatbotCore()
+        self.assertEqual(chatbot.get_response("I have a question about my account"),
+                         chatbot.responses["account"])
+        self.assertEqual([m.key for m in chatbot.match_intents("hello, I need a loan")],
+                         ["hello", "loan"])
+    
+    def test_core_matcher_tracks_added_responses(self):
+        """Test that added responses are picked up by the matcher."""
+        chatbot = ChatbotCore()
+        chatbot.add_response("Mortgage", "Let me help you with your mortgage.")
+        self.assertEqual(chatbot.get_response("a mortgage question"),
+                         "Let me help you with your mortgage.")
+    
+    def test_casual_rules_keep_order(self):
+        """Test that the casual chatbot keeps its rule order."""
+        self.assertEqual(casual_chatbot.get_response("hey, how are you"),
+                         "Hey there! Nice to chat with you! 😊")
+        self.assertEqual(casual_chatbot.get_response("i'm good"), "That's awesome! 😊")
+        self.assertEqual(casual_chatbot.get_response("not good"), "Glad to hear that! 😊")
+        self.assertEqual(casual_chatbot.get_response("i am tired"),
+                         "Oh no, sorry to hear that. Hope things get better soon! 💙")
+        self.assertEqual(casual_chatbot.get_response("xyz"), "Hmm, interesting! Tell me more...")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,196 @@
+"""
+Unit Tests for the Shared LLM Client Provider
+=============================================
+
+This module contains unit tests for the pooled, concurrency-capped clients.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import time
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm_client
+from llm_client import BoundedClient, AsyncBoundedClient, LLMCapacityError, LLMClientProvider
+from ai_chatbot import AIChatbot
+from llm_stub import AsyncStubOpenAI, StubOpenAI, StubProfile, StubServer
+
+
+class TestLLMClientProvider(unittest.TestCase):
+    """Test cases for the LLMClientProvider class."""
+    
+    def setUp(self):
+        """Set up a provider backed by the stub clients."""
+        self.built = []
+        
+        def factory(settings):
+            self.built.append(settings)
+            return StubOpenAI()
+        
+        self.provider = LLMClientProvider(api_key="sk-test", timeout=12.0, max_in_flight=3,
+                                          client_factory=factory,
+                                          async_client_factory=lambda settings: AsyncStubOpenAI())
+    
+    def test_client_is_built_once(self):
+        """Test that every caller shares one client."""
+        clients = set()
+        threads = [threading.Thread(target=lambda: clients.add(id(self.provider.get_client())))
+                   for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(clients), 1)
+        self.assertEqual(len(self.built), 1)
+        self.assertEqual(self.built[0]["timeout"], 12.0)
+        self.assertEqual(self.provider.get_client().max_in_flight, 3)
+        self.assertIs(self.provider.get_async_client(), self.provider.get_async_client())
+    
+    def test_get_provider_is_shared(self):
+        """Test the process-wide provider."""
+        try:
+            llm_client.set_provider(self.provider)
+            self.assertIs(llm_client.get_provider(), self.provider)
+            self.assertIs(llm_client.get_provider(api_key="sk-test"), self.provider)
+        finally:
+            llm_client.set_provider(None)
+    
+    def test_new_api_key_leaves_old_provider_open(self):
+        """Test that replacing the provider lets callers holding the old one finish."""
+        try:
+            llm_client.set_provider(self.provider)
+            client = self.provider.get_client()
+            with mock.patch.object(self.provider, "close") as close:
+                replacement = llm_client.get_provider(api_key="sk-other")
+            self.assertIsNot(replacement, self.provider)
+            self.assertEqual(replacement.api_key, "sk-other")
+            close.assert_not_called()
+            self.assertIs(self.provider.get_client(), client)
+            self.assertIsNotNone(client.chat.completions.create(model="stub", messages=[]))
+        finally:
+            llm_client.set_provider(None)
+
+
+class TestBoundedClient(unittest.TestCase):
+    """Test cases for the concurrency cap."""
+    
+    def test_caps_in_flight_requests(self):
+        """Test that no more than max_in_flight calls run at once."""
+        client = BoundedClient(StubOpenAI(latency=0.02), max_in_flight=2)
+        peak = []
+        
+        def call():
+            response = client.chat.completions.create(model="stub", messages=[])
+            peak.append(client.in_flight)
+            return response
+        
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertLessEqual(max(peak), 2)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.08)
+        self.assertEqual(client.in_flight, 0)
+    
+    def test_stream_holds_slot_until_done(self):
+        """Test that a streamed completion releases its slot at the end."""
+        client = BoundedClient(StubOpenAI(reply="a b c"), max_in_flight=1, acquire_timeout=0.01)
+        stream = client.chat.completions.create(model="stub", messages=[], stream=True)
+        next(stream)
+        with self.assertRaises(LLMCapacityError):
+            client.chat.completions.create(model="stub", messages=[])
+        list(stream)
+        self.assertEqual(client.in_flight, 0)
+        client.chat.completions.create(model="stub", messages=[])
+    
+    def test_async_cap(self):
+        """Test the async wrapper caps concurrent calls."""
+        async def run():
+            client = AsyncBoundedClient(AsyncStubOpenAI(latency=0.02), max_in_flight=2)
+            peak = []
+            
+            async def call():
+                await client.chat.completions.create(model="stub", messages=[])
+                peak.append(client.in_flight)
+            
+            await asyncio.gather(*(call() for _ in range(6)))
+            return max(peak), client.in_flight
+        
+        peak, remaining = asyncio.run(run())
+        self.assertLessEqual(peak, 2)
+        self.assertEqual(remaining, 0)
+
+
+
+@unittest.skipUnless(importlib.util.find_spec("openai"), "openai is not installed")
+class TestOpenAIClient(unittest.TestCase):
+    """Test cases for the real OpenAI clients, run against the stub server."""
+    
+    def setUp(self):
+        """Start a stub server and a provider pointed at it."""
+        self.server = StubServer(StubProfile(reply="Hello from the stub server")).start()
+        self.addCleanup(self.server.stop)
+        self.provider = LLMClientProvider(api_key="sk-stub", base_url=self.server.base_url, max_retries=0)
+        self.addCleanup(self.provider.close)
+    
+    def test_completion(self):
+        """Test a completion and a streamed completion through the pooled client."""
+        client = self.provider.get_client()
+        response = client.chat.completions.create(model="gpt-3.5-turbo",
+                                                  messages=[{"role": "user", "content": "hi"}])
+        self.assertEqual(response.choices[0].message.content, "Hello from the stub server")
+        
+        stream = client.chat.completions.create(model="gpt-3.5-turbo", stream=True,
+                                                messages=[{"role": "user", "content": "hi"}])
+        tokens = [chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices]
+        self.assertEqual("".join(tokens), "Hello from the stub server")
+        self.assertEqual(client.in_flight, 0)
+        self.assertEqual(self.server.requests, 2)
+    
+    def test_async_completion(self):
+        """Test a completion through the pooled async client."""
+        async def call():
+            client = self.provider.get_async_client()
+            try:
+                response = await client.chat.completions.create(
+                    model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hi"}])
+            finally:
+                await self.provider.aclose()
+            return response.choices[0].message.content, client.client.is_closed()
+        
+        self.assertEqual(asyncio.run(call()), ("Hello from the stub server", True))
+    
+    def test_close_closes_both_clients(self):
+        """Test that close shuts both connection pools, and refuses to run inside an event loop."""
+        client = self.provider.get_client()
+        async_client = self.provider.get_async_client()
+        client.chat.completions.create(model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hi"}])
+        
+        async def inside_loop():
+            with self.assertRaises(RuntimeError):
+                self.provider.close()
+        
+        asyncio.run(inside_loop())
+        self.provider.close()
+        self.assertTrue(client.client.is_closed())
+        self.assertTrue(async_client.client.is_closed())
+        self.assertIsNot(self.provider.get_client(), client)
+    
+    def test_ai_chatbot(self):
+        """Test that AIChatbot answers through the provider's client unchanged."""
+        chatbot = AIChatbot(client=self.provider.get_client())
+        self.assertEqual(chatbot.get_ai_response("hi"), "Hello from the stub server")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
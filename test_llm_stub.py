@@ -0,0 +1,127 @@
+"""
+Unit Tests for the LLM Stub Server
+==================================
+
+This module contains unit tests for the local OpenAI-compatible HTTP stub.
+"""
+
+import json
+import time
+import unittest
+import urllib.error
+import urllib.request
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_stub import StubProfile, StubServer
+
+
+def post(server, payload, path="/chat/completions"):
+    """POST a JSON payload to the stub and return (status, headers, body text)."""
+    request = urllib.request.Request(server.base_url + path, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read().decode("utf-8")
+
+
+MESSAGES = [{"role": "user", "content": "Is the app down?"}]
+
+
+class TestStubServer(unittest.TestCase):
+    """Test cases for the StubServer class."""
+    
+    def start(self, **profile):
+        server = StubServer(StubProfile(reply="one two three four", **profile)).start()
+        self.addCleanup(server.stop)
+        return server
+    
+    def test_completion(self):
+        """Test a plain chat completion and its usage."""
+        server = self.start()
+        status, headers, body = post(server, {"model": "gpt-3.5-turbo", "messages": MESSAGES})
+        self.assertEqual(status, 200)
+        data = json.loads(body)
+        self.assertEqual(data["model"], "gpt-3.5-turbo")
+        self.assertEqual(data["choices"][0]["message"]["content"], "one two three four")
+        self.assertEqual(data["choices"][0]["finish_reason"], "stop")
+        self.assertEqual(data["usage"]["completion_tokens"], 4)
+        self.assertEqual(server.requests, 1)
+    
+    def test_max_tokens_truncates(self):
+        """Test that max_tokens cuts the reply short."""
+        data = json.loads(post(self.start(), {"messages": MESSAGES, "max_tokens": 2})[2])
+        self.assertEqual(data["choices"][0]["message"]["content"], "one two")
+        self.assertEqual(data["choices"][0]["finish_reason"], "length")
+    
+    def test_streaming(self):
+        """Test that streamed chunks arrive as Server-Sent Events and end with [DONE]."""
+        status, headers, body = post(self.start(tokens_per_second=1000), {"messages": MESSAGES, "stream": True})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "text/event-stream")
+        events = [line[len("data: "):] for line in body.split("\n\n") if line.startswith("data: ")]
+        self.assertEqual(events[-1], "[DONE]")
+        chunks = [json.loads(event) for event in events[:-1]]
+        self.assertEqual("".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks),
+                         "one two three four")
+        self.assertEqual(chunks[-1]["choices"][0]["finish_reason"], "stop")
+    
+    def test_latency_and_token_throughput(self):
+        """Test that latency and token generation time are applied."""
+        server = self.start(latency=0.05, tokens_per_second=100)
+        started = time.perf_counter()
+        post(server, {"messages": MESSAGES})
+        # 50 ms to the first token plus four tokens at 10 ms each
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+    
+    def test_rate_limits_and_errors(self):
+        """Test that 429s and 500s are returned as OpenAI-style errors."""
+        status, headers, body = post(self.start(rate_limit_rate=1.0), {"messages": MESSAGES})
+        self.assertEqual(status, 429)
+        self.assertEqual(headers["Retry-After"], "1")
+        self.assertEqual(json.loads(body)["error"]["code"], "rate_limit_exceeded")
+        
+        server = self.start(error_rate=1.0)
+        status, headers, body = post(server, {"messages": MESSAGES})
+        self.assertEqual(status, 500)
+        self.assertEqual(json.loads(body)["error"]["type"], "server_error")
+        self.assertEqual(server.failures[500], 1)
+    
+    def test_bad_requests(self):
+        """Test unknown paths and invalid bodies."""
+        server = self.start()
+        self.assertEqual(post(server, {"messages": MESSAGES}, path="/completions")[0], 404)
+        self.assertEqual(post(server, {"prompt": "hi"})[0], 400)
+
+
+class TestStubProfile(unittest.TestCase):
+    """Test cases for the StubProfile class."""
+    
+    def test_seeded_samples_repeat(self):
+        """Test that the same seed gives the same latencies and failures."""
+        def samples():
+            profile = StubProfile(latency=0.4, latency_dist="lognormal", error_rate=0.1,
+                                  rate_limit_rate=0.1, seed=7)
+            return [profile.sample() for _ in range(200)]
+        
+        first = samples()
+        self.assertEqual(first, samples())
+        statuses = [status for status, latency in first]
+        self.assertTrue(0 < statuses.count(429) < 50)
+        self.assertTrue(0 < statuses.count(500) < 50)
+        latencies = sorted(latency for status, latency in first)
+        self.assertAlmostEqual(latencies[100], 0.4, delta=0.1)
+    
+    def test_unknown_distribution(self):
+        """Test that an unknown latency distribution is rejected."""
+        with self.assertRaises(ValueError):
+            StubProfile(latency_dist="normal")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
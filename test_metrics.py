@@ -0,0 +1,127 @@
+"""
+Unit Tests for Metrics
+======================
+
+This module contains unit tests for the sharded metrics and their
+Prometheus text rendering.
+"""
+
+import threading
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import SHARD_COUNT, MetricsRegistry, _Metric
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for counters, gauges and histograms."""
+    
+    def setUp(self):
+        """Set up a fresh registry for each test."""
+        self.registry = MetricsRegistry()
+    
+    def test_counter_render(self):
+        """Test that labelled counters render one sample per series."""
+        counter = self.registry.counter("requests_total", "Requests.", ("result",))
+        counter.labels(result="hit").inc()
+        counter.labels("hit").inc(2)
+        counter.labels(result="fallback").inc()
+        
+        text = self.registry.render()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{result="hit"} 3', text)
+        self.assertIn('requests_total{result="fallback"} 1', text)
+    
+    def test_counter_sums_thread_shards(self):
+        """Test that increments from many threads are all counted."""
+        counter = self.registry.counter("events_total", "Events.")
+        
+        def work():
+            for _ in range(1000):
+                counter.inc()
+        
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.labels().value, 8000)
+    
+    def test_short_lived_threads_do_not_add_shards(self):
+        """Test that a thread per update, as in a threaded server, keeps the shard count fixed."""
+        counter = self.registry.counter("requests_total", "Requests.")
+        histogram = self.registry.histogram("latency_seconds", "Latency.")
+        
+        def request():
+            counter.inc()
+            histogram.observe(0.01)
+        
+        for _ in range(500):
+            thread = threading.Thread(target=request)
+            thread.start()
+            thread.join()
+        self.assertEqual(counter.labels().value, 500)
+        self.assertEqual(sum(histogram.labels().totals()[0]), 500)
+        self.assertEqual(len(counter.labels()._shards), SHARD_COUNT)
+        self.assertEqual(len(histogram.labels()._shards), SHARD_COUNT)
+    
+    def test_gauge_inc_dec_and_function(self):
+        """Test gauges that are updated and gauges read from a function."""
+        in_flight = self.registry.gauge("in_flight", "In flight.")
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+        self.assertEqual(in_flight.labels().value, 1)
+        
+        sessions = self.registry.gauge("sessions", "Sessions.")
+        sessions.set_function(lambda: 42)
+        self.assertIn("sessions 42", self.registry.render())
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        histogram = self.registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        series = histogram.labels(route="/chat")
+        for value in (0.05, 0.1, 0.5, 2.0):
+            series.observe(value)
+        
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{route="/chat",le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{route="/chat",le="1"} 3', text)
+        self.assertIn('latency_seconds_bucket{route="/chat",le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_sum{route="/chat"} 2.65', text)
+        self.assertIn('latency_seconds_count{route="/chat"} 4', text)
+    
+    def test_label_values_are_escaped(self):
+        """Test that quotes and backslashes in label values are escaped."""
+        counter = self.registry.counter("odd_total", "Odd labels.", ("path",))
+        counter.labels(path='a"b\\c').inc()
+        self.assertIn('odd_total{path="a\\"b\\\\c"} 1', self.registry.render())
+    
+    def test_wrong_label_count_raises(self):
+        """Test that series must supply every label."""
+        counter = self.registry.counter("labelled_total", "Labelled.", ("a", "b"))
+        with self.assertRaises(ValueError):
+            counter.labels("only-one")
+    
+    def test_registration_is_idempotent(self):
+        """Test that registering the same metric twice returns the original."""
+        first = self.registry.counter("shared_total", "Shared.")
+        self.assertIs(self.registry.counter("shared_total", "Shared."), first)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("shared_total", "Shared.")
+    
+    def test_metric_types_must_create_series(self):
+        """Test that a metric type without _new_series cannot be built."""
+        class Untyped(_Metric):
+            type_name = "untyped"
+        
+        with self.assertRaises(TypeError):
+            Untyped("untyped_total", "Untyped.")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,148 @@
+"""
+Unit Tests for the Rate Limiter
+===============================
+
+This module contains unit tests for admitting, delaying and shedding LLM
+calls with the client-side rate limiter.
+"""
+
+import asyncio
+import time
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import LLM_ADMISSIONS
+from rate_limiter import Overloaded, RateLimiter, TokenBucket, rate_limiter_from_env
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+    
+    def __init__(self):
+        self.now = 100.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for the TokenBucket class."""
+    
+    def test_reservations_queue_up(self):
+        """Test that taking past the balance pushes later waits out."""
+        bucket = TokenBucket(rate=2.0, capacity=2.0, now=0.0)
+        self.assertEqual(bucket.wait_time(2, 0.0), 0.0)
+        bucket.take(2, 0.0)
+        self.assertAlmostEqual(bucket.wait_time(1, 0.0), 0.5)
+        bucket.take(1, 0.0)
+        self.assertAlmostEqual(bucket.wait_time(1, 0.0), 1.0)
+        # Refilling never goes past the capacity
+        self.assertEqual(bucket.wait_time(2, 60.0), 0.0)
+        bucket.take(2, 60.0)
+        self.assertAlmostEqual(bucket.wait_time(1, 60.0), 0.5)
+    
+    def test_oversized_amount_is_capped(self):
+        """Test that an amount above the capacity waits for a full bucket, not forever."""
+        bucket = TokenBucket(rate=10.0, capacity=10.0, now=0.0)
+        bucket.take(10, 0.0)
+        self.assertAlmostEqual(bucket.wait_time(1000, 0.0), 1.0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the RateLimiter class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.clock = FakeClock()
+    
+    def count(self, result):
+        return LLM_ADMISSIONS.labels(result=result).value
+    
+    def test_admit_delay_and_shed(self):
+        """Test the three admission decisions."""
+        limiter = RateLimiter(60, max_queue=2, max_wait=10, clock=self.clock)
+        admitted, delayed, shed = self.count("admitted"), self.count("delayed"), self.count("shed")
+        
+        self.assertEqual(limiter.reserve(), 0.0)
+        self.assertAlmostEqual(limiter.reserve(), 1.0)
+        self.assertAlmostEqual(limiter.reserve(), 2.0)
+        self.assertEqual(limiter.waiting, 2)
+        with self.assertRaises(Overloaded) as raised:
+            limiter.reserve()
+        self.assertAlmostEqual(raised.exception.retry_after, 3.0)
+        self.assertEqual(raised.exception.retry_after_header, "3")
+        
+        self.assertEqual(self.count("admitted") - admitted, 1)
+        self.assertEqual(self.count("delayed") - delayed, 2)
+        self.assertEqual(self.count("shed") - shed, 1)
+        
+        # Capacity comes back as time passes and waiters leave
+        limiter.release()
+        limiter.release()
+        self.clock.now += 3
+        self.assertEqual(limiter.reserve(), 0.0)
+    
+    def test_max_wait_sheds_without_reserving(self):
+        """Test that a request that would wait too long takes no capacity."""
+        limiter = RateLimiter(60, max_queue=100, max_wait=1.5, clock=self.clock)
+        limiter.reserve()
+        limiter.reserve()
+        with self.assertRaises(Overloaded):
+            limiter.reserve()
+        self.clock.now += 1
+        # The shed request did not push this one further out
+        self.assertAlmostEqual(limiter.reserve(), 1.0)
+    
+    def test_token_limit(self):
+        """Test that large requests are held back by the token bucket."""
+        limiter = RateLimiter(6000, tokens_per_minute=600, max_wait=10, clock=self.clock)
+        self.assertEqual(limiter.reserve(tokens=10), 0.0)
+        self.assertAlmostEqual(limiter.reserve(tokens=10), 1.0)
+        # Requests that count no tokens only wait on the request bucket
+        self.assertEqual(limiter.reserve(), 0.0)
+    
+    def test_acquire_sleeps_off_the_wait(self):
+        """Test that acquire waits its turn and leaves the queue afterwards."""
+        limiter = RateLimiter(1200, max_wait=1, burst_seconds=0)
+        limiter.acquire()
+        started = time.perf_counter()
+        limiter.acquire()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.03)
+        self.assertEqual(limiter.waiting, 0)
+    
+    def test_acquire_async(self):
+        """Test that coroutines wait their turn in order."""
+        limiter = RateLimiter(1200, max_queue=2, max_wait=1, burst_seconds=0)
+        
+        async def many():
+            return await asyncio.gather(*(limiter.acquire_async() for _ in range(4)),
+                                        return_exceptions=True)
+        
+        results = asyncio.run(many())
+        self.assertEqual(results[:3], [None] * 3)
+        self.assertIsInstance(results[3], Overloaded)
+        self.assertEqual(limiter.waiting, 0)
+
+
+class TestRateLimiterFromEnv(unittest.TestCase):
+    """Test cases for configuring the limiter from the environment."""
+    
+    def test_from_env(self):
+        """Test that the limiter is only built when a request rate is set."""
+        with mock.patch.dict(os.environ, {"LLM_RATE_LIMIT_RPM": ""}):
+            os.environ.pop("LLM_RATE_LIMIT_RPM")
+            self.assertIsNone(rate_limiter_from_env())
+        with mock.patch.dict(os.environ, {"LLM_RATE_LIMIT_RPM": "3500", "LLM_RATE_LIMIT_TPM": "90000",
+                                          "LLM_QUEUE_SIZE": "8", "LLM_QUEUE_TIMEOUT": "2.5"}):
+            limiter = rate_limiter_from_env()
+        self.assertEqual((limiter.max_queue, limiter.max_wait), (8, 2.5))
+        self.assertIsNotNone(limiter._tokens)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
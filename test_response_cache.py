@@ -0,0 +1,88 @@
+"""
+Unit Tests for the Response Cache
+=================================
+
+This module contains unit tests for the LRU+TTL response cache.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from response_cache import ResponseCache, make_cache_key
+
+
+class FakeClock:
+    """Manually advanced time source."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the ResponseCache class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_entries=2, ttl=10.0, clock=self.clock)
+    
+    def test_hit_and_miss_counters(self):
+        """Test that hits and misses are counted."""
+        self.assertIsNone(self.cache.get(b"a"))
+        self.cache.set(b"a", "answer")
+        self.assertEqual(self.cache.get(b"a"), "answer")
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        self.cache.set(b"a", "1")
+        self.cache.set(b"b", "2")
+        self.cache.get(b"a")
+        self.cache.set(b"c", "3")
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get(b"b"))
+        self.assertEqual(self.cache.get(b"a"), "1")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        self.cache.set(b"a", "1")
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get(b"a"), "1")
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get(b"a"))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+        self.assertEqual(len(self.cache), 0)
+    
+    def test_invalid_size(self):
+        """Test that a cache must hold at least one entry."""
+        with self.assertRaises(ValueError):
+            ResponseCache(max_entries=0)
+
+
+class TestMakeCacheKey(unittest.TestCase):
+    """Test cases for cache key construction."""
+    
+    def test_message_is_normalized(self):
+        """Test that case and whitespace do not change the key."""
+        self.assertEqual(make_cache_key("What  are your HOURS?", "prompt"),
+                         make_cache_key("what are your hours?", "prompt"))
+    
+    def test_prompt_and_history_change_the_key(self):
+        """Test that the system prompt and history are part of the key."""
+        base = make_cache_key("hours?", "prompt")
+        self.assertNotEqual(base, make_cache_key("hours?", "other prompt"))
+        self.assertNotEqual(base, make_cache_key("hours?", "prompt", [{"role": "user", "content": "hi"}]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
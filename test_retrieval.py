@@ -0,0 +1,105 @@
+"""
+Unit Tests for Knowledge Base Retrieval
+=======================================
+
+This module contains unit tests for the TF-IDF knowledge base retriever.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from retrieval import TfidfRetriever, load_articles, retrieval_available, tokenize
+from chatbot_core import ChatbotCore, FALLBACK_RESPONSE
+
+ARTICLES = {
+    "How do I reset my online banking password?": "Use the Forgot Password link on the sign-in page.",
+    "What is the daily ATM withdrawal limit?": "The daily ATM withdrawal limit is $1,000.",
+    "How long does an international wire take?": "International wires usually arrive within 1-3 business days.",
+    "Can I dispute a debit card transaction?": "Yes, dispute debit card transactions from the Activity tab.",
+}
+
+
+class TestTokenize(unittest.TestCase):
+    """Test cases for query tokenization."""
+    
+    def test_stop_words_dropped(self):
+        """Test that text is lowercased and stop words are removed."""
+        self.assertEqual(tokenize("How do I reset MY Password?"), ["reset", "password"])
+
+
+@unittest.skipUnless(retrieval_available(), "numpy and scipy are not installed")
+class TestTfidfRetriever(unittest.TestCase):
+    """Test cases for the TfidfRetriever class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.retriever = TfidfRetriever(ARTICLES)
+    
+    def test_search_ranks_best_article_first(self):
+        """Test that the most similar article is returned first."""
+        results = self.retriever.search("forgot my banking password", k=2)
+        self.assertEqual(results[0].answer, ARTICLES["How do I reset my online banking password?"])
+        self.assertLessEqual(len(results), 2)
+        self.assertTrue(all(0 < r.score <= 1.0 + 1e-6 for r in results))
+        self.assertEqual([r.score for r in results], sorted((r.score for r in results), reverse=True))
+    
+    def test_search_batch_matches_single_queries(self):
+        """Test that batched queries give the same results as single ones."""
+        queries = ["atm withdrawal limit", "international wire", "nothing relevant here"]
+        batch = self.retriever.search_batch(queries, k=3)
+        self.assertEqual(len(batch), 3)
+        for query, results in zip(queries, batch):
+            single = self.retriever.search(query, k=3)
+            self.assertEqual([r.index for r in results], [r.index for r in single])
+        self.assertEqual(batch[2], [])
+        self.assertEqual(self.retriever.search_batch([]), [])
+    
+    def test_best_answer_respects_min_score(self):
+        """Test that weak matches are rejected."""
+        self.assertEqual(self.retriever.best_answer("dispute a card transaction"),
+                         ARTICLES["Can I dispute a debit card transaction?"])
+        self.assertIsNone(self.retriever.best_answer("weather forecast tomorrow"))
+        strict = TfidfRetriever(ARTICLES, min_score=0.99)
+        self.assertIsNone(strict.best_answer("wire"))
+    
+    def test_chatbot_core_uses_retriever_after_miss(self):
+        """Test that ChatbotCore asks the knowledge base before falling back."""
+        core = ChatbotCore(retriever=self.retriever)
+        self.assertEqual(core.get_response("what is the atm withdrawal limit"),
+                         ARTICLES["What is the daily ATM withdrawal limit?"])
+        # Predefined responses still win
+        self.assertEqual(core.get_response("hello"), ChatbotCore().get_response("hello"))
+        self.assertEqual(core.get_response("weather forecast tomorrow"), FALLBACK_RESPONSE)
+
+
+class TestLoadArticles(unittest.TestCase):
+    """Test cases for loading knowledge base files."""
+    
+    def _write(self, suffix, content):
+        f = tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False, encoding="utf-8")
+        with f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        return f.name
+    
+    def test_load_json(self):
+        """Test loading both JSON layouts."""
+        path = self._write(".json", json.dumps({"q1": "a1"}))
+        self.assertEqual(load_articles(path), [("q1", "a1")])
+        path = self._write(".json", json.dumps([{"question": "q2", "answer": "a2"}, {"question": "q3"}]))
+        self.assertEqual(load_articles(path), [("q2", "a2")])
+    
+    def test_load_csv(self):
+        """Test loading a CSV file with question and answer columns."""
+        path = self._write(".csv", "question,answer\nq1,a1\nq2,\n")
+        self.assertEqual(load_articles(path), [("q1", "a1")])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
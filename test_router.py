@@ -0,0 +1,182 @@
+"""
+Unit Tests for the Router
+=========================
+
+This module contains unit tests for routing messages through chains of
+answering stages.
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ai_chatbot import AIChatbot
+from chatbot_core import FALLBACK_RESPONSE, ChatbotCore
+from conversation_history import ConversationHistory
+from llm_stub import AsyncStubOpenAI, StubOpenAI
+from metrics import ROUTER_ANSWERS, ROUTER_STAGE_SECONDS
+from response_cache import ResponseCache
+from router import Router, RulesStage, Stage, build_router, catalog_stages
+
+
+class TestRouter(unittest.TestCase):
+    """Test cases for the Router class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.core = ChatbotCore()
+        self.router = Router(catalog_stages(self.core), fallback=FALLBACK_RESPONSE, name="test")
+    
+    def test_cheapest_answering_stage_wins(self):
+        """Test that each message is answered by the first stage that can."""
+        self.assertEqual(self.router.route("Hello").stage, "exact")
+        self.assertEqual(self.router.route("I forgot my account password").stage, "keyword")
+        self.assertEqual(self.router.route("I have a question about my acount").stage, "fuzzy")
+        self.assertEqual(self.router.route("Where is the moon?"), (FALLBACK_RESPONSE, "fallback"))
+    
+    def test_retrieval_stage(self):
+        """Test that the knowledge base answers before the fallback."""
+        class Retriever:
+            def best_answer(self, query):
+                return "Use the mobile app." if "pin" in query else None
+        
+        self.core.retriever = Retriever()
+        self.assertEqual(self.router.route("reset my pin"), ("Use the mobile app.", "retrieval"))
+    
+    def test_answer_does_not_fall_back(self):
+        """Test that answer returns None when no stage answers."""
+        self.assertIsNone(self.router.answer("Where is the moon?"))
+        self.assertEqual(self.router.answer("hello").stage, "exact")
+    
+    def test_turns_are_recorded(self):
+        """Test that answers and fallbacks are recorded in the history."""
+        history = ConversationHistory()
+        self.router.route("hello", history=history)
+        self.router.route("Where is the moon?", history=history)
+        self.assertEqual([m["content"] for m in history.messages()][1::2],
+                         [self.core.responses["hello"], FALLBACK_RESPONSE])
+    
+    def test_stages_are_timed_and_counted(self):
+        """Test that every stage run is timed and every answer counted."""
+        def runs(stage):
+            counts, _ = ROUTER_STAGE_SECONDS.labels("test", stage).totals()
+            return sum(counts)
+        
+        answers = ROUTER_ANSWERS.labels("test", "keyword")
+        before = (runs("exact"), runs("keyword"), runs("fuzzy"), answers.value)
+        self.router.route("I forgot my account password")
+        self.assertEqual((runs("exact"), runs("keyword"), runs("fuzzy"), answers.value),
+                         (before[0] + 1, before[1] + 1, before[2], before[3] + 1))
+    
+    def test_catalog_updates_are_seen(self):
+        """Test that stages read the catalog in use when the message arrives."""
+        self.core.add_responses({"opening hours": "We open at 9am."})
+        self.assertEqual(self.router.route("What are your opening hours?").text, "We open at 9am.")
+    
+    def test_rules_stage_priority(self):
+        """Test that the first matching rule wins over later ones."""
+        router = Router([RulesStage([(["not good"], "Sorry!"), (["good"], "Great!")])], fallback="?")
+        self.assertEqual(router.route("Not good at all").text, "Sorry!")
+        self.assertEqual(router.route("Good, thanks").text, "Great!")
+        self.assertEqual(router.route("meh").text, "?")
+    
+    def test_stages_must_answer(self):
+        """Test that a stage without answer cannot be built."""
+        class Silent(Stage):
+            name = "silent"
+        
+        with self.assertRaises(TypeError):
+            Silent()
+
+
+class TestBuildRouter(unittest.TestCase):
+    """Test cases for the routers the web apps use."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.core = ChatbotCore()
+    
+    def test_catalog_then_cache_then_llm(self):
+        """Test that the LLM is only asked when the catalog and cache miss."""
+        stub = StubOpenAI(reply="From the LLM")
+        router = build_router(self.core, AIChatbot(client=stub, cache=ResponseCache()), name="test_app")
+        self.assertEqual(router.route("hello", history=ConversationHistory()).stage, "catalog")
+        self.assertEqual(router.route("Where is the moon?", history=ConversationHistory()),
+                         ("From the LLM", "llm"))
+        history = ConversationHistory()
+        self.assertEqual(router.route("Where is the moon?", history=history), ("From the LLM", "cache"))
+        self.assertEqual(len(history), 2)
+        self.assertEqual(stub.calls, 1)
+    
+    def test_catalog_non_answers_reach_llm(self):
+        """Test that rejected input is passed on to the LLM rather than answered by the catalog."""
+        router = build_router(self.core, AIChatbot(client=StubOpenAI(reply="From the LLM")), name="test_app")
+        self.assertEqual(router.route("   ", history=ConversationHistory()), ("From the LLM", "llm"))
+        
+        hedged = build_router(self.core, AIChatbot(client=StubOpenAI(latency=0.1, reply="From the LLM")),
+                              race_catalog=True, name="test_app")
+        self.assertEqual(hedged.route("x" * 1001, history=ConversationHistory()).text, "From the LLM")
+    
+    def test_race_catalog(self):
+        """Test that catalog hits skip the LLM and the knowledge base is raced against it."""
+        class Retriever:
+            def best_answer(self, query):
+                return "Use the mobile app." if "pin" in query else None
+        
+        self.core.retriever = Retriever()
+        stub = StubOpenAI(latency=0.2)
+        ai_chatbot = AIChatbot(client=stub)
+        self.addCleanup(ai_chatbot.close)
+        router = build_router(self.core, ai_chatbot, race_catalog=True, name="test_app")
+        self.assertEqual(router.route("hello", history=ConversationHistory()),
+                         (self.core.responses["hello"], "exact"))
+        self.assertEqual(stub.calls, 0)
+        self.assertEqual(router.route("reset my pin", history=ConversationHistory()),
+                         ("Use the mobile app.", "llm"))
+        self.assertEqual(stub.calls, 1)
+    
+    def test_stream(self):
+        """Test that stages before the LLM answer, and the LLM stage's tokens are handed out."""
+        router = build_router(self.core, AIChatbot(client=StubOpenAI(reply="one two three")), name="test_app")
+        result, tokens = router.stream("hello", history=ConversationHistory())
+        self.assertEqual((result, tokens), ((self.core.responses["hello"], "catalog"), None))
+        
+        history = ConversationHistory()
+        result, tokens = router.stream("Where is the moon?", history=history)
+        self.assertIsNone(result)
+        self.assertEqual(list(tokens), ["one", " two", " three"])
+        self.assertEqual(len(history), 2)
+        
+        self.assertEqual(build_router(self.core).stream("Where is the moon?"), (None, None))
+    
+    def test_missed_deadline_falls_back(self):
+        """Test that an LLM missing its deadline leaves the fallback reply."""
+        router = build_router(self.core, AIChatbot(client=StubOpenAI(latency=0.2)), deadline=0.02,
+                              name="test_app")
+        self.assertEqual(router.route("Where is the moon?", history=ConversationHistory()).stage, "fallback")
+    
+    def test_route_async(self):
+        """Test routing without blocking the event loop."""
+        router = build_router(self.core, AIChatbot(async_client=AsyncStubOpenAI(reply="Async reply")),
+                              name="test_app")
+        
+        async def both():
+            return (await router.route_async("hello", history=ConversationHistory()),
+                    await router.route_async("Where is the moon?", history=ConversationHistory()))
+        
+        self.assertEqual(asyncio.run(both()),
+                         ((self.core.responses["hello"], "catalog"), ("Async reply", "llm")))
+    
+    def test_without_ai_chatbot(self):
+        """Test that the catalog alone answers without an AI chatbot."""
+        router = build_router(self.core, name="test_app")
+        self.assertEqual([stage.name for stage in router.stages], ["catalog"])
+        self.assertEqual(router.route("Where is the moon?").text, FALLBACK_RESPONSE)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
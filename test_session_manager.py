@@ -0,0 +1,87 @@
+"""
+Unit Tests for the Session Manager
+==================================
+
+This module contains unit tests for per-customer session state and eviction.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from session_manager import SessionManager
+
+
+class FakeClock:
+    """Manually advanced time source."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestSessionManager(unittest.TestCase):
+    """Test cases for the SessionManager class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.clock = FakeClock()
+        self.sessions = SessionManager(max_sessions=3, idle_timeout=60.0, clock=self.clock)
+    
+    def test_new_and_existing_sessions(self):
+        """Test that known IDs resume and unknown or bad IDs start new sessions."""
+        session = self.sessions.get_or_create()
+        self.assertEqual(len(session.session_id), 32)
+        self.assertIs(self.sessions.get_or_create(session.session_id), session)
+        self.assertEqual(session.turns, 2)
+        
+        for unknown in ("client-chosen", 12345, "x" * 500):
+            with self.subTest(session_id=unknown):
+                issued = self.sessions.get_or_create(unknown).session_id
+                self.assertNotEqual(issued, unknown)
+                self.assertEqual(len(issued), 32)
+        self.assertIsNone(self.sessions.get("client-chosen"))
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used session is evicted at capacity."""
+        a, b, c = (self.sessions.get_or_create().session_id for _ in range(3))
+        self.sessions.get_or_create(a)
+        self.sessions.get_or_create()
+        self.assertIsNone(self.sessions.get(b))
+        self.assertIsNotNone(self.sessions.get(a))
+        self.assertEqual(self.sessions.stats()["evicted_lru"], 1)
+    
+    def test_idle_eviction(self):
+        """Test that idle sessions expire and their IDs are not reused."""
+        a = self.sessions.get_or_create().session_id
+        self.clock.now = 30.0
+        self.sessions.get_or_create()
+        self.clock.now = 61.0
+        self.assertIsNone(self.sessions.get(a))
+        stats = self.sessions.stats()
+        self.assertEqual(stats["active_sessions"], 1)
+        self.assertEqual(stats["evicted_idle"], 1)
+        self.assertNotEqual(self.sessions.get_or_create(a).session_id, a)
+    
+    def test_history_is_lazy_and_bounded(self):
+        """Test that history is created on first use and stays within budget."""
+        session = self.sessions.get_or_create()
+        self.assertIsNone(session._history)
+        for i in range(200):
+            session.record_turn("question {}".format(i), "answer {}".format(i))
+        self.assertLessEqual(session.history.total_tokens, self.sessions.history_tokens)
+    
+    def test_remove(self):
+        """Test ending a session."""
+        a = self.sessions.get_or_create().session_id
+        self.assertTrue(self.sessions.remove(a))
+        self.assertFalse(self.sessions.remove(a))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,165 @@
+"""
+Unit Tests for Single-Flight Coalescing
+=======================================
+
+This module contains unit tests for sharing one call among identical
+concurrent requests.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import SINGLEFLIGHT_REQUESTS
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def run_threads(count, target):
+    """Run ``target`` on ``count`` threads at once and return their results."""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+    
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for the thread-based SingleFlight class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.flight = SingleFlight("test")
+        self.calls = 0
+    
+    def slow_call(self, result="reply", error=None):
+        def call():
+            self.calls += 1
+            time.sleep(0.1)
+            if error is not None:
+                raise error
+            return result
+        return call
+    
+    def test_concurrent_calls_are_coalesced(self):
+        """Test that identical concurrent calls share one execution."""
+        leaders = SINGLEFLIGHT_REQUESTS.labels("test", "leader").value
+        shared = SINGLEFLIGHT_REQUESTS.labels("test", "shared").value
+        results = run_threads(20, lambda: self.flight.do("key", self.slow_call()))
+        self.assertEqual(results, ["reply"] * 20)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(self.flight), 0)
+        self.assertEqual(SINGLEFLIGHT_REQUESTS.labels("test", "leader").value - leaders, 1)
+        self.assertEqual(SINGLEFLIGHT_REQUESTS.labels("test", "shared").value - shared, 19)
+    
+    def test_errors_reach_every_caller(self):
+        """Test that an exception is raised in every waiting caller."""
+        error = RuntimeError("upstream failed")
+        results = run_threads(5, lambda: self.flight.do("key", self.slow_call(error=error)))
+        self.assertEqual(results, [error] * 5)
+        self.assertEqual(self.calls, 1)
+        # The failed call is forgotten, so the next caller tries again
+        self.assertEqual(self.flight.do("key", lambda: "retry"), "retry")
+    
+    def test_different_keys_are_not_coalesced(self):
+        """Test that each key gets its own call."""
+        counter = iter(range(10))
+        results = run_threads(10, lambda: self.flight.do(next(counter), self.slow_call()))
+        self.assertEqual(results, ["reply"] * 10)
+        self.assertEqual(self.calls, 10)
+    
+    def test_sequential_calls_are_not_coalesced(self):
+        """Test that a finished call's result is not reused."""
+        self.assertEqual(self.flight.do("key", lambda: 1), 1)
+        self.assertEqual(self.flight.do("key", lambda: 2), 2)
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    """Test cases for the coroutine-based AsyncSingleFlight class."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.flight = AsyncSingleFlight("test_async")
+        self.calls = 0
+    
+    async def slow_call(self, error=None):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if error is not None:
+            raise error
+        return "reply"
+    
+    def test_concurrent_calls_are_coalesced(self):
+        """Test that identical concurrent awaits share one call."""
+        async def many():
+            return await asyncio.gather(*(self.flight.do("key", self.slow_call) for _ in range(50)))
+
+        self.assertEqual(asyncio.run(many()), ["reply"] * 50)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(self.flight), 0)
+    
+    def test_errors_reach_every_caller(self):
+        """Test that an exception is raised in every waiting coroutine."""
+        async def many():
+            return await asyncio.gather(
+                *(self.flight.do("key", lambda: self.slow_call(ValueError("bad"))) for _ in range(3)),
+                return_exceptions=True)
+
+        results = asyncio.run(many())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(self.calls, 1)
+    
+    def test_cancelled_leader_does_not_cancel_others(self):
+        """Test that the shared call survives the first caller being cancelled."""
+        async def scenario():
+            leader = asyncio.ensure_future(self.flight.do("key", self.slow_call))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(self.flight.do("key", self.slow_call))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower, leader.cancelled()
+
+        self.assertEqual(asyncio.run(scenario()), ("reply", True))
+        self.assertEqual(self.calls, 1)
+    
+    def test_abandoned_call_is_cancelled_only_without_other_waiters(self):
+        """Test that cancel_abandoned cancels the call when its last waiter gives up."""
+        async def scenario():
+            leader = asyncio.ensure_future(self.flight.do("key", self.slow_call, cancel_abandoned=True))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(self.flight.do("key", self.slow_call, cancel_abandoned=True))
+            await asyncio.sleep(0)
+            leader.cancel()
+            shared = await follower
+            
+            alone = asyncio.ensure_future(self.flight.do("key", self.slow_call, cancel_abandoned=True))
+            await asyncio.sleep(0)
+            alone.cancel()
+            await asyncio.sleep(0)
+            # A new caller starts afresh rather than waiting on the cancelled call
+            fresh = await self.flight.do("key", self.slow_call)
+            return shared, alone.cancelled(), fresh
+
+        self.assertEqual(asyncio.run(scenario()), ("reply", True, "reply"))
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(len(self.flight), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)